@@ -0,0 +1,53 @@
+-- /Users/seanking/Projects/tradewizard_4.1/db/migrations/20261017090000_add_assessment_llm_leases.sql
+
+-- Lease-based claiming of Assessments for the LLM interpreter, so several
+-- interpreter workers can run side by side without processing a row twice
+
+ALTER TABLE public."Assessments"
+    ADD COLUMN IF NOT EXISTS llm_lease_owner text NULL,
+    ADD COLUMN IF NOT EXISTS llm_lease_expires_at timestamptz NULL;
+
+-- Claims scan only ready rows, in id order
+CREATE INDEX IF NOT EXISTS idx_assessments_llm_ready_id
+    ON public."Assessments"(id)
+    WHERE llm_ready = true;
+
+COMMENT ON COLUMN public."Assessments".llm_lease_owner IS 'Worker id of the interpreter currently processing this assessment. Null when unclaimed.';
+COMMENT ON COLUMN public."Assessments".llm_lease_expires_at IS 'When the current claim lapses; expired claims can be taken by another worker.';
+
+-- Atomically claim up to p_batch_size ready assessments for one worker.
+-- FOR UPDATE SKIP LOCKED lets concurrent callers claim disjoint rows without
+-- waiting on each other; rows whose lease has expired (a worker died or hung)
+-- are claimable again.
+CREATE OR REPLACE FUNCTION public.claim_assessments_for_llm(
+    p_worker_id text,
+    p_batch_size integer DEFAULT 20,
+    p_lease_seconds integer DEFAULT 900
+)
+RETURNS SETOF public."Assessments"
+LANGUAGE sql
+AS $$
+    WITH claimable AS (
+        SELECT id
+        FROM public."Assessments"
+        WHERE llm_ready = true
+          AND raw_content IS NOT NULL
+          AND (llm_lease_expires_at IS NULL OR llm_lease_expires_at < now())
+        ORDER BY id
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE public."Assessments" AS a
+    SET llm_lease_owner = p_worker_id,
+        llm_lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+        llm_status = 'processing'
+    FROM claimable
+    WHERE a.id = claimable.id
+    RETURNING a.*;
+$$;
+
+COMMENT ON FUNCTION public.claim_assessments_for_llm(text, integer, integer) IS 'Claims a bounded batch of llm_ready assessments for one interpreter worker under a time-limited lease.';
+
+-- Only the backend (service_role) claims work
+REVOKE ALL ON FUNCTION public.claim_assessments_for_llm(text, integer, integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_assessments_for_llm(text, integer, integer) TO service_role;
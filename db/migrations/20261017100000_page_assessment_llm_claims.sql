@@ -0,0 +1,59 @@
+-- /Users/seanking/Projects/tradewizard_4.1/db/migrations/20261017100000_page_assessment_llm_claims.sql
+
+-- Keyset-paged claims and a raw_content shape flag, so the interpreter can
+-- claim its backlog page by page and select only the columns it needs to
+-- plan each assessment, loading the large raw_content JSON only when it
+-- starts work on that assessment
+
+-- Computed field: PostgREST exposes it as a selectable column of Assessments.
+-- True when raw_content already holds the crawler's structured output.
+CREATE OR REPLACE FUNCTION public.raw_content_is_structured(assessment public."Assessments")
+RETURNS boolean
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT coalesce(jsonb_typeof(to_jsonb(assessment.raw_content)) = 'object'
+                    AND to_jsonb(assessment.raw_content) ? 'page_contents', false);
+$$;
+
+COMMENT ON FUNCTION public.raw_content_is_structured(public."Assessments") IS 'Whether raw_content holds structured crawler output (has page_contents); selectable without transferring raw_content.';
+
+-- The claim gains a keyset cursor: only ids after p_after_id are claimed, and
+-- claimed rows come back in id order so the caller can pass the last id on
+DROP FUNCTION IF EXISTS public.claim_assessments_for_llm(text, integer, integer);
+
+CREATE OR REPLACE FUNCTION public.claim_assessments_for_llm(
+    p_worker_id text,
+    p_batch_size integer DEFAULT 20,
+    p_lease_seconds integer DEFAULT 900,
+    p_after_id uuid DEFAULT NULL
+)
+RETURNS SETOF public."Assessments"
+LANGUAGE sql
+AS $$
+    WITH claimable AS (
+        SELECT id
+        FROM public."Assessments"
+        WHERE llm_ready = true
+          AND raw_content IS NOT NULL
+          AND (llm_lease_expires_at IS NULL OR llm_lease_expires_at < now())
+          AND (p_after_id IS NULL OR id > p_after_id)
+        ORDER BY id
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ), claimed AS (
+        UPDATE public."Assessments" AS a
+        SET llm_lease_owner = p_worker_id,
+            llm_lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+            llm_status = 'processing'
+        FROM claimable
+        WHERE a.id = claimable.id
+        RETURNING a.*
+    )
+    SELECT * FROM claimed ORDER BY id;
+$$;
+
+COMMENT ON FUNCTION public.claim_assessments_for_llm(text, integer, integer, uuid) IS 'Claims the next page (ids after p_after_id) of llm_ready assessments for one interpreter worker under a time-limited lease.';
+
+REVOKE ALL ON FUNCTION public.claim_assessments_for_llm(text, integer, integer, uuid) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_assessments_for_llm(text, integer, integer, uuid) TO service_role;
@@ -0,0 +1,29 @@
+-- /Users/seanking/Projects/tradewizard_4.1/db/migrations/20261017110000_renew_assessment_llm_leases.sql
+
+-- Lease renewal for the LLM interpreter: a worker extends the leases on the
+-- page it is processing while the work is in flight, so slow crawls and MCP
+-- runs never let another worker claim (and re-process) the same assessments
+
+-- Extends this worker's leases on the given assessments and returns the ids it
+-- still holds; an id missing from the result has been finished, released or
+-- taken over by another worker after its lease lapsed. A lapsed lease that no
+-- one has claimed yet still has this worker as owner and is simply extended.
+CREATE OR REPLACE FUNCTION public.renew_assessment_leases(
+    p_worker_id text,
+    ids uuid[],
+    p_lease_seconds integer DEFAULT 900
+)
+RETURNS SETOF uuid
+LANGUAGE sql
+AS $$
+    UPDATE public."Assessments"
+    SET llm_lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+    WHERE id = ANY(ids)
+      AND llm_lease_owner = p_worker_id
+    RETURNING id;
+$$;
+
+COMMENT ON FUNCTION public.renew_assessment_leases(text, uuid[], integer) IS 'Extends an interpreter worker''s leases on the given assessments; returns the ids still held.';
+
+REVOKE ALL ON FUNCTION public.renew_assessment_leases(text, uuid[], integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.renew_assessment_leases(text, uuid[], integer) TO service_role;
@@ -0,0 +1,16 @@
+-- /Users/seanking/Projects/tradewizard_4.1/db/migrations/20261017120000_raw_content_is_structured_aggregated_products.sql
+
+-- raw_content_is_structured checked for a page_contents key, which the crawler
+-- never writes, so it was false for every crawled row and re-triggered
+-- assessments were crawled again. Key it on aggregated_products, the same key
+-- the MCP registry uses to recognise crawler output.
+CREATE OR REPLACE FUNCTION public.raw_content_is_structured(assessment public."Assessments")
+RETURNS boolean
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT coalesce(jsonb_typeof(to_jsonb(assessment.raw_content)) = 'object'
+                    AND to_jsonb(assessment.raw_content) ? 'aggregated_products', false);
+$$;
+
+COMMENT ON FUNCTION public.raw_content_is_structured(public."Assessments") IS 'Whether raw_content holds structured crawler output (has aggregated_products); selectable without transferring raw_content.';
@@ -1,5 +1,6 @@
 # /Users/seanking/Projects/tradewizard_4.1/scheduler.py
 
+import asyncio
 import schedule
 import time
 import logging
@@ -41,7 +42,7 @@ def scheduled_job():
 
     logger.info("Scheduler: Starting scheduled interpreter batch run...")
     try:
-        run_interpreter_batch() # Call the function imported from interpreter.py
+        asyncio.run(run_interpreter_batch()) # Coroutine; each run gets its own event loop
         logger.info("Scheduler: Interpreter batch run finished.")
     except Exception as e:
         logger.error(f"Scheduler: An error occurred during scheduled_job execution: {e}", exc_info=True)
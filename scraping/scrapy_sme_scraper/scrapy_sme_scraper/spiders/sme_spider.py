@@ -3,12 +3,32 @@ import scrapy
 import logging
 import re # Import regex for email/phone fallbacks
 import json # Import json for schema parsing
+import os
+import sys
 from urllib.parse import urlparse, urljoin
 # Ensure you import the specific Item classes you defined
 from ..items import ScrapySmeScraperItem, ProductItem, ContactItem, SocialLinksItem
 
+# The contact scanner is shared with the crawlers in the main source tree
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from src.utils.contact_scanner import normalize_phone, scan_contacts
+
 logger = logging.getLogger(__name__)
 
+# Expanded list of potential cert keywords
+POSSIBLE_CERTS = ["haccp", "iso 22000", "iso22000", "iso9001", "iso 9001", "halal", "halaal", "kosher", "organic", "sabs", "fda", "gmp", "fssc 22000", "fssc22000", "brc"]
+# One alternation scans the page once instead of once per keyword.
+# Word boundaries avoid partial matches (e.g., 'isoline' matching 'iso')
+CERT_REGEX = re.compile(r'\b(?:' + '|'.join(re.escape(cert) for cert in POSSIBLE_CERTS) + r')\b')
+# Image alt text and filenames only match the longer keywords
+IMG_CERT_REGEX = re.compile(r'\b(?:' + '|'.join(re.escape(cert) for cert in POSSIBLE_CERTS if len(cert) > 3) + r')\b')
+
+
+def normalize_cert(cert):
+    return cert.upper().replace("ISO ", "ISO").replace(" ", "")
+
 class SmeSpider(scrapy.Spider):
     name = "sme_spider"
     # We will set allowed_domains and start_urls dynamically
@@ -118,23 +138,14 @@ class SmeSpider(scrapy.Spider):
         # --- Extract Certifications (Look for keywords/images on main page) ---
         certifications_found = []
         page_text_lower = response.body.decode(response.encoding, errors='ignore').lower()
-        # Expanded list of potential cert keywords
-        possible_certs = ["haccp", "iso 22000", "iso22000", "iso9001", "iso 9001", "halal", "halaal", "kosher", "organic", "sabs", "fda", "gmp", "fssc 22000", "fssc22000", "brc"]
-        for cert in possible_certs:
-            # Use word boundaries to avoid partial matches (e.g., 'isoline' matching 'iso')
-            if re.search(r'\b' + re.escape(cert) + r'\b', page_text_lower):
-                normalized_cert = cert.upper().replace("ISO ", "ISO").replace(" ", "")
-                certifications_found.append(normalized_cert)
+        certifications_found.extend(normalize_cert(cert) for cert in set(CERT_REGEX.findall(page_text_lower)))
 
         # Look for image alt text or filenames
         for img in response.css('img'):
             alt_text = img.attrib.get('alt', '').lower()
             src_text = img.attrib.get('src', '').lower()
             img_text = alt_text + ' ' + src_text
-            for cert_keyword in possible_certs:
-                 if len(cert_keyword) > 3 and re.search(r'\b' + re.escape(cert_keyword) + r'\b', img_text):
-                     normalized_cert = cert_keyword.upper().replace("ISO ", "ISO").replace(" ", "")
-                     certifications_found.append(normalized_cert)
+            certifications_found.extend(normalize_cert(cert) for cert in IMG_CERT_REGEX.findall(img_text))
 
         item['certifications'] = sorted(list(set(certifications_found))) # Remove duplicates and sort
         if item['certifications']:
@@ -160,17 +171,20 @@ class SmeSpider(scrapy.Spider):
              contact_section = contact_section[0] # Use the first match
 
 
+        # Text of the section, scanned once for the email and phone fallbacks
+        section_text_nodes = contact_section.xpath('.//text()').getall()
+        section_text = ' '.join(t.strip() for t in section_text_nodes if t.strip())
+        section_contacts = None
+
         # Email
         email = contact_section.xpath('.//a[starts-with(@href, "mailto:")]/@href').re_first(r'mailto:([\w\.-]+@[\w\.-]+\.\w+)')
         if not email:
              # Check specific labels based on sample
              email = contact_section.xpath('.//h4[contains(text(), "Email")]/following-sibling::*/text() | .//p[contains(text(), "Email:")]/text()').re_first(r'[\w\.-]+@[\w\.-]+\.\w+')
         if not email:
-             # Fallback: Regex on the whole section text
-             section_text_nodes = contact_section.xpath('.//text()').getall()
-             section_text = ' '.join(t.strip() for t in section_text_nodes if t.strip())
-             email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w{2,}', section_text)
-             if email_match: email = email_match.group(0)
+             # Fallback: scan the whole section text
+             section_contacts = scan_contacts(section_text)
+             if section_contacts['emails']: email = section_contacts['emails'][0]
         if email:
             contacts_data['email'] = email.lower().strip()
             logger.info(f"Found email: {contacts_data['email']}")
@@ -181,24 +195,13 @@ class SmeSpider(scrapy.Spider):
              # Check specific labels based on sample
              phone = contact_section.xpath('.//h4[contains(text(), "Call")]/following-sibling::*/text() | .//p[contains(text(), "Call:")]/text()').get()
         if not phone:
-             # Regex Fallback on section text
-             section_text_nodes = contact_section.xpath('.//text()').getall()
-             section_text = ' '.join(t.strip() for t in section_text_nodes if t.strip())
-             # Use the more robust patterns from previous attempt
-             phone_patterns = [
-                r'\+?27[\s.-]?\(?0?\)?\d{1,2}[\s.-]?\d{3}[\s.-]?\d{4}',
-                r'\(?0?\d{2}\)?[\s.-]?\d{3}[\s.-]?\d{4}',
-                r'\+\d{1,3}[\s.-]?\d{1,14}(?:[\s.-]?\d{1,13})?'
-             ]
-             for pattern in phone_patterns:
-                 matches = sorted(re.findall(pattern, section_text), key=len, reverse=True)
-                 if matches:
-                     best_match = matches[0].strip()
-                     if len(re.sub(r'\D', '', best_match)) >= 7:
-                         phone = best_match
-                         break
+             # Fallback: scan the section text (already done if the email needed it)
+             if section_contacts is None:
+                 section_contacts = scan_contacts(section_text)
+             if section_contacts['phones']: phone = section_contacts['phones'][0]
         if phone:
-            contacts_data['phone'] = phone.strip()
+            # Stored in E.164 like the crawler contacts; kept as written if it does not parse
+            contacts_data['phone'] = normalize_phone(phone) or phone.strip()
             logger.info(f"Found phone: {contacts_data['phone']}")
 
         # Address
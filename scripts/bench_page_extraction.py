@@ -0,0 +1,90 @@
+"""
+Benchmark per-page extraction latency: one Playwright call per anchor versus
+the bundled single-evaluate extraction script.
+
+Usage:
+    python scripts/bench_page_extraction.py                  # synthetic page with 300 links
+    python scripts/bench_page_extraction.py --links 600 --runs 20
+    python scripts/bench_page_extraction.py --url https://example.co.za/shop/
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from playwright.async_api import async_playwright  # noqa: E402
+
+from scrapers.page_extraction import extract_page  # noqa: E402
+
+
+def synthetic_page(link_count: int) -> str:
+    """Build a shop-like page with the given number of links and product cards."""
+    cards = "".join(
+        f'<li class="product"><h3 class="title">Product {i}</h3>'
+        f'<span class="price">R{i * 10}.00</span><a href="/product/p{i}">View</a></li>'
+        for i in range(link_count)
+    )
+    return (
+        "<html><head><title>Shop</title>"
+        '<script type="application/ld+json">{"@type": "Organization", "name": "Example"}</script>'
+        f'</head><body><h1>Shop</h1><ul class="products">{cards}</ul></body></html>'
+    )
+
+
+async def legacy_extraction(page) -> int:
+    """The previous SimpleCrawler path: two round trips per anchor."""
+    await page.content()
+    await page.title()
+    anchors = await page.query_selector_all("a[href]")
+    for anchor in anchors:
+        await anchor.get_attribute("href")
+        await anchor.inner_text()
+    await page.evaluate("() => document.body.innerHTML")
+    return len(anchors)
+
+
+async def bundled_extraction(page) -> int:
+    extracted = await extract_page(page, include_text=False, include_body_html=True)
+    return len(extracted["links"])
+
+
+async def time_runs(page, extract, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        link_count = await extract(page)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, link_count
+
+
+async def main(url: str, link_count: int, runs: int) -> None:
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        if url:
+            await page.goto(url, wait_until="load")
+        else:
+            await page.set_content(synthetic_page(link_count))
+
+        for name, extract in (("per-anchor calls", legacy_extraction), ("bundled evaluate", bundled_extraction)):
+            timings, found = await time_runs(page, extract, runs)
+            print(f"{name:>18}: median {statistics.median(timings):8.1f} ms  "
+                  f"mean {statistics.mean(timings):8.1f} ms  ({found} links, {runs} runs)")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a live page instead of the synthetic one")
+    parser.add_argument("--links", type=int, default=300, help="Links on the synthetic page")
+    parser.add_argument("--runs", type=int, default=10, help="Extractions per approach")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.links, args.runs))
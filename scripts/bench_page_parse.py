@@ -0,0 +1,79 @@
+"""
+Benchmark per-page parse cost over the pages saved in crawler_result.json:
+the previous path (html.parser over the HTML, then two more parses over the
+flattened text for contacts and PDF links) versus one shared parse.
+
+Usage:
+    python scripts/bench_page_parse.py
+    python scripts/bench_page_parse.py --input crawler_result.json --runs 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from scrapers.page_parser import HTML_PARSER, extract_page_content, extract_text, parse_html  # noqa: E402
+
+
+def previous_parses(html: str, url: str) -> None:
+    """The previous path: html.parser over the HTML, then twice over the flattened text."""
+    text = extract_text(BeautifulSoup(html, "html.parser"))
+    BeautifulSoup(text, "html.parser")
+    BeautifulSoup(text, "html.parser")
+
+
+def single_parse(html: str, url: str) -> None:
+    parse_html(html)
+
+
+def single_parse_and_extract(html: str, url: str) -> None:
+    """One parse feeding JSON-LD, contact and text extraction."""
+    extract_page_content(parse_html(html), url)
+
+
+def time_runs(pages, parse, runs: int):
+    timings = []
+    for _ in range(runs):
+        for page in pages:
+            started = time.perf_counter()
+            parse(page["html"], page["url"])
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(path: str, runs: int) -> None:
+    with open(path) as f:
+        pages = [page for page in json.load(f).get("pages", []) if page.get("html")]
+    if not pages:
+        print(f"No pages with HTML in {path}")
+        return
+    total_kb = sum(len(page["html"]) for page in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KB of HTML, {runs} runs")
+
+    approaches = (
+        ("previous: 3 parses + text", previous_parses),
+        (f"single {HTML_PARSER} parse", single_parse),
+        ("single parse + extraction", single_parse_and_extract),
+    )
+    for name, parse in approaches:
+        timings = time_runs(pages, parse, runs)
+        print(f"{name:>26}: median {statistics.median(timings):8.1f} ms/page  "
+              f"mean {statistics.mean(timings):8.1f} ms/page")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=os.path.join(project_root, "crawler_result.json"),
+                        help="Crawl result with page HTML")
+    parser.add_argument("--runs", type=int, default=5, help="Passes over the pages per approach")
+    args = parser.parse_args()
+    main(args.input, args.runs)
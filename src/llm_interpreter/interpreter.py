@@ -2,8 +2,11 @@
 
 import os
 import logging
+import inspect
 import json
-from typing import Dict, Any, List, Optional
+import socket
+import time
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple, TypeVar
 from datetime import datetime, timezone
 from supabase import create_client, Client
 from dotenv import load_dotenv
@@ -15,8 +18,11 @@ import os
 
 # Add the parent directory to sys.path to enable relative imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from mcps import get_active_mcps, log_mcp_run, handle_mcp_result, BaseMCP, MCPOutput
-from scrapers.crawler_integration import crawl_and_prepare_content
+from mcps import get_active_mcps, get_mcp_dependencies, get_mcp_input_columns, get_mcp_timeout, log_mcp_run, handle_mcp_result, BaseMCP, MCPOutput
+from scrapers.crawler_integration import crawl_and_prepare_content, shutdown_crawler_resources
+from scrapers.batch_crawler import CRAWLER_BATCH_MAX_SITES, BatchCrawler, CrawlJob
+# Same module name the MCPs import, so this closes the clients they pooled
+from llm_interpreter.llm_client import shutdown_llm_clients
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,25 +44,156 @@ if supabase_url and supabase_key:
 else:
     logger.warning("Supabase URL or Key not found. Interpreter operations requiring DB access will fail.")
 
+# --- Batch Concurrency Settings ---
+# Assessments processed at the same time in one batch run
+INTERPRETER_CONCURRENCY = int(os.getenv("INTERPRETER_CONCURRENCY", "8"))
+# Per-stage limits, shared by every assessment in the batch
+INTERPRETER_CRAWL_CONCURRENCY = int(os.getenv("INTERPRETER_CRAWL_CONCURRENCY", str(CRAWLER_BATCH_MAX_SITES)))
+INTERPRETER_LLM_CONCURRENCY = int(os.getenv("INTERPRETER_LLM_CONCURRENCY", "4"))
+INTERPRETER_DB_CONCURRENCY = int(os.getenv("INTERPRETER_DB_CONCURRENCY", "4"))
+
+# --- Work Claiming Settings ---
+# Identifies this process in Assessments.llm_lease_owner; unique per worker
+INTERPRETER_WORKER_ID = os.getenv("INTERPRETER_WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+# Assessments claimed per batch run
+INTERPRETER_CLAIM_BATCH_SIZE = int(os.getenv("INTERPRETER_CLAIM_BATCH_SIZE", "20"))
+# How long a claim holds before another worker may take the assessment over
+INTERPRETER_LEASE_SECONDS = int(os.getenv("INTERPRETER_LEASE_SECONDS", "900"))
+# How often the leases on a page in flight are renewed (well inside the lease)
+INTERPRETER_LEASE_RENEW_SECONDS = float(os.getenv("INTERPRETER_LEASE_RENEW_SECONDS", str(INTERPRETER_LEASE_SECONDS / 3)))
+# Claimed pages processed per batch run (each page is finished before the next is claimed)
+INTERPRETER_MAX_PAGES_PER_RUN = int(os.getenv("INTERPRETER_MAX_PAGES_PER_RUN", "10"))
+
+# Columns needed to plan an assessment (crawl or not, which MCPs run): the
+# interpreter's own plus whatever the registry's enabled_if predicates read.
+# raw_content is left out: raw_content_is_structured is a computed column
+# describing it, and the content itself is loaded when processing of the
+# assessment starts.
+ASSESSMENT_PLAN_COLUMNS = ",".join(dict.fromkeys(
+    ["id", "source_url", "llm_ready", "llm_status", "trigger_crawler", "raw_content_is_structured"]
+    + [column for column in get_mcp_input_columns() if column != "raw_content"]
+))
+
+T = TypeVar("T")
+
+
+class StageLimits:
+    """Separate concurrency limits for the crawl, LLM and database stages of a batch."""
+
+    def __init__(
+        self,
+        crawl: int = INTERPRETER_CRAWL_CONCURRENCY,
+        llm: int = INTERPRETER_LLM_CONCURRENCY,
+        db: int = INTERPRETER_DB_CONCURRENCY
+    ):
+        """
+        Initialize the limits.
+
+        Args:
+            crawl: Site crawls in flight
+            llm: MCP runs (LLM calls) in flight
+            db: Supabase calls in flight
+        """
+        self.crawl_limit = max(1, crawl)
+        self.crawl = asyncio.Semaphore(self.crawl_limit)
+        self.llm = asyncio.Semaphore(max(1, llm))
+        self.db = asyncio.Semaphore(max(1, db))
+
+    async def db_call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking Supabase call in a worker thread under the DB limit.
+
+        Args:
+            fn: Synchronous function making the call
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            The function's result
+        """
+        async with self.db:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+class AssessmentLeases:
+    """This worker's leases on one claimed page, renewed by a heartbeat while the page is in flight."""
+
+    def __init__(
+        self,
+        assessment_ids: List[str],
+        worker_id: str = INTERPRETER_WORKER_ID,
+        lease_seconds: int = INTERPRETER_LEASE_SECONDS,
+        renew_seconds: float = INTERPRETER_LEASE_RENEW_SECONDS
+    ):
+        """
+        Initialize the leases.
+
+        Args:
+            assessment_ids: Assessments claimed by this worker
+            worker_id: Lease owner
+            lease_seconds: Lease length requested on each renewal
+            renew_seconds: Interval between renewals
+        """
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.active: Set[str] = set(assessment_ids)
+        self.lost: Set[str] = set()
+
+    def finish(self, assessment_id: str) -> None:
+        """Stops renewing an assessment whose final status has been recorded."""
+        self.active.discard(assessment_id)
+
+    async def keep_alive(self, limits: StageLimits) -> None:
+        """Renews the active leases every renew_seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.renew_seconds)
+            ids = sorted(self.active - self.lost)
+            if not ids:
+                continue
+            held = await limits.db_call(renew_assessment_leases, ids, self.worker_id, self.lease_seconds)
+            if held is None:
+                continue  # Renewal failed; try again on the next beat
+            # Ids finished while the renewal was in flight are not lost
+            lost = {assessment_id for assessment_id in ids if assessment_id not in held and assessment_id in self.active}
+            if lost:
+                logger.warning(f"Worker {self.worker_id} lost the lease on assessments {sorted(lost)}; their results will not be applied.")
+                self.lost.update(lost)
+
+    async def still_held(self, assessment_id: str, limits: StageLimits) -> bool:
+        """Checks with the database that this worker still holds the assessment's lease."""
+        if assessment_id in self.lost:
+            return False
+        held = await limits.db_call(assessment_lease_is_held, assessment_id, self.worker_id)
+        if not held:
+            self.lost.add(assessment_id)
+        return held
+
 # --- Database Interaction Functions ---
 
-def fetch_assessments_for_llm() -> List[Dict[str, Any]]:
-    """Fetches assessments marked ready for LLM processing."""
+def fetch_assessments_for_llm(after_id: Optional[str] = None, page_size: int = INTERPRETER_CLAIM_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Fetches one page of assessments marked ready for LLM processing, without claiming them.
+
+    Args:
+        after_id: Keyset cursor; only assessments with a greater id are returned
+        page_size: Maximum rows to return
+
+    Returns:
+        Assessment rows in id order with ASSESSMENT_PLAN_COLUMNS only
+    """
     if not supabase:
         logger.error("Supabase client not available for fetching assessments.")
         return []
     try:
-        # TODO: Potentially filter out assessments already processed or in a failed state?
-        # Filter by llm_ready = true and maybe llm_status != 'failed' or based on last attempt time?
-        # Currently selecting based on original 'llm_ready' logic
-        response = supabase.table("Assessments") \
-                         .select("*", count='exact') \
-                         .eq("llm_ready", True) \
-                         .not_.is_('raw_content', None) \
-                         .execute()
-
-        if response.count is not None and response.count > 0:
-            logger.info(f"Fetched {response.count} assessments for LLM processing.")
+        query = supabase.table("Assessments") \
+                        .select(ASSESSMENT_PLAN_COLUMNS) \
+                        .eq("llm_ready", True) \
+                        .not_.is_('raw_content', None)
+        if after_id:
+            query = query.gt("id", after_id)
+        response = query.order("id").limit(page_size).execute()
+
+        if response.data:
+            logger.info(f"Fetched {len(response.data)} assessments for LLM processing.")
             return response.data
         else:
             logger.info("No assessments found ready for LLM processing.")
@@ -65,6 +202,103 @@ def fetch_assessments_for_llm() -> List[Dict[str, Any]]:
         logger.error(f"Error fetching assessments from Supabase: {e}", exc_info=True)
         return []
 
+def claim_assessments_for_llm(
+    after_id: Optional[str] = None,
+    worker_id: str = INTERPRETER_WORKER_ID,
+    batch_size: int = INTERPRETER_CLAIM_BATCH_SIZE,
+    lease_seconds: int = INTERPRETER_LEASE_SECONDS
+) -> List[Dict[str, Any]]:
+    """
+    Claims the next page of assessments ready for LLM processing for this worker.
+
+    The claim_assessments_for_llm RPC leases the rows atomically (FOR UPDATE
+    SKIP LOCKED), so concurrent workers never receive the same assessment and
+    rows whose lease expired are picked up again.
+
+    Args:
+        after_id: Keyset cursor; only assessments with a greater id are claimed
+        worker_id: Lease owner recorded on the claimed rows
+        batch_size: Maximum assessments to claim
+        lease_seconds: Lease length
+
+    Returns:
+        The claimed assessment rows in id order, with ASSESSMENT_PLAN_COLUMNS only
+    """
+    if not supabase:
+        logger.error("Supabase client not available for claiming assessments.")
+        return []
+    try:
+        response = supabase.rpc("claim_assessments_for_llm", {
+            "p_worker_id": worker_id,
+            "p_batch_size": batch_size,
+            "p_lease_seconds": lease_seconds,
+            "p_after_id": after_id,
+        }).select(ASSESSMENT_PLAN_COLUMNS).execute()
+        claimed = response.data or []
+        if claimed:
+            logger.info(f"Worker {worker_id} claimed {len(claimed)} assessments for LLM processing.")
+        else:
+            logger.info("No assessments found ready for LLM processing.")
+        return claimed
+    except Exception as e:
+        logger.error(f"Error claiming assessments from Supabase: {e}", exc_info=True)
+        return []
+
+def release_assessment_claims(assessment_ids: List[str], worker_id: str = INTERPRETER_WORKER_ID) -> None:
+    """Hands unfinished claimed assessments back so any worker can claim them right away."""
+    if not supabase or not assessment_ids:
+        return
+    try:
+        supabase.table("Assessments") \
+                .update({"llm_status": "pending", "llm_lease_owner": None, "llm_lease_expires_at": None}) \
+                .in_("id", assessment_ids) \
+                .eq("llm_lease_owner", worker_id) \
+                .execute()
+        logger.info(f"Released {len(assessment_ids)} unfinished assessment claims held by {worker_id}.")
+    except Exception as e:
+        logger.error(f"Error releasing assessment claims for {worker_id}: {e}", exc_info=True)
+
+def renew_assessment_leases(
+    assessment_ids: List[str],
+    worker_id: str = INTERPRETER_WORKER_ID,
+    lease_seconds: int = INTERPRETER_LEASE_SECONDS
+) -> Optional[Set[str]]:
+    """
+    Extends this worker's leases on assessments it is still processing.
+
+    Args:
+        assessment_ids: Assessments to renew
+        worker_id: Lease owner
+        lease_seconds: New lease length, from now
+
+    Returns:
+        The ids still leased to the worker, or None if the renewal failed
+    """
+    if not supabase:
+        return None
+    try:
+        response = supabase.rpc("renew_assessment_leases", {
+            "p_worker_id": worker_id,
+            "ids": assessment_ids,
+            "p_lease_seconds": lease_seconds,
+        }).execute()
+        # A SETOF uuid function returns bare ids (or {"renew_assessment_leases": id} rows)
+        return {row["renew_assessment_leases"] if isinstance(row, dict) else row for row in response.data or []}
+    except Exception as e:
+        logger.error(f"Error renewing assessment leases for {worker_id}: {e}", exc_info=True)
+        return None
+
+def assessment_lease_is_held(assessment_id: str, worker_id: str = INTERPRETER_WORKER_ID) -> bool:
+    """True if the assessment is still leased to the worker."""
+    if not supabase:
+        return False
+    response = supabase.table("Assessments") \
+                       .select("id") \
+                       .eq("id", assessment_id) \
+                       .eq("llm_lease_owner", worker_id) \
+                       .execute()
+    return bool(response.data)
+
 def fetch_products_for_classification(classification_id: str) -> List[Dict[str, Any]]:
     """Fetches product records associated with a given assessment ID."""
     # This function queries the 'Products' table based on the assessment_id
@@ -91,8 +325,13 @@ def fetch_products_for_classification(classification_id: str) -> List[Dict[str,
         return []
     # --- End Placeholder Implementation ---
 
-def update_assessment_status(assessment_id: str, status: str, processed_at: Optional[datetime] = None, error_message: Optional[str] = None) -> None:
-    """Updates the llm_status and optionally llm_processed_at for an assessment."""
+def update_assessment_status(assessment_id: str, status: str, processed_at: Optional[datetime] = None, error_message: Optional[str] = None, lease_owner: Optional[str] = None) -> None:
+    """
+    Updates the llm_status and optionally llm_processed_at for an assessment.
+
+    With lease_owner the update also releases that worker's claim, and is
+    skipped if the lease has since passed to another worker.
+    """
     if not supabase:
         logger.error(f"Supabase client not available. Cannot update assessment status for {assessment_id}.")
         return
@@ -105,22 +344,91 @@ def update_assessment_status(assessment_id: str, status: str, processed_at: Opti
         update_data["llm_processed_at"] = processed_at.isoformat()
     if error_message:
         update_data["error_message"] = error_message
+    if lease_owner:
+        update_data["llm_lease_owner"] = None
+        update_data["llm_lease_expires_at"] = None
 
     try:
         logger.info(f"Updating assessment {assessment_id} status to '{status}'...")
-        response = supabase.table("Assessments") \
-                         .update(update_data) \
-                         .eq("id", assessment_id) \
-                         .execute()
+        query = supabase.table("Assessments") \
+                        .update(update_data) \
+                        .eq("id", assessment_id)
+        if lease_owner:
+            query = query.eq("llm_lease_owner", lease_owner)
+        response = query.execute()
+        if lease_owner and not response.data:
+            logger.warning(f"Assessment {assessment_id} is no longer leased to {lease_owner}; status '{status}' not recorded.")
         # Add check for success/failure if needed based on response
         logger.debug(f"Assessment {assessment_id} status update response: {response.data}")
     except Exception as e:
         logger.error(f"Error updating assessment status for {assessment_id}: {e}", exc_info=True)
 
+def fetch_raw_content(assessment_id: str) -> Any:
+    """Fetches only the raw_content of one assessment."""
+    response = supabase.table("Assessments").select("raw_content").eq("id", assessment_id).single().execute()
+    return (response.data or {}).get("raw_content")
+
+def store_crawl_result(assessment_id: str, structured_raw_content: Dict[str, Any], lease_owner: Optional[str] = INTERPRETER_WORKER_ID) -> None:
+    """
+    Saves crawled content on an assessment and resets its crawler trigger.
+
+    With lease_owner the update only applies while that worker holds the
+    assessment's lease.
+
+    Raises:
+        RuntimeError: The lease has passed to another worker
+    """
+    logger.info(f"Updating assessment {assessment_id} with crawled content.")
+    update_data = {
+        "raw_content": structured_raw_content,
+        "trigger_crawler": False, # Reset the trigger
+        "crawler_run_at": datetime.now(timezone.utc).isoformat()
+    }
+    query = supabase.table("Assessments").update(update_data).eq("id", assessment_id)
+    if lease_owner:
+        query = query.eq("llm_lease_owner", lease_owner)
+    response = query.execute()
+    logger.debug(f"Supabase update response for crawled content: {response}")
+    if lease_owner and not response.data:
+        raise RuntimeError(f"Assessment {assessment_id} is no longer leased to {lease_owner}; crawled content not saved")
+
 # --- Core Processing Logic ---
 
-async def process_single_assessment(assessment: Dict[str, Any]) -> str:
-    """Processes a single assessment by running all applicable MCPs."""
+def _raw_content_is_structured(assessment: Dict[str, Any]) -> bool:
+    """Heuristic check: Does raw_content look like structured JSON from our crawler?"""
+    if "raw_content" not in assessment:
+        # Not loaded yet; use the computed column fetched in its place
+        return bool(assessment.get("raw_content_is_structured"))
+    # crawl_and_prepare_content always writes aggregated_products (the key the MCP registry checks too)
+    raw_content = assessment.get("raw_content")
+    return isinstance(raw_content, dict) and "aggregated_products" in raw_content
+
+def _needs_crawl(assessment: Dict[str, Any]) -> bool:
+    """True when the assessment asks for a crawl and has no crawled content yet."""
+    return bool(assessment.get("trigger_crawler")) and not _raw_content_is_structured(assessment)
+
+async def process_single_assessment(
+    assessment: Dict[str, Any],
+    limits: Optional[StageLimits] = None,
+    leases: Optional[AssessmentLeases] = None,
+    errors: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Processes a single assessment by running all applicable MCPs.
+
+    The final status is left to the caller to record (under its lease).
+
+    Args:
+        assessment: Assessment row
+        limits: Stage limits shared with the rest of the batch (a private set if omitted)
+        leases: This worker's leases when the assessment was claimed; MCP results
+            are only applied while the lease is held
+        errors: Receives the error message, keyed by assessment id, when the crawl fails
+
+    Returns:
+        "success", "partial" or "failed"
+    """
+    limits = limits or StageLimits()
     assessment_id = assessment.get("id")
     if not assessment_id:
         logger.error("Assessment data missing 'id'. Cannot process.")
@@ -128,11 +436,20 @@ async def process_single_assessment(assessment: Dict[str, Any]) -> str:
 
     logger.info(f"Processing assessment ID: {assessment_id}")
 
+    # Batch fetches leave raw_content out; load it now that work on this assessment starts.
+    # A crawl that is about to replace it does not need the old content.
+    if "raw_content" not in assessment and not _needs_crawl(assessment):
+        try:
+            raw_content = await limits.db_call(fetch_raw_content, assessment_id)
+        except Exception as e:
+            logger.error(f"Error loading raw_content for assessment {assessment_id}: {e}", exc_info=True)
+            return "failed"
+        assessment = {**assessment, "raw_content": raw_content}
+
     # --- Start: Crawler Integration Logic ---
+    crawl_write: Optional["asyncio.Task[None]"] = None
     trigger_crawler = assessment.get("trigger_crawler", False)
-    # Heuristic check: Does raw_content look like structured JSON from our crawler?
-    # If it doesn't have a known key like 'page_contents', assume it's incomplete.
-    raw_content_is_structured = isinstance(assessment.get("raw_content"), dict) and "page_contents" in assessment.get("raw_content", {})
+    raw_content_is_structured = _raw_content_is_structured(assessment)
 
     logger.info(f"Checking crawler condition for {assessment_id}: trigger_crawler={trigger_crawler}, raw_content_is_structured={raw_content_is_structured}")
 
@@ -143,43 +460,82 @@ async def process_single_assessment(assessment: Dict[str, Any]) -> str:
         if not url:
             error_msg = "URL missing for crawler trigger"
             logger.error(f"Cannot trigger crawler for assessment {assessment_id}: {error_msg}.")
-            # Update status before returning
-            update_assessment_status(assessment_id, "failed", error_message=error_msg)
+            if errors is not None:
+                errors[assessment_id] = error_msg
             return "failed"
 
         try:
             # Run the async crawler function using asyncio.run()
-            structured_raw_content = await crawl_and_prepare_content(url)
+            async with limits.crawl:
+                structured_raw_content = await crawl_and_prepare_content(url)
             # Assuming crawl_and_prepare_content returns None or raises error on failure
             # Check if the crawler returned a valid dictionary
             if not isinstance(structured_raw_content, dict):
                 logger.error(f"Crawler for {url} did not return a valid dictionary. Output: {structured_raw_content}")
                 raise ValueError("Crawler returned unexpected data type")
 
-            # Update the assessment with the structured content
-            logger.info(f"Updating assessment {assessment_id} with crawled content.")
-            update_data = {
-                "raw_content": structured_raw_content,
-                "trigger_crawler": False, # Reset the trigger
-                "crawler_run_at": datetime.now(timezone.utc).isoformat()
-            }
-            response = supabase.table("Assessments").update(update_data).eq("id", assessment_id).execute()
-            logger.debug(f"Supabase update response for crawled content: {response}")
-
-            # Reload assessment data after update
-            response = supabase.table("Assessments").select("*").eq("id", assessment_id).single().execute()
-            assessment = response.data
-            logger.info(f"Re-fetched assessment {assessment_id} after crawler update.")
-            # Re-check if raw_content is now structured after the update
-            raw_content_is_structured = isinstance(assessment.get('raw_content'), dict) and bool(assessment.get('raw_content'))
-            logger.info(f"Re-checking raw_content structure: {raw_content_is_structured}")
+            # Save the structured content in the background while the MCPs run,
+            # and carry on with the crawl result merged into the in-memory row
+            # rather than reading the same row straight back
+            # Guarded by the lease only when the assessment was claimed
+            lease_owner = leases.worker_id if leases else None
+            crawl_write = asyncio.create_task(limits.db_call(store_crawl_result, assessment_id, structured_raw_content, lease_owner))
+            assessment = {**assessment, "raw_content": structured_raw_content, "trigger_crawler": False}
 
         except Exception as e:
             error_msg = f"Error during crawler execution or update for assessment {assessment_id}: {e}"
             logger.error(error_msg, exc_info=True)
-            update_assessment_status(assessment_id, "failed", error_message=error_msg)
+            if errors is not None:
+                errors[assessment_id] = error_msg
             return "failed" # Stop processing if crawler fails
 
+    overall_status = "failed"
+    try:
+        overall_status = await _run_active_mcps(assessment, limits, leases)
+    finally:
+        if crawl_write is not None:
+            # The crawl result must be saved before the final status is recorded
+            try:
+                await crawl_write
+            except Exception as e:
+                logger.error(f"Error saving crawled content for assessment {assessment_id}: {e}", exc_info=True)
+                if errors is not None:
+                    errors[assessment_id] = f"Error updating assessment {assessment_id} with crawled content: {e}"
+                overall_status = "failed"
+    return overall_status
+
+async def _call_mcp_method(method: Callable[..., Any], *args: Any) -> Any:
+    """Calls an MCP method that may be sync or async; sync methods run in a worker thread."""
+    if inspect.iscoroutinefunction(method):
+        return await method(*args)
+    result = await asyncio.to_thread(method, *args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+def _mcp_dependency_cycles(dependencies: Dict[str, List[str]]) -> Set[str]:
+    """Returns the MCPs that cannot run because they sit on (or behind) a dependency cycle."""
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    ready = [name for name, deps in remaining.items() if not deps]
+    while ready:
+        done = ready.pop()
+        for name, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(name)
+    return {name for name, deps in remaining.items() if deps}
+
+async def _run_active_mcps(assessment: Dict[str, Any], limits: StageLimits, leases: Optional[AssessmentLeases] = None) -> str:
+    """
+    Runs every MCP enabled for the assessment and returns the overall status.
+
+    MCPs run as a DAG: each starts as soon as the MCPs it depends_on (per
+    MCP_REGISTRY) have finished, so independent MCPs run concurrently and
+    the assessment takes as long as its longest dependency chain.
+    """
+    assessment_id = assessment.get("id")
+
     # Determine active MCPs based on potentially updated assessment data
     try:
         active_mcps: Dict[str, BaseMCP] = get_active_mcps(assessment)
@@ -193,82 +549,39 @@ async def process_single_assessment(assessment: Dict[str, Any]) -> str:
 
     logger.info(f"Active MCPs for assessment {assessment_id}: {list(active_mcps.keys())}")
 
-    overall_status = "success" # Assume success initially
-    mcp_errors = 0
-
-    # 3. Iterate through active MCPs and execute them
-    for mcp_name, mcp_instance in active_mcps.items():
-        logger.info(f"--- Running MCP: {mcp_name} (v{mcp_instance.version}) for assessment {assessment_id} ---")
-        mcp_output: Optional[MCPOutput] = None
-        payload: Optional[Dict[str, Any]] = None
-        run_error: Optional[str] = None
-
-        try:
-            # a. Build Payload
-            payload = await mcp_instance.build_payload(assessment, [])
-            logger.debug(f"[{mcp_name}] Payload built: {payload}")
-
-            # b. Run MCP - Pass only the payload (use await as run might be async)
-            mcp_output = await mcp_instance.run(payload)
-            logger.debug(f"[{mcp_name}] Raw output: {mcp_output}")
-
-            # Check for errors reported by the MCP itself
-            if mcp_output.get("error"):
-                run_error = mcp_output["error"]
-                logger.error(f"MCP {mcp_name} reported an error: {run_error}")
-                mcp_errors += 1
-
-        except Exception as e:
-            run_error = f"Interpreter error running {mcp_name}: {e}"
-            logger.error(run_error, exc_info=True)
-            mcp_errors += 1
-            # Create a minimal MCPOutput for logging the error
-            mcp_output = MCPOutput(result={}, confidence=None, error=run_error, _db_patch=None, llm_input_prompt=None, llm_raw_output=None, started_at=datetime.now(timezone.utc), completed_at=datetime.now(timezone.utc))
-
-        finally:
-            # c. Log MCP Run (always attempt to log, even on error)
-            if mcp_output is not None:
-                try:
-                    # Extract arguments for log_mcp_run from mcp_output
-                    log_mcp_run(
-                        # assessment_id=assessment_id,
-                        classification_id=assessment_id, # Changed from assessment_id for clarity if needed
-                        mcp_name=mcp_instance.name,
-                        mcp_version=mcp_instance.version,
-                        payload=payload or {}, # Log empty payload if build failed
-                        # Unpack relevant fields from mcp_output
-                        result=mcp_output.get("result"),
-                        confidence=mcp_output.get("confidence"),
-                        error=mcp_output.get("error"), # Use .get() for safety
-                        llm_input_prompt=mcp_output.get("llm_input_prompt"),
-                        llm_raw_output=mcp_output.get("llm_raw_output"),
-                        started_at=mcp_output.get("started_at"), # Pass timestamps if available
-                        completed_at=mcp_output.get("completed_at")
-                        # mcp_output=mcp_output # Removed this incorrect argument
-                    )
-                except Exception as log_e:
-                    logger.error(f"Critical error logging MCP run for {mcp_name}: {log_e}", exc_info=True)
-
-                # d. Apply DB Patch (if available and no critical error occurred during run)
-                # Check if mcp_output exists and if the run itself didn't have a critical exception error
-                if mcp_output.get("_db_patch") and not run_error:
-                    logger.info(f"[{mcp_name}] Attempting to apply database patch...")
-                    try:
-                        patch_applied = handle_mcp_result(mcp_output)
-                        if patch_applied:
-                            logger.info(f"[{mcp_name}] Database patch applied successfully.")
-                        else:
-                            # This case might mean no patch was needed, or handle_mcp_result handled an error internally
-                            logger.info(f"[{mcp_name}] Database patch application finished (or no patch needed/failed internally). Check logs for handle_mcp_result.")
-                    except Exception as patch_e:
-                        logger.error(f"Critical error applying MCP patch for {mcp_name}: {patch_e}", exc_info=True)
-                        # Consider if this error should change overall_status or mcp_errors
-                elif run_error:
-                    logger.warning(f"[{mcp_name}] Skipping database patch application due to MCP run error: {run_error}")
-                else:
-                    logger.info(f"[{mcp_name}] No _db_patch found or MCP output was None. Skipping patch application.")
-
-            logger.info(f"--- Finished MCP: {mcp_name} for assessment {assessment_id} ---")
+    # Dependencies on MCPs that are not active for this assessment are ignored
+    dependencies = {
+        name: [dep for dep in get_mcp_dependencies(name) if dep in active_mcps]
+        for name in active_mcps
+    }
+    blocked = _mcp_dependency_cycles(dependencies)
+    if blocked:
+        logger.error(f"MCP dependency cycle for assessment {assessment_id}; not running: {sorted(blocked)}")
+
+    tasks: Dict[str, "asyncio.Task[Optional[MCPOutput]]"] = {}
+
+    async def run_node(mcp_name: str) -> Optional[MCPOutput]:
+        """Waits for the MCP's dependencies, then runs it. Returns its output, or None on error."""
+        upstream: Dict[str, MCPOutput] = {}
+        for dep in dependencies[mcp_name]:
+            dep_output = await tasks[dep]
+            if dep_output is None:
+                logger.warning(f"[{mcp_name}] Skipped for assessment {assessment_id}: dependency {dep} failed.")
+                return None
+            upstream[dep] = dep_output
+        if leases is not None and assessment_id in leases.lost:
+            logger.warning(f"[{mcp_name}] Skipped for assessment {assessment_id}: lease lost to another worker.")
+            return None
+        # Dependents see upstream outputs under mcp_outputs
+        node_input = {**assessment, "mcp_outputs": upstream} if upstream else assessment
+        return await _run_mcp(mcp_name, active_mcps[mcp_name], node_input, limits, leases)
+
+    for mcp_name in active_mcps:
+        if mcp_name not in blocked:
+            tasks[mcp_name] = asyncio.create_task(run_node(mcp_name))
+    outputs = await asyncio.gather(*tasks.values())
+
+    mcp_errors = len(blocked) + sum(1 for output in outputs if output is None)
 
     # 4. Determine final status
     if mcp_errors == len(active_mcps):
@@ -281,41 +594,309 @@ async def process_single_assessment(assessment: Dict[str, Any]) -> str:
     logger.info(f"Finished processing assessment {assessment_id}. Overall status: {overall_status}")
     return overall_status
 
+async def _run_mcp(
+    mcp_name: str,
+    mcp_instance: BaseMCP,
+    assessment: Dict[str, Any],
+    limits: StageLimits,
+    leases: Optional[AssessmentLeases] = None
+) -> Optional[MCPOutput]:
+    """
+    Builds, runs, logs and applies one MCP under its registry timeout.
+
+    With leases, the patch is only applied if this worker still holds the
+    assessment's lease; otherwise another worker owns it now.
+
+    Returns:
+        The MCP output, or None if the MCP failed
+    """
+    assessment_id = assessment.get("id")
+    timeout = get_mcp_timeout(mcp_name)
+    logger.info(f"--- Running MCP: {mcp_name} (v{mcp_instance.version}) for assessment {assessment_id} ---")
+    mcp_output: Optional[MCPOutput] = None
+    payload: Optional[Dict[str, Any]] = None
+    run_error: Optional[str] = None
+
+    try:
+        # a. Build Payload
+        payload = await asyncio.wait_for(_call_mcp_method(mcp_instance.build_payload, assessment, []), timeout)
+        logger.debug(f"[{mcp_name}] Payload built: {payload}")
+
+        # b. Run MCP - Pass only the payload. The timeout starts once an LLM slot is free.
+        async with limits.llm:
+            mcp_output = await asyncio.wait_for(_call_mcp_method(mcp_instance.run, payload), timeout)
+        logger.debug(f"[{mcp_name}] Raw output: {mcp_output}")
+
+        # Check for errors reported by the MCP itself
+        if mcp_output.get("error"):
+            run_error = mcp_output["error"]
+            logger.error(f"MCP {mcp_name} reported an error: {run_error}")
+
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            run_error = f"Interpreter error running {mcp_name}: timed out after {timeout:.0f}s"
+        else:
+            run_error = f"Interpreter error running {mcp_name}: {e}"
+        logger.error(run_error, exc_info=not isinstance(e, asyncio.TimeoutError))
+        # Create a minimal MCPOutput for logging the error
+        mcp_output = MCPOutput(result={}, confidence=None, error=run_error, _db_patch=None, llm_input_prompt=None, llm_raw_output=None, started_at=datetime.now(timezone.utc), completed_at=datetime.now(timezone.utc))
+
+    # c. Log MCP Run (always attempt to log, even on error)
+    try:
+        # Extract arguments for log_mcp_run from mcp_output
+        await limits.db_call(
+            log_mcp_run,
+            classification_id=assessment_id,
+            mcp_name=mcp_instance.name,
+            mcp_version=mcp_instance.version,
+            payload=payload or {}, # Log empty payload if build failed
+            # Unpack relevant fields from mcp_output
+            result=mcp_output.get("result"),
+            confidence=mcp_output.get("confidence"),
+            error=mcp_output.get("error"), # Use .get() for safety
+            llm_input_prompt=mcp_output.get("llm_input_prompt"),
+            llm_raw_output=mcp_output.get("llm_raw_output"),
+            started_at=mcp_output.get("started_at"), # Pass timestamps if available
+            completed_at=mcp_output.get("completed_at")
+        )
+    except Exception as log_e:
+        logger.error(f"Critical error logging MCP run for {mcp_name}: {log_e}", exc_info=True)
+
+    # d. Apply DB Patch (if available and no error occurred during run)
+    if mcp_output.get("_db_patch") and not run_error and leases is not None and not await _lease_still_held(leases, assessment_id, limits):
+        run_error = f"Lease on assessment {assessment_id} lost to another worker"
+        logger.warning(f"[{mcp_name}] Not applying database patch: {run_error}")
+    elif mcp_output.get("_db_patch") and not run_error:
+        logger.info(f"[{mcp_name}] Attempting to apply database patch...")
+        try:
+            patch_applied = await limits.db_call(handle_mcp_result, mcp_output)
+            if patch_applied:
+                logger.info(f"[{mcp_name}] Database patch applied successfully.")
+            else:
+                # This case might mean no patch was needed, or handle_mcp_result handled an error internally
+                logger.info(f"[{mcp_name}] Database patch application finished (or no patch needed/failed internally). Check logs for handle_mcp_result.")
+        except Exception as patch_e:
+            logger.error(f"Critical error applying MCP patch for {mcp_name}: {patch_e}", exc_info=True)
+    elif run_error:
+        logger.warning(f"[{mcp_name}] Skipping database patch application due to MCP run error: {run_error}")
+    else:
+        logger.info(f"[{mcp_name}] No _db_patch found or MCP output was None. Skipping patch application.")
+
+    logger.info(f"--- Finished MCP: {mcp_name} for assessment {assessment_id} ---")
+    return None if run_error else mcp_output
+
+async def _lease_still_held(leases: AssessmentLeases, assessment_id: str, limits: StageLimits) -> bool:
+    try:
+        return await leases.still_held(assessment_id, limits)
+    except Exception as e:
+        logger.error(f"Error checking the lease on assessment {assessment_id}: {e}", exc_info=True)
+        return False
+
 # --- Main Execution Function ---
 
 async def run_interpreter_batch() -> None:
     """Fetches and processes a batch of assessments."""
     logger.info("Starting LLM interpreter batch run...")
-    assessments_to_process = fetch_assessments_for_llm()
-
-    if not assessments_to_process:
+    try:
+        await _run_batch()
+    finally:
+        # Release warm browsers and HTTP connections so they do not outlive this event loop
+        await shutdown_crawler_resources()
+        await shutdown_llm_clients()
+
+async def _run_batch() -> None:
+    """Claims ready assessments page by page for this worker and processes them, several at a time."""
+    limits = StageLimits()
+    after_id: Optional[str] = None
+    pages = 0
+
+    while pages < INTERPRETER_MAX_PAGES_PER_RUN:
+        assessments_to_process = await limits.db_call(claim_assessments_for_llm, after_id)
+        if not assessments_to_process:
+            break
+        pages += 1
+        after_id = max(assessment["id"] for assessment in assessments_to_process)
+
+        finished: Set[str] = set()
+        leases = AssessmentLeases([a["id"] for a in assessments_to_process if a.get("id")])
+        # Crawling and running a whole page can outlast one lease; keep it renewed meanwhile
+        heartbeat = asyncio.create_task(leases.keep_alive(limits))
+        try:
+            await _process_claimed(assessments_to_process, limits, finished, leases)
+        finally:
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+            # Anything not finished (e.g. the run was interrupted) goes back to the pool now
+            # rather than waiting for its lease to expire
+            unfinished = [a["id"] for a in assessments_to_process if a.get("id") and a["id"] not in finished]
+            if unfinished:
+                await asyncio.to_thread(release_assessment_claims, unfinished)
+
+        if len(assessments_to_process) < INTERPRETER_CLAIM_BATCH_SIZE:
+            break  # Backlog drained
+
+    if pages == 0:
         logger.info("No assessments to process in this batch run.")
-        return
-
-    processed_count = 0
-    failed_count = 0
-    partial_count = 0
 
-    for assessment in assessments_to_process:
-        assessment_id = assessment.get("id", "Unknown ID")
-        logger.info(f"Processing assessment: {assessment_id}")
-        start_time = datetime.now(timezone.utc)
+async def _process_claimed(
+    assessments_to_process: List[Dict[str, Any]],
+    limits: StageLimits,
+    finished: Set[str],
+    leases: Optional[AssessmentLeases] = None
+) -> None:
+    """
+    Processes claimed assessments concurrently, adding each finished id to finished.
+
+    The sites the page needs are batch-crawled together, and each assessment
+    moves on to its MCPs as soon as its own crawl finishes; assessments that
+    need no crawl start straight away.
+    """
+    leases = leases or AssessmentLeases([a["id"] for a in assessments_to_process if a.get("id")])
+    batch_start = time.perf_counter()
+
+    # Why an assessment failed (crawl errors first), recorded with its final status
+    errors: Dict[str, str] = {}
+
+    gate = asyncio.Semaphore(max(1, INTERPRETER_CONCURRENCY))
+
+    async def process_one(assessment: Dict[str, Any]) -> Tuple[str, float]:
+        async with gate:
+            assessment_id = assessment.get("id", "Unknown ID")
+            logger.info(f"Processing assessment: {assessment_id}")
+            start_time = datetime.now(timezone.utc)
+            task_start = time.perf_counter()
+
+            if assessment_id in errors:
+                # Its batch crawl failed
+                await limits.db_call(update_assessment_status, assessment_id, "failed",
+                                     error_message=errors[assessment_id], lease_owner=INTERPRETER_WORKER_ID)
+                finished.add(assessment_id)
+                leases.finish(assessment_id)
+                return "failed", time.perf_counter() - task_start
+
+            if assessment_id in leases.lost:
+                # Another worker has taken it over; leave it and its status alone
+                logger.warning(f"Skipping assessment {assessment_id}: lease lost to another worker.")
+                finished.add(assessment_id)
+                return "failed", time.perf_counter() - task_start
+
+            # Process the assessment using the new MCP-driven logic
+            try:
+                final_status = await process_single_assessment(assessment, limits, leases, errors)
+            except Exception as e:
+                logger.error(f"Unexpected error processing assessment {assessment_id}: {e}", exc_info=True)
+                final_status = "failed"
+
+            # Update the assessment status in Supabase, releasing the claim
+            await limits.db_call(update_assessment_status, assessment_id, final_status,
+                                 processed_at=start_time, error_message=errors.get(assessment_id),
+                                 lease_owner=INTERPRETER_WORKER_ID)
+            finished.add(assessment_id)
+            leases.finish(assessment_id)
+            return final_status, time.perf_counter() - task_start
+
+    tasks: List[Optional["asyncio.Task[Tuple[str, float]]"]] = [None] * len(assessments_to_process)
+    position = {assessment.get("id"): i for i, assessment in enumerate(assessments_to_process)}
+
+    def start(i: int) -> None:
+        if tasks[i] is None:
+            tasks[i] = asyncio.create_task(process_one(assessments_to_process[i]))
+
+    for i, assessment in enumerate(assessments_to_process):
+        if not _batch_crawlable(assessment):
+            start(i)
+    try:
+        await _crawl_pending_sites(assessments_to_process, limits, errors,
+                                   lambda assessment: start(position[assessment["id"]]))
+        for i in range(len(tasks)):
+            start(i)  # In case a result callback failed before starting its assessment
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    except BaseException:
+        started = [task for task in tasks if task is not None]
+        for task in started:
+            task.cancel()
+        await asyncio.gather(*started, return_exceptions=True)
+        raise
+    wall_time = time.perf_counter() - batch_start
+
+    counts = {"success": 0, "partial": 0, "failed": 0}
+    task_time = 0.0
+    for assessment, outcome in zip(assessments_to_process, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"Assessment {assessment.get('id', 'Unknown ID')} aborted: {outcome}")
+            counts["failed"] += 1
+            continue
+        final_status, seconds = outcome
+        counts[final_status if final_status in counts else "failed"] += 1
+        task_time += seconds
 
-        # Process the assessment using the new MCP-driven logic
-        final_status = await process_single_assessment(assessment)
+    logger.info("LLM interpreter batch run finished.")
+    logger.info(f"Summary: Processed={counts['success']}, Partial={counts['partial']}, Failed={counts['failed']}")
+    speedup = task_time / wall_time if wall_time > 0 else 0.0
+    logger.info(
+        f"Batch timing: {len(assessments_to_process)} assessments, wall={wall_time:.2f}s, "
+        f"summed task time={task_time:.2f}s, speedup={speedup:.1f}x "
+        f"(concurrency={INTERPRETER_CONCURRENCY})"
+    )
+
+def _batch_crawlable(assessment: Dict[str, Any]) -> bool:
+    """True when the assessment's site is crawled by _crawl_pending_sites."""
+    return bool(assessment.get("id") and assessment.get("source_url")) and _needs_crawl(assessment)
+
+async def _crawl_pending_sites(
+    assessments: List[Dict[str, Any]],
+    limits: StageLimits,
+    crawl_errors: Dict[str, str],
+    on_crawled: Callable[[Dict[str, Any]], None]
+) -> None:
+    """
+    Batch-crawls the sites of every assessment that still needs crawling.
+
+    Crawled content is saved as each crawl finishes and merged into the
+    assessment dict in place, so process_single_assessment skips the crawl.
+    At most limits.crawl_limit sites are crawled at once.
+
+    Args:
+        assessments: Claimed assessments; those not _batch_crawlable are left alone
+        limits: Stage limits of the batch
+        crawl_errors: Receives the error message per assessment id whose crawl failed
+        on_crawled: Called with each assessment as soon as its crawl has finished
+            (successfully or not)
+    """
+    jobs = [
+        CrawlJob(assessment["id"], assessment["source_url"])
+        for assessment in assessments
+        if _batch_crawlable(assessment)
+    ]
+    if not jobs:
+        return
 
-        # Update the assessment status in Supabase
-        update_assessment_status(assessment_id, final_status, processed_at=start_time)
+    by_id = {assessment.get("id"): assessment for assessment in assessments}
 
-        if final_status == "success":
-            processed_count += 1
-        elif final_status == "partial":
-            partial_count += 1
-        else: # final_status == "failed"
-            failed_count += 1
+    async def on_result(job: CrawlJob) -> None:
+        assessment = by_id[job.assessment_id]
+        try:
+            if not job.succeeded:
+                crawl_errors[job.assessment_id] = (
+                    f"Error during crawler execution for assessment {job.assessment_id}: "
+                    f"{job.error or 'Crawler returned unexpected data type'}"
+                )
+                return
+            try:
+                await limits.db_call(store_crawl_result, job.assessment_id, job.result, INTERPRETER_WORKER_ID)
+            except Exception as e:
+                logger.error(f"Failed to save crawled content for assessment {job.assessment_id}: {e}", exc_info=True)
+                crawl_errors[job.assessment_id] = f"Error updating assessment {job.assessment_id} with crawled content: {e}"
+                return
+            assessment["raw_content"] = job.result
+            assessment["trigger_crawler"] = False
+        finally:
+            on_crawled(assessment)
 
-    logger.info("LLM interpreter batch run finished.")
-    logger.info(f"Summary: Processed={processed_count}, Partial={partial_count}, Failed={failed_count}")
+    await BatchCrawler(max_concurrent_sites=limits.crawl_limit).run(jobs, on_result)
 
 # --- Main entry point for direct execution ---
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""
+Incremental parsing of a JSON object as it streams in from an LLM.
+Top-level fields are reported as soon as their value is complete, and the
+elements of top-level arrays one at a time, without waiting for the rest of
+the response.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# (kind, key, value): ("item", key, element) for each element of a top-level
+# array, then ("field", key, value) once the field's value is complete
+JSONStreamEvent = Tuple[str, str, Any]
+
+# Opening Markdown fence with an optional language tag, e.g. ```json
+_FENCE_REGEX = re.compile(r'`{1,3}[A-Za-z]*')
+
+
+class IncrementalJSONParser:
+    """
+    Scans streamed text for one top-level JSON object.
+
+    The response may open with a Markdown fence (```json); anything after
+    the closing brace is ignored. If the first other character is not "{"
+    (a top-level array, or prose before the JSON), the parser stops and
+    marks the response unsupported, leaving it to be parsed as a whole.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self.unsupported = False
+        self._fence_seen = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._expect_value = False
+        self._value_start: Optional[int] = None
+        # Elements of the top-level array being read, if the current value is one
+        self._items: Optional[List[Any]] = None
+        self._expect_item = False
+        self._item_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[JSONStreamEvent]:
+        """
+        Add the next piece of the response.
+
+        Args:
+            text: Newly received text
+
+        Returns:
+            Events for the fields and array elements completed by this text
+
+        Raises:
+            ValueError: A completed value is not valid JSON
+        """
+        events: List[JSONStreamEvent] = []
+        self._buffer += text
+        buffer = self._buffer
+        while self._pos < len(buffer) and not self.done and not self.unsupported:
+            i = self._pos
+            ch = buffer[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = self._loads(buffer[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if ch.isspace():
+                continue
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                elif ch == "`" and not self._fence_seen:
+                    fence = _FENCE_REGEX.match(buffer, i)
+                    if fence.end() == len(buffer):
+                        self._pos = i  # The fence may continue in the next piece
+                        break
+                    if not fence.group().startswith("```"):
+                        self.unsupported = True
+                        break
+                    self._fence_seen = True
+                    self._pos = fence.end()
+                else:
+                    self.unsupported = True
+                    break
+                continue
+
+            if self._expect_value:
+                self._expect_value = False
+                self._value_start = i
+                if ch == "[":
+                    self._items = []
+                    self._expect_item = True
+                    self._depth += 1
+                    continue
+            elif self._expect_item and self._depth == 2 and ch != "]":
+                self._expect_item = False
+                self._item_start = i
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 2 and self._items is not None:
+                    self._end_item(i, events)
+                if self._depth == 1:
+                    self._end_value(i, events)
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+            elif ch == ",":
+                if self._depth == 2 and self._items is not None:
+                    self._end_item(i, events)
+                    self._expect_item = True
+                elif self._depth == 1:
+                    self._end_value(i, events)
+            elif ch == ":" and self._depth == 1:
+                self._expect_value = True
+        return events
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Return the parsed object.
+
+        Raises:
+            ValueError: The object has not been closed yet
+        """
+        if not self.done:
+            raise ValueError("JSON object is incomplete")
+        return self.fields
+
+    def _end_item(self, end: int, events: List[JSONStreamEvent]) -> None:
+        if self._item_start is None:
+            return
+        item = self._loads(self._buffer[self._item_start:end])
+        self._items.append(item)
+        self._item_start = None
+        events.append(("item", self._key, item))
+
+    def _end_value(self, end: int, events: List[JSONStreamEvent]) -> None:
+        if self._key is None or self._value_start is None:
+            return
+        if self._items is not None:
+            value = self._items  # Already parsed element by element
+        else:
+            value = self._loads(self._buffer[self._value_start:end])
+        self.fields[self._key] = value
+        events.append(("field", self._key, value))
+        self._key = None
+        self._value_start = None
+        self._items = None
+
+    @staticmethod
+    def _loads(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"LLM response was not valid JSON: {e}")
@@ -0,0 +1,248 @@
+"""
+Content-addressed cache of LLM responses.
+Responses are stored in SQLite under a hash of the normalized messages, model
+and generation parameters, so reprocessing an unchanged assessment reuses the
+earlier completion instead of paying for the same call again. Methods block on
+SQLite, so async callers run them with asyncio.to_thread.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(".cache", "tradewizard"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Least recently used responses are evicted once the cache grows past this
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+# Cache hits are recorded in memory and written back in batches of this size
+LLM_CACHE_ACCESS_FLUSH = 100
+
+# Bump when the key layout changes so old entries are never matched
+_KEY_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def llm_cache_key(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    expected_format: str
+) -> str:
+    """
+    Return the cache key for one LLM request.
+
+    Message roles are lowercased and contents stripped of surrounding
+    whitespace, so requests that only differ in formatting share a key.
+    """
+    normalized = {
+        "v": _KEY_VERSION,
+        "messages": [
+            {"role": str(m["role"]).lower(), "content": str(m["content"]).strip()}
+            for m in messages
+        ],
+        "model": model,
+        "temperature": round(float(temperature), 4),
+        "max_tokens": int(max_tokens),
+        "expected_format": expected_format.lower(),
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Size-bounded LRU cache of raw LLM responses backed by SQLite (safe to share across threads)."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_bytes: int = LLM_CACHE_MAX_BYTES
+    ):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite file (defaults to llm_responses.sqlite3 in LLM_CACHE_DIR)
+            ttl_seconds: Maximum age of a response before it is discarded
+            max_bytes: Total compressed size kept before evicting old entries
+        """
+        if path is None:
+            os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+            path = os.path.join(LLM_CACHE_DIR, "llm_responses.sqlite3")
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        # Kept up to date on every write so puts never scan the table
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # key -> accessed_at of hits not yet written back
+        self._pending_access: Dict[str, float] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response, discarding it if it is older than the TTL.
+
+        Args:
+            key: llm_cache_key of the request
+
+        Returns:
+            The raw response text, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, data FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is not None and now - row[0] > self.ttl_seconds:
+                self._delete(key)
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            try:
+                response = zlib.decompress(row[1]).decode("utf-8")
+            except (zlib.error, UnicodeDecodeError) as e:
+                logger.warning(f"Dropping unreadable LLM cache entry {key[:12]}: {e}")
+                self._delete(key)
+                self.misses += 1
+                return None
+
+            self._pending_access[key] = now
+            if len(self._pending_access) >= LLM_CACHE_ACCESS_FLUSH:
+                self._flush_access()
+            self.hits += 1
+            return response
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: llm_cache_key of the request
+            model: Model that produced the response
+            response: Raw response text
+        """
+        data = zlib.compress(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created_at, accessed_at, size, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, now, now, len(data), data)
+            )
+            self._conn.commit()
+            self._pending_access.pop(key, None)
+            self._total_bytes += len(data) - (previous[0] if previous else 0)
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since the cache was opened."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def total_bytes(self) -> int:
+        """Return the total compressed size of all entries."""
+        return self._total_bytes
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._conn.commit()
+        self._pending_access.pop(key, None)
+        if row:
+            self._total_bytes -= row[0]
+
+    def _flush_access(self) -> None:
+        """Write back the access times of recent hits in one transaction."""
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+        )
+        self._conn.commit()
+        self._pending_access.clear()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        excess = self._total_bytes - self.max_bytes
+        if excess <= 0:
+            return
+        # Recent hits must count before choosing what to evict
+        self._flush_access()
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._conn.commit()
+        logger.debug(f"Evicted {len(evicted)} responses from the LLM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access()
+            self._conn.close()
+
+
+# --- Process-wide cache ---
+
+_shared_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide LLM cache, or None when LLM_CACHE_ENABLED is off."""
+    global _shared_cache
+    if _shared_cache is None and LLM_CACHE_ENABLED:
+        _shared_cache = LLMResponseCache()
+    return _shared_cache
+
+
+def set_llm_cache(cache: Optional[LLMResponseCache]) -> None:
+    """Replace the process-wide cache with another backend (any object with get, put and stats)."""
+    global _shared_cache
+    _shared_cache = cache
+
+
+def shutdown_llm_cache() -> None:
+    """Log the hit/miss counters and close the process-wide LLM cache."""
+    global _shared_cache
+    cache, _shared_cache = _shared_cache, None
+    if cache is not None:
+        if cache.hits or cache.misses:
+            logger.info(f"LLM cache: {cache.stats()}")
+        cache.close()
@@ -2,18 +2,154 @@ import os
 import json
 import logging
 import asyncio
-from typing import Dict, Any, Optional, List, Union
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Any, NamedTuple, Optional, List, Tuple, Union
 
+import httpx
 import openai
 from openai import AsyncOpenAI, OpenAIError, RateLimitError, APITimeoutError, APIConnectionError, APIStatusError
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, retry_if_exception, retry_any
 from dotenv import load_dotenv
 
+from .json_stream import IncrementalJSONParser
+from .llm_cache import get_llm_cache, llm_cache_key, shutdown_llm_cache
+from .rate_limiter import estimate_prompt_tokens, get_rate_limiter, rate_limiter_stats
+
 logger = logging.getLogger(__name__)
 
 # --- Load Environment Variables ---
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Skip cached responses and regenerate (responses are still written back to the cache)
+LLM_CACHE_FORCE_REFRESH = os.getenv("LLM_CACHE_FORCE_REFRESH", "false").lower() in ("1", "true", "yes")
+
+# --- Connection Pool Configuration ---
+# Connections open to the API at once, across every concurrent call
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+# Idle connections kept warm for the next call, and how long they stay open
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120"))
+# Per-call latency samples kept for the metrics summary
+LLM_METRICS_WINDOW = int(os.getenv("LLM_METRICS_WINDOW", "1000"))
+
+
+class LLMCallMetrics:
+    """Latency of recent LLM calls, split by whether the pooled client was already warm."""
+
+    def __init__(self, window: int = LLM_METRICS_WINDOW):
+        self._calls: Deque[Tuple[str, float, bool, bool, Optional[float]]] = deque(maxlen=window)
+
+    def record(self, model: str, seconds: float, warm: bool, ok: bool,
+               first_token_seconds: Optional[float] = None) -> None:
+        """
+        Record one API call.
+
+        Args:
+            model: Model called
+            seconds: Wall time of the request (to the end of the stream for streamed calls)
+            warm: The client had completed a request before (a kept-alive connection was likely reused)
+            ok: The call succeeded
+            first_token_seconds: Time to the first content token, for streamed calls
+        """
+        self._calls.append((model, seconds, warm, ok, first_token_seconds))
+
+    def summary(self) -> Dict[str, Any]:
+        """Call counts and mean/p95 latency, overall and for cold vs warm clients."""
+        def stats(latencies: List[float]) -> Dict[str, Any]:
+            if not latencies:
+                return {"calls": 0}
+            ordered = sorted(latencies)
+            return {
+                "calls": len(ordered),
+                "mean_seconds": round(sum(ordered) / len(ordered), 3),
+                "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            }
+
+        return {
+            "all": stats([seconds for _, seconds, _, _, _ in self._calls]),
+            "cold": stats([seconds for _, seconds, warm, _, _ in self._calls if not warm]),
+            "warm": stats([seconds for _, seconds, warm, _, _ in self._calls if warm]),
+            "first_token": stats([first for *_, first in self._calls if first is not None]),
+            "errors": sum(1 for _, _, _, ok, _ in self._calls if not ok),
+        }
+
+    def reset(self) -> None:
+        self._calls.clear()
+
+
+llm_metrics = LLMCallMetrics()
+
+
+class _PooledClient:
+    """An AsyncOpenAI client on its own httpx connection pool, bound to one event loop."""
+
+    def __init__(self, api_key: str, base_url: Optional[str]):
+        self.loop = asyncio.get_running_loop()
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=OPENAI_TIMEOUT_SECONDS,
+        )
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client)
+        self.completed_requests = 0
+
+    async def close(self) -> None:
+        await self.client.close()  # Closes the httpx client and its pooled connections
+
+
+# One pooled client per (api_key, base_url); connections belong to the loop that opened them
+_clients: Dict[Tuple[str, Optional[str]], _PooledClient] = {}
+
+
+def _get_pooled_client(api_key: str, base_url: Optional[str] = None) -> _PooledClient:
+    key = (api_key, base_url)
+    pooled = _clients.get(key)
+    if pooled is not None and pooled.loop is not asyncio.get_running_loop():
+        # Left over from an earlier event loop that was not shut down; its
+        # connections cannot be used (or cleanly closed) from this loop
+        logger.warning("Discarding OpenAI client from a previous event loop; call shutdown_llm_clients() when a run ends.")
+        pooled = None
+    if pooled is None:
+        pooled = _PooledClient(api_key, base_url)
+        _clients[key] = pooled
+        logger.info(f"Created pooled OpenAI client (max_connections={OPENAI_MAX_CONNECTIONS}, keepalive={OPENAI_MAX_KEEPALIVE_CONNECTIONS})")
+    return pooled
+
+
+def get_llm_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Return the shared AsyncOpenAI client for this event loop.
+
+    Args:
+        api_key: API key (defaults to OPENAI_API_KEY)
+        base_url: Optional API base URL
+
+    Returns:
+        A client whose connection pool is reused by every call
+    """
+    return _get_pooled_client(api_key or OPENAI_API_KEY, base_url).client
+
+
+async def shutdown_llm_clients() -> None:
+    """Close every pooled client and log the latency metrics. Call before the event loop ends."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for pooled in clients:
+        try:
+            if pooled.loop is asyncio.get_running_loop():
+                await pooled.close()
+        except Exception as e:
+            logger.warning(f"Error closing OpenAI client: {e}")
+    summary = llm_metrics.summary()
+    if summary["all"]["calls"]:
+        logger.info(f"LLM call latency: {summary}")
+        logger.info(f"LLM rate limits: {rate_limiter_stats()}")
+    shutdown_llm_cache()
 
 # --- Retry Configuration --- 
 # Retry on specific transient OpenAI errors or 5xx server errors.
@@ -37,6 +173,48 @@ retry_config = retry(
     reraise=True # Reraise the exception if all retries fail
 )
 
+def _format_response(raw_response: str, expected_format: str) -> Any:
+    """Returns the response text as is, or parsed when expected_format is 'json'."""
+    if expected_format.lower() == 'json':
+        # Clean the response: remove potential markdown fences and strip whitespace
+        cleaned_response = raw_response.strip()
+        if cleaned_response.startswith("```json") and cleaned_response.endswith("```"):
+            cleaned_response = cleaned_response[7:-3].strip() # Remove ```json and ```
+        elif cleaned_response.startswith("```") and cleaned_response.endswith("```"):
+             # Handle cases where it might just be ``` ... ``` without 'json' specified
+             cleaned_response = cleaned_response[3:-3].strip()
+
+        try:
+            parsed_json = json.loads(cleaned_response) # Parse the cleaned response
+            logger.info("Successfully parsed LLM response as JSON.")
+            return parsed_json
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM response as JSON after cleaning. Error: {e}. Cleaned response snippet: {cleaned_response[:500]}")
+            # Option 1: Raise an error
+            raise ValueError(f"LLM response was not valid JSON: {e}")
+            # Option 2: Return the raw string as fallback (less strict)
+            # return raw_response 
+    else: # expected_format == 'text' or other
+        return raw_response
+
+def _build_messages(prompt: Union[str, List[Dict[str, str]]], system_prompt: Optional[str]) -> List[Dict[str, str]]:
+    """Turns a prompt string or message list, plus an optional system prompt, into chat messages."""
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    
+    if isinstance(prompt, str):
+        messages.append({"role": "user", "content": prompt})
+    elif isinstance(prompt, list):
+        # Assume prompt is already a list of message dicts
+        # Basic validation: check if it's a list of dicts with 'role' and 'content'
+        if not all(isinstance(m, dict) and 'role' in m and 'content' in m for m in prompt):
+            raise ValueError("Invalid format for 'prompt' list. Expected list of {'role': str, 'content': str}.")
+        messages.extend(prompt)
+    else:
+        raise TypeError("Invalid 'prompt' type. Expected str or List[Dict[str, str]].")
+    return messages
+
 # --- LLM Client Function --- 
 @retry_config
 async def call_llm(
@@ -45,7 +223,8 @@ async def call_llm(
     model: str = "gpt-4-1106-preview",
     expected_format: str = "text", # Can be 'text' or 'json'
     temperature: float = 0.2,
-    max_tokens: int = 2048
+    max_tokens: int = 2048,
+    force_refresh: Optional[bool] = None
 ) -> Any: # Returns str or Dict depending on expected_format
     """Calls the OpenAI API with retry logic and handles response formatting.
 
@@ -56,6 +235,7 @@ async def call_llm(
         expected_format: 'text' to return raw string, 'json' to parse.
         temperature: The generation temperature.
         max_tokens: The maximum number of tokens to generate.
+        force_refresh: Bypass the response cache and call the API (defaults to LLM_CACHE_FORCE_REFRESH).
 
     Returns:
         The raw text response or a parsed JSON dictionary, or raises an error.
@@ -65,39 +245,56 @@ async def call_llm(
         raise ValueError("OpenAI API key is not configured.")
 
     try:
-        client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        pooled = _get_pooled_client(OPENAI_API_KEY)
     except Exception as e:
         logger.error(f"Failed to initialize OpenAI client: {e}", exc_info=True)
         raise
 
-    # --- Construct Messages --- 
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    
-    if isinstance(prompt, str):
-        messages.append({"role": "user", "content": prompt})
-    elif isinstance(prompt, list):
-        # Assume prompt is already a list of message dicts
-        # Basic validation: check if it's a list of dicts with 'role' and 'content'
-        if not all(isinstance(m, dict) and 'role' in m and 'content' in m for m in prompt):
-            raise ValueError("Invalid format for 'prompt' list. Expected list of {'role': str, 'content': str}.")
-        messages.extend(prompt)
-    else:
-        raise TypeError("Invalid 'prompt' type. Expected str or List[Dict[str, str]].")
+    messages = _build_messages(prompt, system_prompt)
+
+    # --- Response Cache ---
+    if force_refresh is None:
+        force_refresh = LLM_CACHE_FORCE_REFRESH
+    cache = get_llm_cache()
+    cache_key = llm_cache_key(messages, model, temperature, max_tokens, expected_format) if cache is not None else None
+    if cache is not None and not force_refresh:
+        cached_response = await asyncio.to_thread(cache.get, cache_key)
+        if cached_response is not None:
+            logger.info(f"Using cached response for model '{model}' (key {cache_key[:12]}).")
+            return _format_response(cached_response, expected_format)
 
     prompt_log_snippet = json.dumps(messages)[:1000] # Truncate for logging
     logger.info(f"Calling OpenAI model '{model}' with prompt (truncated): {prompt_log_snippet}...")
 
     try:
-        completion = await client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            # response_format={"type": "json_object"} # Use only if guaranteed JSON needed and model supports
-        )
-        
+        # Wait for room under the model's RPM/TPM quota. OpenAI counts max_tokens
+        # against TPM up front, so it is part of the request's cost.
+        limiter = get_rate_limiter(model)
+        await limiter.acquire(estimate_prompt_tokens(messages, model) + max_tokens)
+
+        warm = pooled.completed_requests > 0
+        started = time.perf_counter()
+        try:
+            raw = await pooled.client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                # response_format={"type": "json_object"} # Use only if guaranteed JSON needed and model supports
+            )
+        except Exception as e:
+            llm_metrics.record(model, time.perf_counter() - started, warm, ok=False)
+            if isinstance(e, APIStatusError):
+                # A 429 carries the exhausted quota and its reset time
+                limiter.update_from_headers(e.response.headers)
+            raise
+        limiter.update_from_headers(raw.headers)
+        completion = raw.parse()
+        latency = time.perf_counter() - started
+        pooled.completed_requests += 1
+        llm_metrics.record(model, latency, warm, ok=True)
+        logger.info(f"OpenAI call to '{model}' took {latency:.2f}s ({'warm' if warm else 'cold'} client)")
+
         raw_response = completion.choices[0].message.content
         response_log_snippet = (raw_response or "")[:1000] # Truncate
         logger.info(f"Received raw response from {model} (truncated): {response_log_snippet}")
@@ -107,28 +304,11 @@ async def call_llm(
              # Decide behavior: return None, empty string, or raise error?
              return None # Returning None for empty response
 
-        # --- Handle Expected Format --- 
-        if expected_format.lower() == 'json':
-            # Clean the response: remove potential markdown fences and strip whitespace
-            cleaned_response = raw_response.strip()
-            if cleaned_response.startswith("```json") and cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[7:-3].strip() # Remove ```json and ```
-            elif cleaned_response.startswith("```") and cleaned_response.endswith("```"):
-                 # Handle cases where it might just be ``` ... ``` without 'json' specified
-                 cleaned_response = cleaned_response[3:-3].strip()
-
-            try:
-                parsed_json = json.loads(cleaned_response) # Parse the cleaned response
-                logger.info("Successfully parsed LLM response as JSON.")
-                return parsed_json
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON after cleaning. Error: {e}. Cleaned response snippet: {cleaned_response[:500]}")
-                # Option 1: Raise an error
-                raise ValueError(f"LLM response was not valid JSON: {e}")
-                # Option 2: Return the raw string as fallback (less strict)
-                # return raw_response 
-        else: # expected_format == 'text' or other
-            return raw_response
+        formatted = _format_response(raw_response, expected_format)
+        if cache is not None:
+            # Only responses that formatted cleanly are worth replaying
+            await asyncio.to_thread(cache.put, cache_key, model, raw_response)
+        return formatted
 
     except OpenAIError as e:
         # This will be caught by tenacity for retries if applicable,
@@ -139,6 +319,143 @@ async def call_llm(
         logger.error(f"Unexpected error during LLM call: {type(e).__name__}: {e}", exc_info=True)
         raise # Re-raise other exceptions
 
+# --- Streaming --- 
+class LLMStreamEvent(NamedTuple):
+    """
+    One event from stream_llm.
+
+    type is "delta" (text holds the new text), "field" (a top-level JSON
+    field is complete), "item" (one element of a top-level JSON array, e.g.
+    a single product) or "done" (value holds the full formatted response).
+    """
+    type: str
+    text: str = ""
+    key: Optional[str] = None
+    value: Any = None
+
+
+def _delta_events(text: str, parser: Optional[IncrementalJSONParser]) -> List[LLMStreamEvent]:
+    events = [LLMStreamEvent("delta", text=text)]
+    if parser is not None:
+        events.extend(LLMStreamEvent(kind, key=key, value=value) for kind, key, value in parser.feed(text))
+    return events
+
+
+@retry_config
+async def _open_stream(pooled: _PooledClient, messages: List[Dict[str, str]], model: str,
+                       temperature: float, max_tokens: int) -> Tuple[Any, float, bool]:
+    """Waits for rate-limit room and starts a streamed completion; retried like call_llm until the stream opens."""
+    limiter = get_rate_limiter(model)
+    await limiter.acquire(estimate_prompt_tokens(messages, model) + max_tokens)
+
+    warm = pooled.completed_requests > 0
+    started = time.perf_counter()
+    try:
+        raw = await pooled.client.chat.completions.with_raw_response.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+    except Exception as e:
+        llm_metrics.record(model, time.perf_counter() - started, warm, ok=False)
+        if isinstance(e, APIStatusError):
+            limiter.update_from_headers(e.response.headers)
+        raise
+    limiter.update_from_headers(raw.headers)
+    return raw.parse(), started, warm
+
+
+async def stream_llm(
+    prompt: Union[str, List[Dict[str, str]]],
+    system_prompt: Optional[str] = None,
+    model: str = "gpt-4-1106-preview",
+    expected_format: str = "text", # Can be 'text' or 'json'
+    temperature: float = 0.2,
+    max_tokens: int = 2048,
+    force_refresh: Optional[bool] = None
+) -> AsyncIterator[LLMStreamEvent]:
+    """Streams an OpenAI completion, parsing JSON responses as they arrive.
+
+    Takes the same arguments as call_llm. Opening the stream is retried like
+    call_llm; an error after text has been yielded is raised to the caller.
+    Cached responses are replayed as a single delta.
+
+    Args:
+        prompt: The main user prompt (string) or a list of message dicts.
+        system_prompt: An optional system message string.
+        model: The OpenAI model to use.
+        expected_format: 'text' for deltas only, 'json' to also emit fields and array items as they complete.
+        temperature: The generation temperature.
+        max_tokens: The maximum number of tokens to generate.
+        force_refresh: Bypass the response cache and call the API (defaults to LLM_CACHE_FORCE_REFRESH).
+
+    Yields:
+        LLMStreamEvent objects, ending with a "done" event holding what call_llm would return.
+    """
+    if not OPENAI_API_KEY:
+        logger.error("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+        raise ValueError("OpenAI API key is not configured.")
+
+    pooled = _get_pooled_client(OPENAI_API_KEY)
+    messages = _build_messages(prompt, system_prompt)
+    parser = IncrementalJSONParser() if expected_format.lower() == 'json' else None
+
+    if force_refresh is None:
+        force_refresh = LLM_CACHE_FORCE_REFRESH
+    cache = get_llm_cache()
+    cache_key = llm_cache_key(messages, model, temperature, max_tokens, expected_format) if cache is not None else None
+    if cache is not None and not force_refresh:
+        cached_response = await asyncio.to_thread(cache.get, cache_key)
+        if cached_response is not None:
+            logger.info(f"Replaying cached response for model '{model}' (key {cache_key[:12]}).")
+            for event in _delta_events(cached_response, parser):
+                yield event
+            yield LLMStreamEvent("done", value=_format_response(cached_response, expected_format))
+            return
+
+    logger.info(f"Streaming OpenAI model '{model}' with prompt (truncated): {json.dumps(messages)[:1000]}...")
+    stream, started, warm = await _open_stream(pooled, messages, model, temperature, max_tokens)
+    parts = []
+    first_token = None
+    ok = False
+    try:
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            parts.append(delta)
+            for event in _delta_events(delta, parser):
+                yield event
+        ok = True
+    except OpenAIError as e:
+        logger.error(f"OpenAI stream from '{model}' failed: {type(e).__name__}: {e}", exc_info=True)
+        raise
+    finally:
+        await stream.close()
+        latency = time.perf_counter() - started
+        llm_metrics.record(model, latency, warm, ok, first_token_seconds=first_token)
+
+    pooled.completed_requests += 1
+    first_token_log = f"{first_token:.2f}s" if first_token is not None else "n/a"
+    logger.info(f"OpenAI stream from '{model}' took {latency:.2f}s, first token after {first_token_log} ({'warm' if warm else 'cold'} client)")
+
+    raw_response = "".join(parts)
+    if not raw_response:
+        logger.warning(f"LLM model '{model}' returned an empty response.")
+        yield LLMStreamEvent("done", value=None)
+        return
+
+    # The whole response is validated exactly as call_llm does, so only responses
+    # call_llm would accept are cached (both share the cache key)
+    formatted = _format_response(raw_response, expected_format)
+    if cache is not None:
+        await asyncio.to_thread(cache.put, cache_key, model, raw_response)
+    yield LLMStreamEvent("done", value=formatted)
+
 # --- Example Usage (for testing) --- 
 async def _test_call_llm():
     logging.basicConfig(level=logging.INFO)
@@ -168,6 +485,8 @@ async def _test_call_llm():
     except Exception as e:
         print(f"\n--- Test Failed --- ")
         print(f"Error: {e}")
+    finally:
+        await shutdown_llm_clients()
 
 if __name__ == "__main__":
     # To run this test: python -m src.llm_interpreter.llm_client
@@ -5,6 +5,8 @@ import json
 import logging
 from typing import Dict, Any, List, Optional
 
+from src.utils.contact_scanner import scan_contacts, social_platform
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -157,20 +159,13 @@ def extract_contacts(assessment: Dict[str, Any], mcp_outputs: Dict[str, Dict[str
     try:
         content_json = json.loads(raw_content)
         if isinstance(content_json, dict) and "mainContent" in content_json:
-            # Very basic extraction - in production this would use regex or NLP
-            main_content = content_json["mainContent"]
+            # Same single-pass scanner as the crawlers; phones come back in E.164
+            found = scan_contacts(content_json["mainContent"])
             contacts = {}
-            
-            # Simple email extraction
-            import re
-            email_match = re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', main_content)
-            if email_match:
-                contacts["email"] = email_match.group(0)
-            
-            # Simple phone extraction (very basic)
-            phone_match = re.search(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', main_content)
-            if phone_match:
-                contacts["phone"] = phone_match.group(0)
+            if found["emails"]:
+                contacts["email"] = found["emails"][0]
+            if found["phones"]:
+                contacts["phone"] = found["phones"][0]
             
             return contacts if contacts else None
     except (json.JSONDecodeError, TypeError):
@@ -185,22 +180,11 @@ def extract_social_links(assessment: Dict[str, Any]) -> Optional[Dict[str, str]]
     try:
         content_json = json.loads(raw_content)
         if isinstance(content_json, dict) and "mainContent" in content_json:
-            main_content = content_json["mainContent"]
             social_links = {}
             
-            # Simple extraction of common social media links
-            import re
-            facebook_match = re.search(r'facebook\.com/[\w.-]+', main_content)
-            if facebook_match:
-                social_links["facebook"] = f"https://www.{facebook_match.group(0)}"
-            
-            instagram_match = re.search(r'instagram\.com/[\w.-]+', main_content)
-            if instagram_match:
-                social_links["instagram"] = f"https://www.{instagram_match.group(0)}"
-            
-            twitter_match = re.search(r'twitter\.com/[\w.-]+', main_content)
-            if twitter_match:
-                social_links["twitter"] = f"https://www.{twitter_match.group(0)}"
+            # First link per platform, keyed by its name (facebook, instagram, ...)
+            for link in scan_contacts(content_json["mainContent"])["social_links"]:
+                social_links.setdefault(social_platform(link), link)
             
             return social_links if social_links else None
     except (json.JSONDecodeError, TypeError):
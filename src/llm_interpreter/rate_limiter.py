@@ -0,0 +1,204 @@
+"""
+Proactive OpenAI rate limiting.
+Each model gets a requests-per-minute and a tokens-per-minute token bucket;
+callers wait their turn in FIFO order until both buckets can cover the
+request, and the buckets are re-synced from the x-ratelimit-* response
+headers so throughput stays just under quota instead of tripping 429s.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from .tokens import count_message_tokens
+
+logger = logging.getLogger(__name__)
+
+# Quota assumed for a model until its first response reports the real limits
+OPENAI_DEFAULT_RPM = int(os.getenv("OPENAI_DEFAULT_RPM", "500"))
+OPENAI_DEFAULT_TPM = int(os.getenv("OPENAI_DEFAULT_TPM", "30000"))
+# Per-model overrides, e.g. {"gpt-4-turbo-preview": {"rpm": 500, "tpm": 150000}}
+OPENAI_RATE_LIMITS = json.loads(os.getenv("OPENAI_RATE_LIMITS", "{}"))
+# Share of the quota the limiter lets through, leaving room for other clients and estimate error
+OPENAI_RATE_LIMIT_HEADROOM = float(os.getenv("OPENAI_RATE_LIMIT_HEADROOM", "0.9"))
+
+_DURATION_PART_REGEX = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, str]], model: Optional[str] = None) -> int:
+    """Estimate the prompt tokens of a chat request with the local tokenizer."""
+    return count_message_tokens(messages, model)
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse an x-ratelimit-reset-* value such as "1s", "6m0s" or "120ms" into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART_REGEX.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """A bucket refilled continuously to its per-minute capacity."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute)
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / 60.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken (amounts above capacity wait for a full bucket)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.refill_per_second)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def set_capacity(self, per_minute: float) -> None:
+        self._refill()
+        self.capacity = max(1.0, per_minute)
+        self.available = min(self.available, self.capacity)
+
+    def sync(self, remaining: float, reset_seconds: Optional[float] = None) -> None:
+        """
+        Align with the server's view of the quota.
+
+        Args:
+            remaining: Units left according to the server (after headroom)
+            reset_seconds: Time until the server's window is full again
+        """
+        self._refill()
+        if remaining <= 0 and reset_seconds is not None:
+            # Used up on the server: hold off until its reset
+            self.available = -reset_seconds * self.refill_per_second
+        else:
+            self.available = min(self.available, remaining)
+
+
+class ModelRateLimiter:
+    """Requests- and tokens-per-minute limits for one model, with a fair queue."""
+
+    def __init__(self, model: str, rpm: int, tpm: int, headroom: float = OPENAI_RATE_LIMIT_HEADROOM):
+        self.model = model
+        self.headroom = headroom
+        self.requests = TokenBucket(rpm * headroom)
+        self.tokens = TokenBucket(tpm * headroom)
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _queue(self) -> asyncio.Lock:
+        # asyncio.Lock wakes waiters in arrival order, which makes it the fair queue.
+        # One lock per event loop, since the scheduler starts a new loop each run.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait until one request of the given size fits under both limits, then take it.
+
+        Args:
+            tokens: Estimated prompt tokens plus max_tokens
+
+        Returns:
+            Seconds spent waiting
+        """
+        started = time.monotonic()
+        async with self._queue():
+            # Only the head of the queue sleeps; everyone else waits behind it in order
+            while True:
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+        waited = time.monotonic() - started
+        if waited > 0.01:
+            self.waits += 1
+            self.wait_seconds += waited
+            logger.debug(f"Rate limiter held a {tokens}-token request to {self.model} for {waited:.2f}s")
+        return waited
+
+    def update_from_headers(self, headers: Mapping[str, Any]) -> None:
+        """
+        Re-sync both buckets from x-ratelimit-* response headers.
+
+        Args:
+            headers: Response headers (case-insensitive mapping, e.g. httpx.Headers)
+        """
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = _header_number(headers, f"x-ratelimit-limit-{kind}")
+            remaining = _header_number(headers, f"x-ratelimit-remaining-{kind}")
+            reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if limit:
+                bucket.set_capacity(limit * self.headroom)
+                if remaining is not None:
+                    # Keep the headroom share of the quota unused
+                    bucket.sync(remaining - limit * (1 - self.headroom), reset)
+            elif remaining is not None:
+                bucket.sync(remaining, reset)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm": round(self.requests.capacity),
+            "tpm": round(self.tokens.capacity),
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 2),
+        }
+
+
+def _header_number(headers: Mapping[str, Any], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Process-wide limiters, shared by every concurrent caller ---
+
+_limiters: Dict[str, ModelRateLimiter] = {}
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+    """Return the rate limiter for a model, creating it with the configured quota."""
+    limiter = _limiters.get(model)
+    if limiter is None:
+        limits = OPENAI_RATE_LIMITS.get(model, {})
+        limiter = ModelRateLimiter(
+            model,
+            rpm=int(limits.get("rpm", OPENAI_DEFAULT_RPM)),
+            tpm=int(limits.get("tpm", OPENAI_DEFAULT_TPM))
+        )
+        _limiters[model] = limiter
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Current limits and time spent waiting, per model."""
+    return {model: limiter.stats() for model, limiter in _limiters.items()}
@@ -13,6 +13,8 @@ import asyncio
 # Import the interpreter module and output formatter using relative imports
 from .interpreter import process_single_assessment, update_assessment_status, fetch_assessments_for_llm
 from .output_formatter import format_mcp_results
+from scrapers.crawler_integration import shutdown_crawler_resources  # src/ is on sys.path via the interpreter module
+from llm_interpreter.llm_client import shutdown_llm_clients  # Module name the MCPs use
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -187,8 +189,16 @@ if __name__ == "__main__":
         sys.exit(1)
     
     assessment_id = sys.argv[1]
+    async def main() -> bool:
+        try:
+            return await run_single_assessment(assessment_id)
+        finally:
+            # Close warm browsers and HTTP connections before the event loop goes away
+            await shutdown_crawler_resources()
+            await shutdown_llm_clients()
+
     # Run the async function using asyncio.run
-    success = asyncio.run(run_single_assessment(assessment_id))
+    success = asyncio.run(main())
     
     # Exit with appropriate status code
     sys.exit(0 if success else 1)
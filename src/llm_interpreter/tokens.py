@@ -0,0 +1,86 @@
+"""
+Local token counting for LLM prompts.
+Uses tiktoken when it is installed; otherwise falls back to a character-based
+estimate, which is close enough for budgeting English text and JSON.
+"""
+
+import logging
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; budgets then use the estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English text and JSON
+CHARS_PER_TOKEN = 4
+# Per-message overhead of the chat format
+TOKENS_PER_MESSAGE = 4
+# Encoding used for models tiktoken does not know
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]) -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:  # e.g. the encoding file cannot be downloaded
+        logger.warning(f"tiktoken unavailable ({e}); estimating token counts from characters")
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of a piece of text.
+
+    Args:
+        text: Text to count
+        model: Model whose tokenizer to use (a generic encoding if omitted)
+
+    Returns:
+        Exact count with tiktoken, else an estimate
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: Optional[str] = None) -> int:
+    """Count the prompt tokens of a chat request."""
+    return sum(TOKENS_PER_MESSAGE + count_tokens(str(m.get("content", "")), model) for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    Cut text down to at most max_tokens, preferring to end at a word boundary.
+
+    Args:
+        text: Text to cut
+        max_tokens: Token allowance
+        model: Model whose tokenizer to use
+
+    Returns:
+        The text, or its longest prefix that fits
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        cut = text[:max_tokens * CHARS_PER_TOKEN]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
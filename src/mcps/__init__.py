@@ -20,7 +20,7 @@ from .hscode import HSCodeMCP
 from .helpers import log_mcp_run, handle_mcp_result
 
 # Import registry
-from .registry import MCP_REGISTRY, get_active_mcps
+from .registry import MCP_REGISTRY, get_active_mcps, get_mcp_dependencies, get_mcp_input_columns, get_mcp_timeout
 
 # --- MCP Registration ---
 # Explicitly register available MCP classes
@@ -41,5 +41,8 @@ __all__ = [
     "handle_mcp_result",
     "MCP_REGISTRY",
     "get_active_mcps",
+    "get_mcp_dependencies",
+    "get_mcp_input_columns",
+    "get_mcp_timeout",
     "REGISTERED_MCPS"
 ]
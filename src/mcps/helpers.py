@@ -6,6 +6,7 @@ import os
 from typing import Optional, Dict, Any
 from supabase import Client, create_client
 from .base import MCPOutput # Import MCPOutput for type hinting
+from llm_interpreter.tokens import count_tokens
 
 # --- Supabase client initialization at module level ---
 supabase_url: Optional[str] = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
@@ -179,10 +180,14 @@ def handle_mcp_result(mcp_output: MCPOutput) -> bool:
 
     return success # Return whether patch application was attempted
 
-# Placeholder for future prompt templating helpers
-# def format_prompt(template: str, context: dict) -> str:
-#     ...
+def format_prompt(template: str, context: Dict[str, Any]) -> str:
+    """Fills {placeholders} in a prompt template; placeholders missing from context are left as is."""
+    class _KeepMissing(dict):
+        def __missing__(self, key: str) -> str:
+            return "{" + key + "}"
 
-# Placeholder for token budgeting helpers
-# def check_token_limit(text: str, limit: int) -> bool:
-#     ...
+    return template.format_map(_KeepMissing(context))
+
+def check_token_limit(text: str, limit: int, model: Optional[str] = None) -> bool:
+    """Returns True if text fits in limit tokens for the model (tiktoken when installed, else an estimate)."""
+    return count_tokens(text, model) <= limit
@@ -1,4 +1,5 @@
-from typing import Dict, Any, Callable, TYPE_CHECKING, TypedDict
+import os
+from typing import Dict, Any, Callable, List, TYPE_CHECKING, TypedDict
 from .compliance import ComplianceMCP
 from .hscode import HSCodeMCP
 from .website_analysis import WebsiteAnalysisMCP
@@ -6,11 +7,23 @@ from .website_analysis import WebsiteAnalysisMCP
 if TYPE_CHECKING:
     from .base import BaseMCP # Avoid circular import
 
+# Seconds an MCP's build_payload or run may take when its entry sets no timeout
+MCP_DEFAULT_TIMEOUT_SECONDS = float(os.getenv("MCP_DEFAULT_TIMEOUT_SECONDS", "120"))
+
 # Define the structure for the registry value
-class MCPRegistryEntry(TypedDict):
+class _MCPRegistryEntryRequired(TypedDict):
     mcp_class: "BaseMCP"
     enabled_if: Callable[[Dict[str, Any]], bool]
 
+class MCPRegistryEntry(_MCPRegistryEntryRequired, total=False):
+    # Registry names of MCPs whose outputs this one reads (from assessment["mcp_outputs"]);
+    # it starts once they finish. MCPs with no dependency between them run concurrently.
+    depends_on: List[str]
+    # Seconds allowed for each of build_payload and run (default MCP_DEFAULT_TIMEOUT_SECONDS)
+    timeout: float
+    # Assessments columns enabled_if reads; the interpreter selects them when it plans a batch
+    reads: List[str]
+
 # MCP Registry
 MCP_REGISTRY: Dict[str, MCPRegistryEntry] = {
     "WebsiteAnalysisMCP": {
@@ -18,19 +31,28 @@ MCP_REGISTRY: Dict[str, MCPRegistryEntry] = {
         # Enable if assessment is marked llm_ready and has structured raw_content
         "enabled_if": lambda assessment: assessment.get("llm_ready", False) and \
                          isinstance(assessment.get("raw_content"), dict) and \
-                         "aggregated_products" in assessment.get("raw_content", {})
+                         "aggregated_products" in assessment.get("raw_content", {}),
+        "reads": ["llm_ready", "raw_content"],
+        "depends_on": [],
+        "timeout": 180.0  # One large-prompt LLM call plus its retries
     },
     "ComplianceMCP": {
         "mcp_class": ComplianceMCP(),
         # Example: Enable if status requires compliance check or is in final review
         # TODO: Update this based on actual workflow status fields
-        "enabled_if": lambda classification: classification.get("status") in ["compliance", "review"]
+        "enabled_if": lambda classification: classification.get("status") in ["compliance", "review"],
+        "reads": ["status"],
+        "depends_on": [],
+        "timeout": 60.0
     },
     "HSCodeMCP": {
         "mcp_class": HSCodeMCP(),
         # Example: Enable if status requires HS coding or is in final review
         # TODO: Update this based on actual workflow status fields
-        "enabled_if": lambda classification: classification.get("status") in ["hs_coding", "review"]
+        "enabled_if": lambda classification: classification.get("status") in ["hs_coding", "review"],
+        "reads": ["status"],
+        "depends_on": [],
+        "timeout": 60.0
     }
     # Add other MCPs here as they are developed
 }
@@ -57,6 +79,21 @@ def get_active_mcps(classification: Dict[str, Any]) -> Dict[str, 'BaseMCP']:
 
     return active_mcps
 
+def get_mcp_dependencies(name: str) -> List[str]:
+    """Returns the registry names of the MCPs the named MCP depends on."""
+    return list(MCP_REGISTRY.get(name, {}).get("depends_on", []))
+
+def get_mcp_timeout(name: str) -> float:
+    """Returns the timeout in seconds for the named MCP."""
+    return float(MCP_REGISTRY.get(name, {}).get("timeout", MCP_DEFAULT_TIMEOUT_SECONDS))
+
+def get_mcp_input_columns() -> List[str]:
+    """Returns every Assessments column read by an MCP's enabled_if, in registry order."""
+    columns: Dict[str, None] = {}
+    for entry in MCP_REGISTRY.values():
+        columns.update(dict.fromkeys(entry.get("reads", [])))
+    return list(columns)
+
 # Add basic logging configuration if not already present globally
 import logging
 logging.basicConfig(level=logging.INFO) # Ensure logger is configured
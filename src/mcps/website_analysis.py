@@ -2,21 +2,49 @@
 
 import json
 import logging
+import os
 from typing import Dict, Any, Optional, List
-from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 from datetime import datetime, timezone
 
 from .base import BaseMCP, MCPOutput
-from llm_interpreter.llm_client import call_llm # Assuming LLM client is here
+from llm_interpreter.llm_client import stream_llm
+from llm_interpreter.tokens import count_tokens, truncate_to_tokens
+from scrapers.page_types import classify_page_type
 # Import crawler function if MCP triggers it directly (otherwise remove)
 # from ..scrapers.crawler_integration import crawl_and_prepare_content
 
 logger = logging.getLogger(__name__)
 
+# --- Prompt Budget ---
+# Input tokens the analysis prompt may use, per model; other models get the default
+WEBSITE_ANALYSIS_PROMPT_TOKENS = int(os.getenv("WEBSITE_ANALYSIS_PROMPT_TOKENS", "4000"))
+WEBSITE_ANALYSIS_PROMPT_BUDGETS = json.loads(os.getenv(
+    "WEBSITE_ANALYSIS_PROMPT_BUDGETS", '{"gpt-4-turbo-preview": 6000, "gpt-3.5-turbo": 3000}'
+))
+# Share of the budget (after the fixed sections) the product list may take
+PRODUCT_TOKEN_SHARE = 0.3
+# Pages are ranked by type, then by the number of products found on them
+PAGE_TYPE_PRIORITY = {
+    "homepage": 0, "about": 1, "product_listing": 2, "menu": 2,
+    "product_detail": 3, "category": 4, "contact": 5, "other": 6,
+}
+# Pages are skipped once less than this many tokens are left for them
+MIN_PAGE_TOKENS = 40
+
+
+def prompt_token_budget(model: str) -> int:
+    """Return the input-token budget of the analysis prompt for a model."""
+    return int(WEBSITE_ANALYSIS_PROMPT_BUDGETS.get(model, WEBSITE_ANALYSIS_PROMPT_TOKENS))
+
+
+def _line_tokens(line: str, model: str) -> int:
+    # The joining newline costs at most one more token
+    return count_tokens(line, model) + 1
+
 class WebsiteAnalysisMCP(BaseMCP):
     name = "website_analysis"
     version = "1.1.0" # Added version attribute for interpreter logging
+    model = "gpt-4-turbo-preview"
 
     async def build_payload(self, assessment_data: Dict[str, Any], products: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """Prepares payload, primarily ensuring necessary data like url and raw_content exist."""
@@ -105,7 +133,7 @@ class WebsiteAnalysisMCP(BaseMCP):
         # This part replaces the old `format_content_for_llm` logic.
         # It should create a textual summary/prompt for the LLM to generate insights (e.g., summary).
         try:
-            llm_input_text = self._generate_llm_prompt_from_structured(structured_content, analysis_warnings)
+            llm_input_text = self._generate_llm_prompt_from_structured(structured_content, analysis_warnings, self.model)
         except Exception as e:
              logger.error(f"Assessment {assessment_id}: Error generating LLM prompt: {e}")
              # Decide whether to proceed without LLM or return error
@@ -115,15 +143,22 @@ class WebsiteAnalysisMCP(BaseMCP):
         llm_response_data = None # Initialize here
         llm_error = None
         try:
-            # Assuming call_llm returns a parsed dictionary or raises an error
+            # The response is streamed so the summary and each product are
+            # available as soon as the model has written them
             logger.info(f"Assessment {assessment_id}: Calling LLM for website analysis.")
-            # Example: Sending text prompt to LLM expecting JSON output for summary, etc.
-            # Adjust model and parameters as needed
-            llm_response_data = await call_llm(
-                model="gpt-4-turbo-preview", # Or your preferred model
+            streamed_products = 0
+            async for event in stream_llm(
+                model=self.model,
                 prompt=llm_input_text,
                 expected_format="json", # Correct parameter for JSON output
-            )
+            ):
+                if event.type == "field" and event.key == "summary":
+                    logger.info(f"Assessment {assessment_id}: LLM summary received ahead of the product list.")
+                elif event.type == "item" and event.key == "products":
+                    streamed_products += 1
+                    logger.debug(f"Assessment {assessment_id}: Streamed product {streamed_products}: {event.value}")
+                elif event.type == "done":
+                    llm_response_data = event.value
             logger.debug(f"Assessment {assessment_id}: Raw LLM response data: {llm_response_data}") # Log raw response
 
             # --- Step 5b: Process LLM Response & Update Patch --- 
@@ -180,8 +215,23 @@ class WebsiteAnalysisMCP(BaseMCP):
             _db_patch=db_patch # Include the patch with potential crawler & LLM data
         )
 
-    def _generate_llm_prompt_from_structured(self, content: Dict[str, Any], warnings: List[str]) -> str:
-        """Generates a text prompt for the LLM based on the structured crawler output."""
+    def _generate_llm_prompt_from_structured(self, content: Dict[str, Any], warnings: List[str], model: Optional[str] = None) -> str:
+        """
+        Generates a text prompt for the LLM based on the structured crawler output.
+
+        The header, contacts and task always go in; products and page text then
+        fill the model's token budget, best pages first and with text already
+        sent for an earlier page (navigation, footers) left out.
+
+        Args:
+            content: Structured crawler output
+            warnings: Crawl warnings to include
+            model: Model the prompt is for (defaults to the MCP's model)
+
+        Returns:
+            Prompt text within the model's budget
+        """
+        model = model or self.model
         metadata = content.get("metadata", {})
         contact_info = metadata.get("contact_info", {})
         products = content.get("aggregated_products", [])
@@ -210,41 +260,7 @@ class WebsiteAnalysisMCP(BaseMCP):
             f"Total Unique Products Found: {len(products)}",
         ])
 
-        if products:
-            prompt_lines.append("Sample Products (up to 10):")
-            for i, product in enumerate(products[:10]):
-                name = product.get('name', 'N/A')
-                category = product.get('category', 'N/A')
-                prompt_lines.append(f"  {i+1}. Name: {name}, Category: {category}")
-        else:
-             prompt_lines.append("No products were found by the crawler.")
-
-        # Include snippets from key pages if available
-        prompt_lines.append("\n### Key Page Content Snippets ###")
-        key_page_count = 0
-        for page in pages:
-             url_lower = page.get('url','').lower()
-             title_lower = page.get('title','').lower()
-             # Identify key pages (simple example)
-             if page.get('status') == 'success' and ('/' == urlparse(url_lower).path or 'about' in url_lower or 'contact' in url_lower or 'home' in title_lower):
-                 key_page_count += 1
-                 prompt_lines.append(f"--- Page: {page.get('url')} ({page.get('title', 'No Title')}) ---")
-                 # Safely get text content if available
-                 page_content = page.get('text_content', '') # Assumes text_content was added in crawler
-                 if not page_content and page.get('content'): # Fallback to parsing raw HTML if text not stored
-                      try:
-                           page_content = BeautifulSoup(page.get('content'), 'html.parser').get_text(separator=' ', strip=True)
-                      except Exception:
-                           page_content = "(Could not parse HTML for text)"
-                 
-                 snippet = (page_content or "(No text content found)")[:300] # Limit snippet size
-                 prompt_lines.append(snippet + "...")
-                 if key_page_count >= 3: # Limit to 3 key pages
-                     break
-        if key_page_count == 0:
-            prompt_lines.append("No key page content available.")
-
-        prompt_lines.extend([
+        task_lines = [
             "\n### Analysis Task ###",
             "Based on the information provided above:",
             "1. Generate a concise summary (2-3 sentences) of the company's likely business and primary offerings.",
@@ -252,9 +268,84 @@ class WebsiteAnalysisMCP(BaseMCP):
             "3. Briefly mention any notable aspects like certifications or target markets if evident in the text.",
             "4. Provide the output as a JSON object containing 'summary' (string) and 'products' (list of objects, each with 'name' and optional 'category' keys).",
             "Example JSON format: {\"summary\": \"This company sells...\", \"products\": [{\"name\": \"Product A\", \"category\": \"Category 1\"}, {\"name\": \"Service B\"}]}",
-        ])
+        ]
+
+        remaining = prompt_token_budget(model) - sum(_line_tokens(line, model) for line in prompt_lines + task_lines)
+        product_lines = self._product_lines(products, int(remaining * PRODUCT_TOKEN_SHARE), model)
+        remaining -= sum(_line_tokens(line, model) for line in product_lines)
+        page_lines = self._page_lines(pages, remaining, model)
+
+        return "\n".join(prompt_lines + product_lines + page_lines + task_lines)
+
+    def _product_lines(self, products: List[Dict[str, Any]], max_tokens: int, model: str) -> List[str]:
+        """Lists as many products as fit in max_tokens, in crawler order."""
+        if not products:
+            return ["No products were found by the crawler."]
+
+        heading = f"Products ({len(products)} of {len(products)} shown):"
+        used = _line_tokens(heading, model)
+        lines = []
+        for i, product in enumerate(products):
+            name = product.get('name', 'N/A')
+            category = product.get('category', 'N/A')
+            line = f"  {i+1}. Name: {name}, Category: {category}"
+            cost = _line_tokens(line, model)
+            if used + cost > max_tokens:
+                break
+            lines.append(line)
+            used += cost
+        return [f"Products ({len(lines)} of {len(products)} shown):"] + lines
+
+    def _page_lines(self, pages: List[Dict[str, Any]], max_tokens: int, model: str) -> List[str]:
+        """Fills max_tokens with text from the highest-ranked pages, skipping lines already sent."""
+        heading = "\n### Key Page Content ###"
+        remaining = max_tokens - _line_tokens(heading, model)
+        ranked = self._rank_pages(pages)
+        seen = set()
+        lines = [heading]
+
+        for position, (page, page_type) in enumerate(ranked):
+            if remaining < MIN_PAGE_TOKENS:
+                break
+            # An even share of what is left, so short pages hand their unused tokens on
+            allowance = min(remaining, max(remaining // (len(ranked) - position), MIN_PAGE_TOKENS))
+            header = f"--- Page: {page.get('url')} ({page.get('title') or 'No Title'}) [{page_type}] ---"
+            used = _line_tokens(header, model)
+            body = []
+            for line in page.get("text_content", "").splitlines():
+                key = " ".join(line.split()).lower()
+                if not key or key in seen:
+                    continue
+                cost = _line_tokens(line.strip(), model)
+                if used + cost > allowance:
+                    partial = truncate_to_tokens(line.strip(), allowance - used - 2, model)
+                    if partial:
+                        body.append(partial + "...")
+                        used += _line_tokens(body[-1], model)
+                    break
+                seen.add(key)
+                body.append(line.strip())
+                used += cost
+            if body:
+                lines.append(header)
+                lines.extend(body)
+                remaining -= used
+
+        if len(lines) == 1:
+            lines.append("No key page content available.")
+        return lines
 
-        return "\n".join(prompt_lines)
+    def _rank_pages(self, pages: List[Dict[str, Any]]) -> List[tuple]:
+        """Orders pages with text by type priority, then by products found, then crawl order."""
+        candidates = []
+        for index, page in enumerate(pages):
+            if page.get('status') != 'success' or not page.get('text_content'):
+                continue
+            page_type = page.get('page_type') or classify_page_type(page.get('url', ''), page.get('title') or '')
+            priority = PAGE_TYPE_PRIORITY.get(page_type, PAGE_TYPE_PRIORITY["other"])
+            candidates.append(((priority, -(page.get('products_found_on_page') or 0), index), page, page_type))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [(page, page_type) for _, page, page_type in candidates]
 
 # Example usage (if running standalone for testing)
 # async def test_mcp():
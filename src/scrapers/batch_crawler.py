@@ -0,0 +1,139 @@
+"""
+Batch crawl orchestration for assessment backlogs.
+Runs many site crawls at once on the shared browser pool, under a global
+page-load budget and per-domain politeness limits, and hands each result back
+as soon as its crawl finishes.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from .crawler_integration import CRAWLER_PER_DOMAIN_CONCURRENCY, crawl_and_prepare_content
+from .domain_limiter import DomainLimiter
+
+logger = logging.getLogger(__name__)
+
+# Sites crawled at the same time
+CRAWLER_BATCH_MAX_SITES = int(os.getenv("CRAWLER_BATCH_MAX_SITES", "8"))
+# Page loads in flight across every site in the batch
+CRAWLER_BATCH_MAX_PAGES = int(os.getenv("CRAWLER_BATCH_MAX_PAGES", "16"))
+# Minimum gap between page loads on one domain
+CRAWLER_DOMAIN_MIN_INTERVAL_SECONDS = float(os.getenv("CRAWLER_DOMAIN_MIN_INTERVAL_SECONDS", "0.25"))
+
+
+class CrawlJob:
+    """One site to crawl for an assessment, and its outcome once finished."""
+
+    def __init__(self, assessment_id: str, url: str, max_pages: int = 20):
+        self.assessment_id = assessment_id
+        self.url = url
+        self.max_pages = max_pages
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and isinstance(self.result, dict)
+
+
+ResultCallback = Callable[[CrawlJob], Union[None, Awaitable[None]]]
+
+
+class BatchCrawler:
+    """Crawls a batch of sites concurrently with shared limits."""
+
+    def __init__(
+        self,
+        max_concurrent_sites: int = CRAWLER_BATCH_MAX_SITES,
+        max_concurrent_pages: int = CRAWLER_BATCH_MAX_PAGES,
+        per_domain_concurrency: int = CRAWLER_PER_DOMAIN_CONCURRENCY,
+        domain_min_interval: float = CRAWLER_DOMAIN_MIN_INTERVAL_SECONDS,
+        crawl_fn: Callable[..., Awaitable[Dict[str, Any]]] = crawl_and_prepare_content
+    ):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            max_concurrent_sites: Sites crawled at the same time
+            max_concurrent_pages: Page loads in flight across the whole batch
+            per_domain_concurrency: Page loads in flight per domain
+            domain_min_interval: Minimum seconds between page loads on one domain
+            crawl_fn: Coroutine crawling one site (url, max_pages=, domain_limiter=)
+        """
+        self.max_concurrent_sites = max(1, max_concurrent_sites)
+        self.domain_limiter = DomainLimiter(
+            per_domain_concurrency,
+            max_total=max(1, max_concurrent_pages),
+            min_interval=domain_min_interval
+        )
+        self.crawl_fn = crawl_fn
+
+    async def run(self, jobs: Iterable[CrawlJob], on_result: Optional[ResultCallback] = None) -> List[CrawlJob]:
+        """
+        Crawl every job and report each one as it finishes.
+
+        Args:
+            jobs: Sites to crawl
+            on_result: Called (sync or async) with each finished job, in completion order
+
+        Returns:
+            The jobs, with result/error filled in, in completion order
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+
+        site_slots = asyncio.Semaphore(self.max_concurrent_sites)
+        started = time.monotonic()
+        logger.info(f"Batch crawl of {len(jobs)} sites ({self.max_concurrent_sites} sites, "
+                    f"{self.domain_limiter.max_total} pages at a time)")
+
+        async def crawl_one(job: CrawlJob) -> CrawlJob:
+            async with site_slots:
+                job_started = time.monotonic()
+                try:
+                    job.result = await self.crawl_fn(
+                        job.url, max_pages=job.max_pages, domain_limiter=self.domain_limiter
+                    )
+                except Exception as e:
+                    logger.error(f"Batch crawl of {job.url} for assessment {job.assessment_id} failed: {e}",
+                                 exc_info=True)
+                    job.error = f"{type(e).__name__}: {e}"
+                job.duration_seconds = time.monotonic() - job_started
+            return job
+
+        finished: List[CrawlJob] = []
+        for next_done in asyncio.as_completed([crawl_one(job) for job in jobs]):
+            job = await next_done
+            finished.append(job)
+            if on_result is not None:
+                try:
+                    outcome = on_result(job)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+                except Exception as e:
+                    logger.error(f"Result callback failed for assessment {job.assessment_id}: {e}", exc_info=True)
+
+        failed = sum(1 for job in finished if not job.succeeded)
+        logger.info(f"Batch crawl finished in {time.monotonic() - started:.1f}s: "
+                    f"{len(finished) - failed} succeeded, {failed} failed")
+        return finished
+
+
+async def crawl_batch(jobs: Iterable[CrawlJob], on_result: Optional[ResultCallback] = None) -> List[CrawlJob]:
+    """
+    Convenience function to crawl a batch of sites with the default limits.
+
+    Args:
+        jobs: Sites to crawl
+        on_result: Called with each finished job
+
+    Returns:
+        The finished jobs
+    """
+    return await BatchCrawler().run(jobs, on_result)
@@ -0,0 +1,130 @@
+"""
+Content-addressed blob store for crawled page HTML.
+Keeps raw HTML out of crawl results: each body is compressed (zstd when the
+zstandard package is installed, gzip otherwise) and stored under its SHA-256,
+and the page record only carries the hash and sizes.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(".cache", "tradewizard", "blobs"))
+BLOB_STORE_ZSTD_LEVEL = int(os.getenv("BLOB_STORE_ZSTD_LEVEL", "10"))
+
+# File extension for each codec
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+class BlobStore:
+    """Write-once store of compressed blobs addressed by the SHA-256 of their content."""
+
+    def __init__(self, root: str = BLOB_STORE_DIR, codec: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory the blobs are written under
+            codec: "zstd" or "gzip" (defaults to zstd when available)
+        """
+        if codec is None:
+            codec = "zstd" if zstandard is not None else "gzip"
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("The zstd codec needs the zstandard package")
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown codec {codec}")
+        self.root = root
+        self.codec = codec
+
+    def _path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + CODEC_EXTENSIONS[codec])
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=BLOB_STORE_ZSTD_LEVEL).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def put(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        """
+        Store content unless an identical blob already exists.
+
+        Args:
+            content: Text (stored as UTF-8) or bytes
+
+        Returns:
+            Reference dict with sha256, bytes (uncompressed), stored_bytes and codec
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+
+        for codec in CODEC_EXTENSIONS:
+            existing = self._path(digest, codec)
+            if os.path.exists(existing):
+                return {"sha256": digest, "bytes": len(data), "stored_bytes": os.path.getsize(existing), "codec": codec}
+
+        compressed = self._compress(data)
+        path = self._path(digest, self.codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return {"sha256": digest, "bytes": len(data), "stored_bytes": len(compressed), "codec": self.codec}
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read a blob back.
+
+        Args:
+            digest: SHA-256 returned by put
+
+        Returns:
+            The original content as bytes
+
+        Raises:
+            KeyError: If no blob with this hash exists
+        """
+        for codec in CODEC_EXTENSIONS:
+            path = self._path(digest, codec)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                compressed = f.read()
+            if codec == "zstd":
+                if zstandard is None:
+                    raise RuntimeError(f"Blob {digest} is zstd-compressed but zstandard is not installed")
+                return zstandard.ZstdDecompressor().decompress(compressed)
+            return gzip.decompress(compressed)
+        raise KeyError(digest)
+
+    def get_text(self, digest: str) -> str:
+        """Read a blob back as UTF-8 text."""
+        return self.get(digest).decode("utf-8")
+
+
+# --- Process-wide store ---
+
+_shared_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = BlobStore()
+    return _shared_store
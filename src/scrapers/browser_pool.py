@@ -0,0 +1,250 @@
+"""
+Shared Playwright browser pool for TradeWizard crawlers.
+Keeps Chromium warm between crawls and hands out recycled browser contexts,
+so an assessment does not pay the browser cold-start cost on every crawl.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+# Context options shared by every crawler
+DEFAULT_CONTEXT_OPTIONS: Dict[str, Any] = {
+    "viewport": {"width": 1280, "height": 800},
+    "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36 TradeWizard/1.0"
+}
+
+# Pool limits (overridable from the environment)
+BROWSER_POOL_MAX_BROWSERS = int(os.getenv("BROWSER_POOL_MAX_BROWSERS", "1"))
+BROWSER_POOL_CONTEXTS_PER_BROWSER = int(os.getenv("BROWSER_POOL_CONTEXTS_PER_BROWSER", "4"))
+BROWSER_POOL_USES_PER_CONTEXT = int(os.getenv("BROWSER_POOL_USES_PER_CONTEXT", "20"))
+
+
+class _PooledBrowser:
+    """Book-keeping for one launched browser and the contexts opened on it."""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.contexts: List[BrowserContext] = []
+
+
+class BrowserPool:
+    """
+    A pool of warm Chromium browsers handing out reusable browser contexts.
+
+    Contexts are leased with ``async with pool.lease() as context`` and given
+    back afterwards. A context is closed once it has been used
+    ``max_uses_per_context`` times, or if the lease ended with an error.
+    """
+
+    def __init__(
+        self,
+        max_browsers: int = BROWSER_POOL_MAX_BROWSERS,
+        max_contexts_per_browser: int = BROWSER_POOL_CONTEXTS_PER_BROWSER,
+        max_uses_per_context: int = BROWSER_POOL_USES_PER_CONTEXT,
+        headless: bool = True,
+        context_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the pool. Browsers are launched lazily on first lease.
+
+        Args:
+            max_browsers: Maximum number of browsers to launch
+            max_contexts_per_browser: Maximum open contexts per browser
+            max_uses_per_context: Leases after which a context is closed and replaced
+            headless: Whether to run browsers in headless mode
+            context_options: Options passed to ``browser.new_context``
+        """
+        self.max_browsers = max(1, max_browsers)
+        self.max_contexts_per_browser = max(1, max_contexts_per_browser)
+        self.max_uses_per_context = max(1, max_uses_per_context)
+        self.headless = headless
+        self.context_options = context_options or DEFAULT_CONTEXT_OPTIONS
+
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        self._idle_contexts: List[BrowserContext] = []
+        self._context_owner: Dict[BrowserContext, _PooledBrowser] = {}
+        self._context_uses: Dict[BrowserContext, int] = {}
+        self._available = asyncio.Condition()
+        self._closed = False
+        self.loop = asyncio.get_running_loop()
+        self.stats = {
+            "browsers_launched": 0,
+            "contexts_created": 0,
+            "contexts_recycled": 0,
+            "leases": 0
+        }
+
+    async def _launch_browser(self) -> _PooledBrowser:
+        """Launch a new browser (starting Playwright if needed)."""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        browser = await self._playwright.chromium.launch(headless=self.headless)
+        pooled = _PooledBrowser(browser)
+        self._browsers.append(pooled)
+        self.stats["browsers_launched"] += 1
+        logger.info(f"Browser pool launched browser {len(self._browsers)}/{self.max_browsers}")
+        return pooled
+
+    def _drop_disconnected_browsers(self) -> None:
+        """Forget browsers that crashed or were closed underneath the pool."""
+        for pooled in [b for b in self._browsers if not b.browser.is_connected()]:
+            logger.warning("Browser pool dropping a disconnected browser")
+            self._browsers.remove(pooled)
+            for context in pooled.contexts:
+                self._forget_context(context)
+
+    def _forget_context(self, context: BrowserContext) -> None:
+        owner = self._context_owner.pop(context, None)
+        if owner and context in owner.contexts:
+            owner.contexts.remove(context)
+        self._context_uses.pop(context, None)
+        if context in self._idle_contexts:
+            self._idle_contexts.remove(context)
+
+    async def _new_context(self) -> Optional[BrowserContext]:
+        """Open a context on a browser with spare capacity, launching one if allowed."""
+        pooled = next(
+            (b for b in self._browsers if len(b.contexts) < self.max_contexts_per_browser),
+            None
+        )
+        if pooled is None:
+            if len(self._browsers) >= self.max_browsers:
+                return None
+            pooled = await self._launch_browser()
+
+        context = await pooled.browser.new_context(**self.context_options)
+        pooled.contexts.append(context)
+        self._context_owner[context] = pooled
+        self._context_uses[context] = 0
+        self.stats["contexts_created"] += 1
+        return context
+
+    async def acquire(self) -> BrowserContext:
+        """
+        Lease a browser context, waiting if the pool is at capacity.
+
+        Returns:
+            A browser context that must be handed back with ``release``
+        """
+        async with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                self._drop_disconnected_browsers()
+
+                if self._idle_contexts:
+                    context = self._idle_contexts.pop()
+                    self.stats["contexts_recycled"] += 1
+                else:
+                    context = await self._new_context()
+
+                if context is not None:
+                    self.stats["leases"] += 1
+                    return context
+
+                await self._available.wait()
+
+    async def release(self, context: BrowserContext, discard: bool = False) -> None:
+        """
+        Give a leased context back to the pool.
+
+        Args:
+            context: Context obtained from ``acquire``
+            discard: Close the context instead of recycling it
+        """
+        async with self._available:
+            if context not in self._context_owner:
+                # Owner browser was dropped while the context was leased
+                return
+
+            self._context_uses[context] += 1
+            worn_out = self._context_uses[context] >= self.max_uses_per_context
+
+            if discard or worn_out or self._closed:
+                self._forget_context(context)
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.debug(f"Ignoring error while closing browser context: {e}")
+            else:
+                try:
+                    # Leftover pages and cookies must not leak into the next crawl
+                    for page in list(context.pages):
+                        await page.close()
+                    await context.clear_cookies()
+                    self._idle_contexts.append(context)
+                except Exception as e:
+                    logger.warning(f"Browser context could not be reset, closing it: {e}")
+                    self._forget_context(context)
+
+            self._available.notify()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BrowserContext]:
+        """Lease a context for the duration of an ``async with`` block."""
+        context = await self.acquire()
+        failed = False
+        try:
+            yield context
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            await self.release(context, discard=failed)
+
+    async def close(self) -> None:
+        """Close every context and browser and stop Playwright."""
+        async with self._available:
+            self._closed = True
+            browsers, self._browsers = self._browsers, []
+            self._idle_contexts = []
+            self._context_owner = {}
+            self._context_uses = {}
+            self._available.notify_all()
+
+        for pooled in browsers:
+            try:
+                await pooled.browser.close()
+            except Exception as e:
+                logger.debug(f"Ignoring error while closing browser: {e}")
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+        logger.info(f"Browser pool closed. Stats: {self.stats}")
+
+
+# --- Process-wide pool ---
+
+_shared_pool: Optional[BrowserPool] = None
+
+
+async def get_browser_pool() -> BrowserPool:
+    """
+    Return the process-wide browser pool, creating it on first use.
+
+    Playwright objects are bound to the event loop that created them, so a
+    pool left over from a previous ``asyncio.run`` is replaced.
+    """
+    global _shared_pool
+    loop = asyncio.get_running_loop()
+    if _shared_pool is None or _shared_pool._closed or _shared_pool.loop is not loop:
+        _shared_pool = BrowserPool()
+    return _shared_pool
+
+
+async def shutdown_browser_pool() -> None:
+    """Close the process-wide browser pool if it was started on this loop."""
+    global _shared_pool
+    pool, _shared_pool = _shared_pool, None
+    if pool is not None and pool.loop is asyncio.get_running_loop():
+        await pool.close()
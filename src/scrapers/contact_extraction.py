@@ -0,0 +1,149 @@
+"""
+Contact extraction for crawled pages.
+Pulls emails, phone numbers, street addresses and social links out of an
+already-parsed page, preferring footer, address and contact sections.
+"""
+
+import re
+import logging
+from typing import Any, Dict, List
+
+from bs4 import BeautifulSoup, Tag
+
+# The regexes live with the shared scanner; re-exported for existing callers
+from src.utils.contact_scanner import (  # noqa: F401
+    EMAIL_REGEX, PHONE_REGEX, SOCIAL_MEDIA_REGEX, STREET_REGEX, scan_contacts
+)
+
+logger = logging.getLogger(__name__)
+
+# --- Constants for Contact Extraction ---
+ZIP_CODE_REGEX = re.compile(r'\b\d{4,10}\b')
+# TODO: Load known cities/countries from config for better address matching
+CONTACT_SELECTORS = ['footer', 'address', '[class*="contact"]', '[id*="contact"]', '[class*="location"]', '[id*="location"]', '[class*="info"]', '[id*="info"]']
+# All contact selectors as one query, so the tree is matched once
+CONTACT_SELECTOR = ", ".join(CONTACT_SELECTORS)
+HIDDEN_CLASSES = {'hidden', 'sr-only', 'visually-hidden'}
+# --- End Constants ---
+
+# Selectors of the form tag or [attr*="value"] are matched in Python during the
+# tree walk, which is much cheaper than a CSS engine pass over every element
+_SUBSTRING_SELECTOR_REGEX = re.compile(r'^\[([\w-]+)\*="([^"]+)"\]$')
+_TAG_SELECTOR_REGEX = re.compile(r'^[a-z][a-z0-9]*$')
+
+
+def _compile_selectors(selectors):
+    tags, substrings = set(), []
+    for selector in selectors:
+        substring = _SUBSTRING_SELECTOR_REGEX.match(selector)
+        if substring:
+            substrings.append(substring.groups())
+        elif _TAG_SELECTOR_REGEX.match(selector):
+            tags.add(selector)
+        else:
+            return None  # Needs the CSS engine
+    return tags, substrings
+
+
+_CONTACT_RULES = _compile_selectors(CONTACT_SELECTORS)
+
+
+def is_contact_page(url: str) -> bool:
+    """Simple check based on URL."""
+    return "contact" in url.lower()
+
+
+def _is_hidden(element: Tag) -> bool:
+    """True when an element hides itself (and so its whole subtree)."""
+    style = element.attrs.get('style')
+    if style:
+        style = style.lower().replace(' ', '')
+        if 'display:none' in style or 'visibility:hidden' in style:
+            return True
+    return any(cls in HIDDEN_CLASSES for cls in element.attrs.get('class', []))
+
+
+def visible_contact_regions(soup: BeautifulSoup) -> List[Tag]:
+    """
+    Find the visible elements matching CONTACT_SELECTORS, outermost first.
+
+    One top-down pass skips hidden subtrees as a whole and stops at the first
+    match on each branch, so nested matches (a contact div inside the footer)
+    are not collected twice.
+
+    Args:
+        soup: Parsed page
+
+    Returns:
+        Matching elements in document order
+    """
+    if _CONTACT_RULES is None:
+        matched = {id(element) for element in soup.select(CONTACT_SELECTOR)}
+        is_match = lambda element: id(element) in matched  # noqa: E731
+    else:
+        tags, substrings = _CONTACT_RULES
+
+        def is_match(element: Tag) -> bool:
+            if element.name in tags:
+                return True
+            for attr, value in substrings:
+                attr_value = element.attrs.get(attr)
+                if attr_value is None:
+                    continue
+                if isinstance(attr_value, list):  # Multi-valued attributes such as class
+                    attr_value = ' '.join(attr_value)
+                if value in attr_value:
+                    return True
+            return False
+
+    regions = []
+    # Children are pushed in reverse so elements come off the stack in document order
+    stack = [child for child in reversed(soup.contents) if isinstance(child, Tag)]
+    while stack:
+        element = stack.pop()
+        if element.name != 'body' and _is_hidden(element):
+            continue
+        if is_match(element):
+            regions.append(element)
+            continue
+        stack.extend(child for child in reversed(element.contents) if isinstance(child, Tag))
+    return regions
+
+
+def extract_contacts(soup: BeautifulSoup, is_contact_page: bool = False) -> Dict[str, Any]:
+    """
+    Extracts contact information from a parsed page.
+
+    Args:
+        soup: Parsed page (scripts and styles may already be stripped)
+        is_contact_page: Always search the full page text as well
+
+    Returns:
+        Dict of emails, phones (E.164), addresses and social_links lists
+    """
+    # 1. Prioritize specific HTML sections
+    relevant_text_sections = [
+        element.get_text(separator=' ', strip=True) for element in visible_contact_regions(soup)
+    ]
+    prioritized_text = " ".join(relevant_text_sections)
+
+    # 2. Scan the prioritized text, or the full page when there is none.
+    # Contact pages always use the full page, which contains the sections anyway.
+    if not prioritized_text or is_contact_page:
+        text = soup.get_text(separator=' ', strip=True)
+    else:
+        text = prioritized_text
+
+    # Emails, phones (E.164), social links and basic street addresses in one pass
+    # TODO: Add ZIP, City, Country extraction and combine into structured addresses
+    return scan_contacts(text)
+
+
+def extract_contact_info(page_content: str, url: str, is_contact_page: bool = False) -> Dict[str, Any]:
+    """
+    Extracts contact information (emails, phones, addresses, social links)
+    from HTML content, prioritizing specific tags.
+    Parses the content; use extract_contacts when a parsed page is at hand.
+    """
+    from .page_parser import parse_html
+    return extract_contacts(parse_html(page_content), is_contact_page=is_contact_page)
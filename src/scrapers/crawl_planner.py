@@ -0,0 +1,284 @@
+"""
+Crawl planning from robots.txt and XML sitemaps.
+Reads a site's robots.txt and sitemaps before the crawl starts and seeds the
+frontier with the URLs most likely to be product listings, so the page budget
+is not spent walking navigation pages.
+"""
+
+import logging
+import os
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+from .http_fetcher import HttpFetcher
+from .page_types import classify_url
+
+logger = logging.getLogger(__name__)
+
+ROBOTS_USER_AGENT = "TradeWizard"
+
+# Limits on how much sitemap data a single plan reads
+SITEMAP_MAX_FILES = int(os.getenv("SITEMAP_MAX_FILES", "10"))
+SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", "5000"))
+# Largest (uncompressed) sitemap parsed; the sitemap protocol caps files at 50 MB
+SITEMAP_MAX_BYTES = int(os.getenv("SITEMAP_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Crawl-delays longer than this are clamped so one site cannot stall a batch
+CRAWLER_MAX_CRAWL_DELAY_SECONDS = float(os.getenv("CRAWLER_MAX_CRAWL_DELAY_SECONDS", "10"))
+
+# Where sites usually publish a sitemap when robots.txt does not say
+FALLBACK_SITEMAP_PATHS = ["/sitemap.xml", "/sitemap_index.xml", "/wp-sitemap.xml"]
+
+# Frontier priority for each page type (lower is crawled sooner). Page types
+# not listed here are left for link discovery.
+SEED_PRIORITIES: Dict[str, int] = {
+    "product_listing": 0,
+    "menu": 0,
+    "about": 1,
+    "contact": 1,
+    "category": 2,
+    "product_detail": 3,
+}
+
+# Hints used to read product sitemaps first when a sitemap index lists several
+SITEMAP_NAME_HINTS = ("product", "shop", "store", "menu", "categor", "page")
+
+
+class CrawlPlan:
+    """Result of planning a crawl for one site."""
+
+    def __init__(self, start_url: str):
+        self.start_url = start_url
+        self.robots: Optional[RobotFileParser] = None
+        self.crawl_delay: Optional[float] = None
+        self.sitemaps_read: List[str] = []
+        self.sitemap_url_count = 0
+        self.seeds: List[Tuple[str, int]] = []  # (url, frontier priority)
+
+    def can_fetch(self, url: str) -> bool:
+        """Check a URL against robots.txt (everything is allowed without one)."""
+        if self.robots is None:
+            return True
+        return self.robots.can_fetch(ROBOTS_USER_AGENT, url)
+
+    def as_dict(self) -> Dict[str, object]:
+        """Return a JSON-serializable summary for crawl metadata."""
+        return {
+            "robots_found": self.robots is not None,
+            "crawl_delay": self.crawl_delay,
+            "sitemaps_read": list(self.sitemaps_read),
+            "sitemap_urls": self.sitemap_url_count,
+            "seeded": len(self.seeds),
+        }
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag name."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(content: bytes, max_bytes: int = SITEMAP_MAX_BYTES) -> Tuple[List[str], List[str]]:
+    """
+    Parse a sitemap or sitemap index.
+
+    Args:
+        content: Raw sitemap body (gzip-compressed or plain XML)
+        max_bytes: Largest uncompressed size accepted
+
+    Returns:
+        Tuple of (page URLs, child sitemap URLs)
+
+    Raises:
+        ValueError: The sitemap is larger than max_bytes once decompressed
+    """
+    if content[:2] == b"\x1f\x8b":
+        # Decompress at most one byte past the cap so a gzip bomb never expands in memory
+        content = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(content, max_bytes + 1)
+    if len(content) > max_bytes:
+        raise ValueError(f"sitemap exceeds {max_bytes} bytes")
+
+    root = ET.fromstring(content)
+    locs = [
+        (el.text or "").strip()
+        for el in root.iter()
+        if _local_name(el.tag) == "loc" and el.text
+    ]
+    if _local_name(root.tag) == "sitemapindex":
+        return [], locs
+    return locs, []
+
+
+def _sitemap_order(url: str) -> int:
+    name = urlparse(url).path.lower()
+    for rank, hint in enumerate(SITEMAP_NAME_HINTS):
+        if hint in name:
+            return rank
+    return len(SITEMAP_NAME_HINTS)
+
+
+def _site_host(host: str) -> str:
+    """Strip a leading www. so www.example.com and example.com compare equal."""
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _same_site(url: str, host: str) -> bool:
+    return _site_host(urlparse(url).netloc) == _site_host(host)
+
+
+def select_seeds(urls: List[str], max_seeds: int) -> List[Tuple[str, int]]:
+    """
+    Rank sitemap URLs by page type and keep the best.
+
+    Shallower paths win within a page type, and no single page type may take
+    more than half the seeds so about/contact pages are not crowded out by a
+    large catalogue.
+
+    Args:
+        urls: Candidate page URLs
+        max_seeds: Maximum number of seeds to return
+
+    Returns:
+        List of (url, frontier priority) tuples, best first
+    """
+    scored = []
+    for url in urls:
+        page_type = classify_url(url)
+        if page_type not in SEED_PRIORITIES:
+            continue
+        depth = len([part for part in urlparse(url).path.split("/") if part])
+        scored.append((SEED_PRIORITIES[page_type], depth, url, page_type))
+    scored.sort()
+
+    per_type_cap = max(1, max_seeds // 2)
+    per_type: Dict[str, int] = {}
+    seeds = []
+    for priority, _, url, page_type in scored:
+        if len(seeds) >= max_seeds:
+            break
+        if per_type.get(page_type, 0) >= per_type_cap:
+            continue
+        per_type[page_type] = per_type.get(page_type, 0) + 1
+        seeds.append((url, priority))
+    return seeds
+
+
+class CrawlPlanner:
+    """Builds a CrawlPlan from a site's robots.txt and sitemaps."""
+
+    def __init__(
+        self,
+        fetcher: HttpFetcher,
+        max_sitemap_files: int = SITEMAP_MAX_FILES,
+        max_sitemap_urls: int = SITEMAP_MAX_URLS
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            fetcher: HTTP client used for robots.txt and sitemaps
+            max_sitemap_files: Maximum sitemap files read per site
+            max_sitemap_urls: Maximum page URLs collected per site
+        """
+        self.fetcher = fetcher
+        self.max_sitemap_files = max_sitemap_files
+        self.max_sitemap_urls = max_sitemap_urls
+
+    async def plan(self, start_url: str, max_seeds: int) -> CrawlPlan:
+        """
+        Plan a crawl. Failures are logged and leave the plan empty.
+
+        Args:
+            start_url: URL the crawl starts from
+            max_seeds: Maximum number of URLs to seed the frontier with
+
+        Returns:
+            CrawlPlan for the site
+        """
+        plan = CrawlPlan(start_url)
+        parsed = urlparse(start_url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+
+        sitemap_urls = await self._read_robots(plan, origin)
+        if sitemap_urls:
+            page_urls = await self._read_sitemaps(plan, sitemap_urls, parsed.netloc)
+        else:
+            # Guess the usual locations; the first sitemap that parses is enough
+            page_urls = []
+            for path in FALLBACK_SITEMAP_PATHS:
+                page_urls = await self._read_sitemaps(plan, [origin + path], parsed.netloc)
+                if plan.sitemaps_read:
+                    break
+        plan.sitemap_url_count = len(page_urls)
+        allowed = [url for url in page_urls if plan.can_fetch(url)]
+        plan.seeds = select_seeds(allowed, max_seeds)
+
+        logger.info(f"Crawl plan for {parsed.netloc}: {len(page_urls)} sitemap URLs, "
+                    f"{len(plan.seeds)} seeds, crawl-delay {plan.crawl_delay}")
+        return plan
+
+    async def _read_robots(self, plan: CrawlPlan, origin: str) -> List[str]:
+        """Fetch robots.txt into the plan and return the sitemaps it lists."""
+        try:
+            result = await self.fetcher.fetch(origin + "/robots.txt")
+        except Exception as e:
+            logger.warning(f"Could not fetch robots.txt for {origin}: {e}")
+            return []
+        if result.status_code >= 400:
+            return []
+
+        robots = RobotFileParser(origin + "/robots.txt")
+        robots.parse(result.text.splitlines())
+        plan.robots = robots
+
+        delay = robots.crawl_delay(ROBOTS_USER_AGENT)
+        if delay:
+            delay = float(delay)
+            if delay > CRAWLER_MAX_CRAWL_DELAY_SECONDS:
+                logger.warning(f"{origin} asks for a {delay}s crawl-delay; "
+                               f"using {CRAWLER_MAX_CRAWL_DELAY_SECONDS}s")
+                delay = CRAWLER_MAX_CRAWL_DELAY_SECONDS
+            plan.crawl_delay = delay
+
+        return [urljoin(origin, url) for url in (robots.site_maps() or [])]
+
+    async def _read_sitemaps(
+        self,
+        plan: CrawlPlan,
+        sitemap_urls: List[str],
+        host: str
+    ) -> List[str]:
+        """Read sitemaps breadth-first, following sitemap indexes."""
+        pending = list(sitemap_urls)
+        seen: Set[str] = set()
+        page_urls: List[str] = []
+        page_url_set: Set[str] = set()
+
+        while pending and len(plan.sitemaps_read) < self.max_sitemap_files:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+
+            try:
+                result = await self.fetcher.fetch(sitemap_url)
+                if result.status_code >= 400:
+                    continue
+                urls, children = parse_sitemap(result.content or result.text.encode("utf-8"))
+            except Exception as e:
+                logger.debug(f"Skipping sitemap {sitemap_url}: {e}")
+                continue
+
+            plan.sitemaps_read.append(sitemap_url)
+            pending.extend(sorted(children, key=_sitemap_order))
+            for url in urls:
+                if url not in page_url_set and _same_site(url, host):
+                    page_url_set.add(url)
+                    page_urls.append(url)
+            if len(page_urls) >= self.max_sitemap_urls:
+                break
+
+        return page_urls[:self.max_sitemap_urls]
@@ -11,10 +11,11 @@ import os
 import re
 import sys
 import time
+from contextlib import aclosing
 from typing import Dict, Any, Optional, List, Tuple, Set
 from urllib.parse import urlparse, urljoin
 
-from bs4 import BeautifulSoup, Tag
+from .domain_limiter import DomainLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,21 +25,54 @@ logger = logging.getLogger(__name__)
 from src.utils.logging_config import setup_logging
 setup_logging(logging.DEBUG)
 
-# --- Constants for Contact Extraction ---
-PHONE_REGEX = re.compile(r'(?:(?:\+|00)[1-9]\d{0,2}[\s.-]?)?(?:\(?\d{2,5}\)?[\s.-]?)?\d{3,4}[\s.-]?\d{3,4}')
-EMAIL_REGEX = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-STREET_REGEX = re.compile(r'\d{1,5}\s+[A-Za-z0-9\s\.\,\-\#]{4,60}')
-ZIP_CODE_REGEX = re.compile(r'\b\d{4,10}\b')
-SOCIAL_MEDIA_REGEX = re.compile(r'(?:https?://)?(?:www\.)?(?:facebook|instagram|twitter|linkedin|youtube|whatsapp|wa\.me|t\.me|tiktok)\.(?:com|me|org|net)/[\w\.-]+', re.IGNORECASE)
-# TODO: Load known cities/countries from config for better address matching
-CONTACT_SELECTORS = ['footer', 'address', '[class*="contact"]', '[id*="contact"]', '[class*="location"]', '[id*="location"]', '[class*="info"]', '[id*="info"]']
-# --- End Constants ---
-
-async def crawl_and_prepare_content(url: str, max_pages: int = 20, retry_count: int = 1) -> Dict[str, Any]:
+# Contact extraction lives in its own module; re-exported here for existing callers
+from .contact_extraction import (  # noqa: E402,F401
+    CONTACT_SELECTORS, EMAIL_REGEX, PHONE_REGEX, SOCIAL_MEDIA_REGEX, STREET_REGEX, ZIP_CODE_REGEX,
+    extract_contact_info, is_contact_page
+)
+
+# --- Crawl Concurrency ---
+# Number of pages loaded in parallel per crawl, and the cap per domain
+CRAWLER_CONCURRENCY = int(os.getenv("CRAWLER_CONCURRENCY", "4"))
+CRAWLER_PER_DOMAIN_CONCURRENCY = int(os.getenv("CRAWLER_PER_DOMAIN_CONCURRENCY", "4"))
+
+# --- Resource Blocking ---
+# Images, media, fonts and trackers are always aborted; third-party script stubbing is opt-in
+CRAWLER_STUB_THIRD_PARTY_SCRIPTS = os.getenv("CRAWLER_STUB_THIRD_PARTY_SCRIPTS", "false").lower() == "true"
+
+# --- Fetch Tiers ---
+# Try a plain HTTP fetch first and only render pages in Playwright when they look client-rendered
+CRAWLER_HTTP_FIRST = os.getenv("CRAWLER_HTTP_FIRST", "true").lower() == "true"
+
+# --- Crawl Planning ---
+# Seed the crawl from robots.txt and sitemaps and honour robots rules and crawl-delay
+CRAWLER_USE_SITEMAP = os.getenv("CRAWLER_USE_SITEMAP", "true").lower() == "true"
+
+# --- Page Cache ---
+# Reuse pages from earlier crawls when a conditional request shows they are unchanged
+CRAWLER_PAGE_CACHE = os.getenv("CRAWLER_PAGE_CACHE", "true").lower() == "true"
+
+# --- HTML Storage ---
+# Keep page HTML in the local blob store; results only carry its hash and size
+CRAWLER_STORE_HTML = os.getenv("CRAWLER_STORE_HTML", "true").lower() == "true"
+
+# --- Page Text ---
+# Characters of extracted text kept per page for the analysis prompt (0 keeps none).
+# The prompt's page section is a few thousand tokens shared by every page, so
+# about 500 tokens per page is all it can use; more only grows raw_content.
+CRAWLER_PAGE_TEXT_CHARS = int(os.getenv("CRAWLER_PAGE_TEXT_CHARS", "2000"))
+
+async def crawl_and_prepare_content(
+    url: str,
+    max_pages: int = 20,
+    retry_count: int = 1,
+    domain_limiter: Optional[DomainLimiter] = None
+) -> Dict[str, Any]:
     """
     Crawls a website using SimpleCrawler, extracts content and products,
     enhances with contact info, calculates confidence, and formats the output.
     Handles retries and returns a specific error structure on final failure.
+    Pass a shared domain_limiter to keep concurrent crawls within global limits.
     """
     # Ensure URL has a scheme
     parsed_original = urlparse(url)
@@ -64,25 +98,33 @@ async def crawl_and_prepare_content(url: str, max_pages: int = 20, retry_count:
         "detected_pdf_urls": [] # New field for detected PDF URLs
     }
 
+    # One crawler for all attempts; browser contexts are leased from the shared pool
+    from .simple_crawler import SimpleCrawler
+    from .browser_pool import get_browser_pool
+    from .resource_blocking import ResourceBlockingProfile
+    from .page_cache import get_page_cache
+    from .blob_store import get_blob_store
+    from .parse_executor import CRAWLER_PARSE_WORKERS, get_parse_executor
+    crawler = SimpleCrawler(
+        max_pages=max_pages,
+        concurrency=CRAWLER_CONCURRENCY,
+        per_domain_concurrency=CRAWLER_PER_DOMAIN_CONCURRENCY,
+        domain_limiter=domain_limiter,
+        browser_pool=await get_browser_pool(),
+        resource_blocking=ResourceBlockingProfile(stub_third_party_scripts=CRAWLER_STUB_THIRD_PARTY_SCRIPTS),
+        http_first=CRAWLER_HTTP_FIRST,
+        use_sitemap=CRAWLER_USE_SITEMAP,
+        page_cache=get_page_cache() if CRAWLER_PAGE_CACHE else None,
+        html_store=get_blob_store() if CRAWLER_STORE_HTML else None,
+        parse_executor=get_parse_executor() if CRAWLER_PARSE_WORKERS > 0 else None
+    )
+
     for attempt in range(retry_count + 1):
         try:
             logger.info(f"Starting crawl attempt {attempt + 1} for {url}")
-            # --- IMPORTANT: Adjust SimpleCrawler instantiation and method call --- 
-            # Make sure 'SimpleCrawler' is imported and the method name ('run_async') is correct.
-            from .simple_crawler import SimpleCrawler # Ensure import
-            crawler = SimpleCrawler(max_pages=max_pages)
-            crawled_data = await crawler.crawl(url) # Use the correct 'crawl' method
-            logger.debug(f"Raw crawl_results received: {crawled_data}") # Log the entire result
-
-            if not crawled_data or not crawled_data.get(url):
-                 # Check if any data returned at all, even if start URL failed but others worked
-                 if not crawled_data:
-                     raise ValueError("Crawler returned no data at all.")
-                 else: # Data exists, but maybe not for the exact start URL - proceed if other pages found
-                     logger.warning(f"Crawler did not return data specifically for the start URL {url}, but other pages might exist.")
-
-            # Process successful crawl (even if start URL itself failed but others were found)
+            result["pages"] = [] # Start each attempt from a clean slate
             result["metadata"]["crawl_status"] = "partial" # Assume partial until verified complete
+            start_url_crawled = False
 
             successful_pages_count = 0
             aggregated_contacts: Dict[str, Set[str]] = {
@@ -91,112 +133,87 @@ async def crawl_and_prepare_content(url: str, max_pages: int = 20, retry_count:
             all_products = [] # Collect products from all pages
             detected_pdfs_in_loop = [] # Use a temporary list
 
-            pages_list = crawled_data.get('pages', [])
-            logger.debug(f"Processing {len(pages_list)} pages found in crawl results.")
-
-            for page_data in pages_list:
-                # page_data is now guaranteed to be a dictionary from the list
-
-                logger.debug(f"--- Loop Iteration Start ---")
-                page_url_from_data = page_data.get('url', 'Unknown URL')
-                logger.debug(f"Processing page_url from data: {page_url_from_data}")
-                logger.debug(f"Full page_data for this iteration: {page_data}")
-
-                # Initialize page summary dict
-                page_summary = {
-                    "url": page_url_from_data,
-                    "title": page_data.get("title", ""),
-                    "status": 'success' if page_data.get("text") else 'processed_no_text', # Simplified status based on text presence
-                    "error": None # Assume no error if we got this far, SimpleCrawler logs errors internally
-                }
-                
-                # Check page status and content (using the correct keys from SimpleCrawler's page_data)
-                if page_data.get("text"):
-                    successful_pages_count += 1
-                    page_url_for_check = page_data.get("url", "")
-                    is_contact = "contact" in page_url_for_check.lower() # Simple check based on URL
-
+            # Pages are processed as they arrive, while later pages are still loading
+            async with aclosing(crawler.iter_pages(url)) as pages:
+                async for page_data in pages:
                     logger.debug(f"--- Loop Iteration Start ---")
-                    logger.debug(f"Processing page_url in loop: {page_url_for_check}")
+                    page_url_from_data = page_data.get('url', 'Unknown URL')
+                    start_url_crawled = start_url_crawled or page_url_from_data == url
+                    logger.debug(f"Processing page_url from data: {page_url_from_data}")
                     logger.debug(f"Full page_data for this iteration: {page_data}")
 
-                    # --- Task 1: Extract contacts per page --- 
-                    page_contacts = extract_contact_info(
-                        page_data["text"],
-                        page_url_for_check,
-                        is_contact_page=is_contact
-                    )
-                    for key in aggregated_contacts:
-                        aggregated_contacts[key].update(page_contacts.get(key, []))
-                    # --- End Task 1 --- 
-
-                    page_products = page_data.get("products_found", [])
-                    all_products.extend(page_products)
-                    # Add page-specific details if needed for debugging/analysis
-                    page_summary["products_found_on_page"] = len(page_products)
-                    page_summary["contacts_found_on_page"] = {k: len(v) for k, v in page_contacts.items()}
-                    # Avoid storing full text/HTML unless necessary due to size
-                    # page_summary["text_content_preview"] = BeautifulSoup(page_data["content"], 'html.parser').get_text(separator=' ', strip=True)[:500] + "..."
+                    # Initialize page summary dict
+                    page_summary = {
+                        "url": page_url_from_data,
+                        "title": page_data.get("title", ""),
+                        "page_type": page_data.get("page_type") or page_data.get("type"),
+                        "status": 'success' if page_data.get("text") else 'processed_no_text', # Simplified status based on text presence
+                        "error": None # Assume no error if we got this far, SimpleCrawler logs errors internally
+                    }
                 
-                result["pages"].append(page_summary)
-
-                # --- ADDED HTML LOGGING (MODIFIED FOR BODY HTML DEBUG) ---
-                page_url = page_data.get('url', 'N/A')
-                page_body_html_snippet = page_data.get('body_html_debug', '')[:5000] # Log first 5000 chars of body
-                logger.info(f"Body HTML Snippet for {page_url}:\n{page_body_html_snippet}\n---")
-                # --- END ADDED HTML LOGGING ---
+                    # Check page status and content (using the correct keys from SimpleCrawler's page_data)
+                    if page_data.get("text"):
+                        successful_pages_count += 1
+                        page_url_for_check = page_data.get("url", "")
+
+                        # --- Task 1: Extract contacts per page --- 
+                        # The crawler extracts contacts from its own parse of the page;
+                        # pages cached before that fall back to parsing the text
+                        page_contacts = page_data.get("contacts")
+                        if page_contacts is None:
+                            page_contacts = extract_contact_info(
+                                page_data["text"],
+                                page_url_for_check,
+                                is_contact_page=is_contact_page(page_url_for_check)
+                            )
+                        for key in aggregated_contacts:
+                            aggregated_contacts[key].update(page_contacts.get(key, []))
+                        # --- End Task 1 --- 
+
+                        page_products = page_data.get("products_found", [])
+                        all_products.extend(page_products)
+                        # Add page-specific details if needed for debugging/analysis
+                        page_summary["products_found_on_page"] = len(page_products)
+                        page_summary["contacts_found_on_page"] = {k: len(v) for k, v in page_contacts.items()}
+                        # Keep a bounded slice of the text; the analysis prompt budgets it further
+                        if CRAWLER_PAGE_TEXT_CHARS > 0:
+                            page_summary["text_content"] = page_data["text"][:CRAWLER_PAGE_TEXT_CHARS]
                 
-                # --- Add PDF Link Detection --- 
-                if page_data.get("text"):
-                     try:
-                         page_soup = BeautifulSoup(page_data["text"], 'html.parser')
-                         pdf_links = page_soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
-                         
-                         for link in pdf_links:
-                             href = link.get('href')
-                             if href:
-                                 pdf_url = urljoin(page_url_for_check, href)
-                                 anchor_text = link.get_text(strip=True)
-                                 if not anchor_text:
-                                     # Use filename as fallback anchor text
-                                     try:
-                                         anchor_text = pdf_url.split('/')[-1]
-                                     except Exception:
-                                         anchor_text = "Unnamed PDF"
-                                 
-                                 pdf_info = {
-                                     "pdf_url": pdf_url,
-                                     "anchor_text": anchor_text,
-                                     "source_page_url": page_url_for_check,
-                                     "source_page_title": page_data.get("title", "")
-                                 }
-                                 detected_pdfs_in_loop.append(pdf_info)
-                     except Exception as pdf_err:
-                          logger.warning(f"Error detecting PDF links on {page_url_for_check}: {pdf_err}")
-                # --- End PDF Link Detection ---
+                    # Body HTML stays in the blob store; keep only its hash and size
+                    if page_data.get("body_html_blob"):
+                        page_summary["html_blob"] = page_data["body_html_blob"]
+                    result["pages"].append(page_summary)
                 
-                # --- PDF Detection --- 
-                logger.debug(f"Checking links found on page: {page_url_from_data}") # Uses key from iterator
-                page_found_links = page_data.get('found_links', []) # CORRECT KEY: found_links
-                logger.debug(f"Found links data using .get('found_links'): {page_found_links}")
+                    # --- PDF Detection --- 
+                    # found_links come from the crawler's single parse of the page HTML
+                    logger.debug(f"Checking links found on page: {page_url_from_data}") # Uses key from iterator
+                    page_found_links = page_data.get('found_links', []) # CORRECT KEY: found_links
+                    logger.debug(f"Found links data using .get('found_links'): {page_found_links}")
  
-                for link in page_found_links:
-                    href = link.get('href', '')
-                    text = link.get('text', '')
-                    href_lower = href.lower()
-                    # Aggressively remove all whitespace before checking
-                    cleaned_href = re.sub(r'\s+', '', href_lower)
-                    last_chars = cleaned_href[-4:] if len(cleaned_href) >= 4 else ""
-                    is_pdf = cleaned_href.endswith('.pdf')
-                    if is_pdf:
-                        pdf_info = {
-                            'url': href, # Store original href
-                            'text': text,
-                            'source_page': page_url_from_data
-                        }
-                        detected_pdfs_in_loop.append(pdf_info)
-                # --- End PDF Detection ---
+                    for link in page_found_links:
+                        href = link.get('href', '')
+                        text = link.get('text', '')
+                        href_lower = href.lower()
+                        # Aggressively remove all whitespace before checking
+                        cleaned_href = re.sub(r'\s+', '', href_lower)
+                        last_chars = cleaned_href[-4:] if len(cleaned_href) >= 4 else ""
+                        is_pdf = cleaned_href.endswith('.pdf')
+                        if is_pdf:
+                            pdf_info = {
+                                'url': href, # Store original href
+                                'text': text,
+                                'source_page': page_url_from_data
+                            }
+                            detected_pdfs_in_loop.append(pdf_info)
+                    # --- End PDF Detection ---
                 
+            if not start_url_crawled:
+                # Proceed anyway if other pages were found
+                logger.warning(f"Crawler did not return data specifically for the start URL {url}, but other pages might exist.")
+            for stats_key in ("resource_blocking", "fetch_tiers", "crawl_plan"):
+                if crawler.results["metadata"].get(stats_key):
+                    result["metadata"][stats_key] = crawler.results["metadata"][stats_key]
+
             # Assign the collected PDFs after the loop
             result["detected_pdf_urls"] = detected_pdfs_in_loop
 
@@ -275,67 +292,19 @@ async def crawl_and_prepare_content(url: str, max_pages: int = 20, retry_count:
     return result
 
 
-def extract_contact_info(page_content: str, url: str, is_contact_page: bool = False) -> Dict[str, Any]:
+async def shutdown_crawler_resources() -> None:
     """
-    Extracts contact information (emails, phones, addresses, social links)
-    from HTML content, prioritizing specific tags and Schema.org data.
+    Close the process-wide browser pool, HTTP client, page cache and parse workers.
+    Call this before the event loop that used them shuts down.
     """
-    soup = BeautifulSoup(page_content, 'html.parser')
-    contacts: Dict[str, Set[str]] = {
-        "emails": set(),
-        "phones": set(),
-        "addresses": set(),
-        "social_links": set(),
-    }
-    all_text = ""
-
-    # 1. Prioritize Schema.org (ld+json) - Placeholder for now
-    # try:
-    #     schema_tags = soup.find_all('script', type='application/ld+json')
-    #     for tag in schema_tags:
-    #         # Add Schema.org parsing logic here
-    #         pass 
-    # except Exception as e:
-    #     logger.error(f"Error processing schema tags on {url}: {e}")
-
-    # 2. Prioritize specific HTML sections
-    relevant_text_sections = []
-    for selector in CONTACT_SELECTORS:
-        elements = soup.select(selector)
-        for element in elements:
-            hidden = False
-            curr = element
-            while curr and curr.name != 'body': # Check ancestors up to body
-                style = curr.attrs.get('style', '').lower()
-                classes = curr.attrs.get('class', [])
-                if 'display: none' in style or 'visibility: hidden' in style or \
-                   any(cls in ['hidden', 'sr-only', 'visually-hidden'] for cls in classes):
-                    hidden = True
-                    break
-                curr = curr.parent
-            
-            if not hidden:
-                 relevant_text_sections.append(element.get_text(separator=' ', strip=True))
-
-    prioritized_text = " ".join(relevant_text_sections) if relevant_text_sections else ""
-
-    # 3. Extract from prioritized text first, then from all text if needed
-    search_texts = [prioritized_text]
-    if not prioritized_text or is_contact_page: # Always search full page if contact page
-         all_text = soup.get_text(separator=' ', strip=True)
-         search_texts.append(all_text)
-
-    for text in search_texts:
-        if not text: continue
-
-        contacts["emails"].update(email.strip() for email in re.findall(EMAIL_REGEX, text))
-        contacts["phones"].update(phone.strip() for phone in re.findall(PHONE_REGEX, text))
-        contacts["social_links"].update(link.strip() for link in re.findall(SOCIAL_MEDIA_REGEX, text))
-        contacts["addresses"].update(addr.strip() for addr in re.findall(STREET_REGEX, text)) # Basic street address for now
-        # TODO: Add ZIP, City, Country extraction and combine into structured addresses
-
-    # Convert sets back to lists for JSON serialization
-    return {k: list(v) for k, v in contacts.items()}
+    from .browser_pool import shutdown_browser_pool
+    from .http_fetcher import shutdown_http_fetcher
+    from .page_cache import shutdown_page_cache
+    from .parse_executor import shutdown_parse_executor
+    await shutdown_browser_pool()
+    await shutdown_http_fetcher()
+    shutdown_page_cache()
+    shutdown_parse_executor()
 
 
 async def crawl_url_for_assessment(url: str, max_pages: int = 20) -> Dict[str, Any]:
@@ -0,0 +1,96 @@
+"""
+Per-domain concurrency limiting for the TradeWizard crawlers.
+Keeps concurrent crawls polite by capping how many pages may be loading
+from the same domain (and optionally in total) at any one time, and by
+spacing out page loads on each domain.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+
+class DomainLimiter:
+    """
+    Caps the number of in-flight page loads per domain.
+    A single limiter can be shared by several crawlers so the caps hold globally.
+    """
+
+    def __init__(self, max_per_domain: int = 4, max_total: Optional[int] = None, min_interval: float = 0.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_per_domain: Maximum number of concurrent page loads per domain
+            max_total: Maximum number of concurrent page loads across all domains
+            min_interval: Default minimum seconds between page load starts on a domain
+        """
+        self.max_per_domain = max(1, max_per_domain)
+        self.max_total = max_total
+        self.default_min_interval = min_interval
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._total = asyncio.Semaphore(max_total) if max_total else None
+        self._min_intervals: Dict[str, float] = {}
+        self._next_start: Dict[str, float] = {}
+        self._spacing_locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        """Return the normalized domain key for a URL."""
+        return urlparse(url).netloc.lower()
+
+    def _semaphore_for(self, domain: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(domain)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_domain)
+            self._semaphores[domain] = semaphore
+        return semaphore
+
+    def set_min_interval(self, domain: str, seconds: Optional[float]) -> None:
+        """
+        Require a minimum gap between the starts of page loads on a domain,
+        e.g. a robots.txt crawl-delay. The default interval still applies if longer.
+
+        Args:
+            domain: Domain key as returned by domain_of
+            seconds: Minimum interval (None or 0 removes the override)
+        """
+        if seconds:
+            self._min_intervals[domain] = float(seconds)
+        else:
+            self._min_intervals.pop(domain, None)
+
+    def min_interval(self, domain: str) -> float:
+        """Return the minimum interval between page loads on a domain."""
+        return max(self._min_intervals.get(domain, 0.0), self.default_min_interval)
+
+    async def _wait_for_turn(self, domain: str) -> None:
+        interval = self.min_interval(domain)
+        if not interval:
+            return
+        lock = self._spacing_locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_start.get(domain, 0.0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start[domain] = loop.time() + interval
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot for the domain of the given URL.
+
+        Args:
+            url: URL about to be fetched
+        """
+        domain = self.domain_of(url)
+        async with self._semaphore_for(domain):
+            await self._wait_for_turn(domain)
+            if self._total is None:
+                yield
+            else:
+                # Taken last so a busy domain never holds a global slot while it waits
+                async with self._total:
+                    yield
@@ -0,0 +1,117 @@
+"""
+Crawl frontier shared by the TradeWizard crawlers.
+A priority heap of URLs still to crawl, with O(1) membership checks and
+depth tracking, so per-page queue overhead stays constant as sites grow.
+"""
+
+import heapq
+import itertools
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+# URL path patterns in priority order (lower number = crawl sooner)
+PRIORITY_PATTERNS: List[Tuple[re.Pattern, int]] = [
+    # Highest priority: product/shop pages
+    (re.compile(r'/(shop|store|products?|menu)'), 0),
+    # High priority: about/contact pages
+    (re.compile(r'/(about|contact)'), 1),
+    # Medium priority: category pages
+    (re.compile(r'/(category|cat|collection|tag)'), 2),
+    # Lower priority: individual product pages (we want categories first)
+    (re.compile(r'/product/[^/]+'), 3),
+]
+DEFAULT_PRIORITY = 4
+
+
+def url_priority(url: str, depth: int = 0, depth_penalty: bool = False) -> int:
+    """
+    Score a URL for crawl order.
+
+    Args:
+        url: URL to score
+        depth: Link depth at which the URL was found
+        depth_penalty: Push unmatched URLs back by their depth
+
+    Returns:
+        Priority score (lower is crawled first)
+    """
+    path = urlparse(url).path.lower()
+    for pattern, priority in PRIORITY_PATTERNS:
+        if pattern.search(path):
+            return priority
+    return DEFAULT_PRIORITY + depth if depth_penalty else DEFAULT_PRIORITY
+
+
+class CrawlFrontier:
+    """
+    Priority queue of URLs to crawl.
+
+    Priorities are computed once when a URL is pushed. URLs with equal
+    priority come out in the order they were found. A URL is only ever
+    queued once per crawl, whether or not it has been popped since.
+    """
+
+    def __init__(self, depth_penalty: bool = False):
+        """
+        Initialize an empty frontier.
+
+        Args:
+            depth_penalty: Push unmatched URLs back by their depth when scoring
+        """
+        self.depth_penalty = depth_penalty
+        self._heap: List[Tuple[int, int, str]] = []
+        self._counter = itertools.count()
+        self._seen: Set[str] = set()
+        self._depths: Dict[str, int] = {}
+
+    def push(self, url: str, depth: int = 0, priority: Optional[int] = None) -> bool:
+        """
+        Queue a URL unless it has been seen before.
+
+        Args:
+            url: Normalized URL to queue
+            depth: Link depth at which the URL was found
+            priority: Explicit priority (scored from the URL if omitted)
+
+        Returns:
+            True if the URL was queued
+        """
+        if url in self._seen:
+            return False
+        if priority is None:
+            priority = url_priority(url, depth, self.depth_penalty)
+        self._seen.add(url)
+        self._depths[url] = depth
+        heapq.heappush(self._heap, (priority, next(self._counter), url))
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        """
+        Remove and return the highest-priority URL.
+
+        Returns:
+            Tuple of (url, depth)
+
+        Raises:
+            IndexError: If the frontier is empty
+        """
+        _, _, url = heapq.heappop(self._heap)
+        return url, self._depths[url]
+
+    def mark_seen(self, url: str) -> None:
+        """Record a URL as handled without queueing it."""
+        self._seen.add(url)
+
+    def depth_of(self, url: str) -> Optional[int]:
+        """Return the depth a URL was queued at, if known."""
+        return self._depths.get(url)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._seen
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
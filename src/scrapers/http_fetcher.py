@@ -0,0 +1,196 @@
+"""
+Plain HTTP fetch tier for the TradeWizard crawlers.
+Most SME sites are server-rendered (WordPress, WooCommerce), so pages are
+first fetched with a pooled keep-alive HTTP client and only escalated to a
+Playwright browser when the HTML looks client-rendered.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits (overridable from the environment)
+HTTP_FETCH_MAX_CONNECTIONS = int(os.getenv("HTTP_FETCH_MAX_CONNECTIONS", "20"))
+HTTP_FETCH_MAX_KEEPALIVE = int(os.getenv("HTTP_FETCH_MAX_KEEPALIVE", "10"))
+HTTP_FETCH_TIMEOUT_SECONDS = float(os.getenv("HTTP_FETCH_TIMEOUT_SECONDS", "20"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36 TradeWizard/1.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-ZA,en;q=0.9",
+}
+
+# Status codes that usually mean bot protection rather than a missing page;
+# a real browser often gets through.
+ESCALATE_STATUS_CODES = {403, 429, 503}
+
+# Below this much visible body text a page is assumed to be rendered by JavaScript
+MIN_VISIBLE_TEXT_CHARS = 200
+
+# Markers left in the server HTML by client-side frameworks
+SPA_MARKERS = [
+    re.compile(r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|___gatsby)["\'][^>]*>\s*</div>', re.IGNORECASE),
+    re.compile(r'\bng-app\b|\bng-version=', re.IGNORECASE),
+    re.compile(r'<noscript>[^<]*(?:enable|requires?) javascript', re.IGNORECASE),
+    re.compile(r'window\.__(?:INITIAL_STATE|PRELOADED_STATE|NUXT)__', re.IGNORECASE),
+]
+
+
+class HttpFetchResult:
+    """Outcome of a plain HTTP fetch."""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], text: str, content: bytes = b""):
+        self.url = url  # Final URL after redirects
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.content = content  # Raw body, for binary responses such as .xml.gz sitemaps
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "").lower()
+
+    @property
+    def is_html(self) -> bool:
+        return "html" in self.content_type or not self.content_type
+
+
+def needs_browser(html: str, soup: BeautifulSoup) -> Tuple[bool, str]:
+    """
+    Decide whether a server-rendered HTML document needs a JavaScript engine.
+
+    Args:
+        html: Raw HTML as served
+        soup: Parsed HTML (not yet modified)
+
+    Returns:
+        Tuple of (needs_browser, reason)
+    """
+    body = soup.body
+    if body is None:
+        return True, "no_body"
+
+    if not body.find("a", href=True):
+        return True, "no_links"
+
+    visible_text = " ".join(
+        s.strip() for s in body.find_all(string=True)
+        if s.parent and s.parent.name not in ("script", "style", "noscript", "template") and s.strip()
+    )
+    if len(visible_text) < MIN_VISIBLE_TEXT_CHARS:
+        return True, "empty_body"
+
+    for marker in SPA_MARKERS:
+        if marker.search(html):
+            return True, "spa_marker"
+
+    return False, "server_rendered"
+
+
+class FetchTierCache:
+    """Remembers, per domain, whether pages can be served by the HTTP tier."""
+
+    HTTP = "http"
+    BROWSER = "browser"
+
+    def __init__(self, ttl_seconds: float = 24 * 3600):
+        self.ttl_seconds = ttl_seconds
+        self._tiers: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, domain: str) -> Optional[str]:
+        entry = self._tiers.get(domain)
+        if entry is None:
+            return None
+        tier, decided_at = entry
+        if time.monotonic() - decided_at > self.ttl_seconds:
+            del self._tiers[domain]
+            return None
+        return tier
+
+    def set(self, domain: str, tier: str) -> None:
+        self._tiers[domain] = (tier, time.monotonic())
+
+
+# Decisions are shared by every crawl in the process
+FETCH_TIER_CACHE = FetchTierCache()
+
+
+class HttpFetcher:
+    """Async HTTP client with a shared keep-alive connection pool."""
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_FETCH_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_FETCH_MAX_KEEPALIVE,
+        timeout: float = HTTP_FETCH_TIMEOUT_SECONDS
+    ):
+        """
+        Initialize the fetcher.
+
+        Args:
+            max_connections: Maximum open connections across all hosts
+            max_keepalive_connections: Idle connections kept open for reuse
+            timeout: Request timeout in seconds
+        """
+        self.loop = asyncio.get_running_loop()
+        self.client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpFetchResult:
+        """
+        Fetch a URL.
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers
+
+        Returns:
+            HttpFetchResult for the final response
+        """
+        response = await self.client.get(url, headers=headers)
+        return HttpFetchResult(
+            url=str(response.url),
+            status_code=response.status_code,
+            headers={k.lower(): v for k, v in response.headers.items()},
+            text=response.text,
+            content=response.content
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+# --- Process-wide fetcher ---
+
+_shared_fetcher: Optional[HttpFetcher] = None
+
+
+async def get_http_fetcher() -> HttpFetcher:
+    """Return the process-wide HTTP fetcher, creating it for the running loop."""
+    global _shared_fetcher
+    if _shared_fetcher is None or _shared_fetcher.loop is not asyncio.get_running_loop():
+        _shared_fetcher = HttpFetcher()
+    return _shared_fetcher
+
+
+async def shutdown_http_fetcher() -> None:
+    """Close the process-wide HTTP fetcher if it was created on this loop."""
+    global _shared_fetcher
+    fetcher, _shared_fetcher = _shared_fetcher, None
+    if fetcher is not None and fetcher.loop is asyncio.get_running_loop():
+        await fetcher.close()
@@ -0,0 +1,304 @@
+"""
+On-disk page cache for re-crawls.
+Stores each crawled page's extracted record (rendered HTML, text, links) in a
+compressed SQLite row keyed by a hash of the normalized URL, together with the
+ETag/Last-Modified validators needed to revalidate it cheaply. Methods block on
+SQLite, so async callers run them with asyncio.to_thread.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, urlunparse
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", os.path.join(".cache", "tradewizard"))
+# Entries older than this are never reused, even if the server would say 304
+PAGE_CACHE_TTL_SECONDS = float(os.getenv("PAGE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Least recently used entries are evicted once the cache grows past this
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Cache hits are recorded in memory and written back in batches of this size
+PAGE_CACHE_ACCESS_FLUSH = 100
+
+# fetch_tier reported for pages served from the cache
+CACHE_TIER = "cache"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    fetch_tier TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for use as a cache key (lowercase host, no fragment)."""
+    parsed = urlparse(url.strip())
+    return urlunparse((
+        parsed.scheme.lower(),
+        parsed.netloc.lower(),
+        parsed.path or "/",
+        parsed.params,
+        parsed.query,
+        ""
+    ))
+
+
+def cache_key(url: str) -> str:
+    """Return the cache key for a URL."""
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def content_hash(body: str) -> str:
+    """Hash a response body so unchanged pages can be recognised without validators."""
+    return hashlib.sha256(body.encode("utf-8", "replace")).hexdigest()
+
+
+class CachedPage:
+    """A page record read back from the cache."""
+
+    def __init__(
+        self,
+        url: str,
+        fetch_tier: str,
+        page_data: Dict[str, Any],
+        crawlable_links: List[str],
+        etag: Optional[str],
+        last_modified: Optional[str],
+        content_hash: Optional[str],
+        fetched_at: float
+    ):
+        self.url = url
+        self.fetch_tier = fetch_tier
+        self.page_data = page_data
+        self.crawlable_links = crawlable_links
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.fetched_at = fetched_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Return If-None-Match/If-Modified-Since headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Size-bounded LRU cache of crawled pages backed by SQLite (safe to share across threads)."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: float = PAGE_CACHE_TTL_SECONDS,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES
+    ):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite file (defaults to pages.sqlite3 in PAGE_CACHE_DIR)
+            ttl_seconds: Maximum age of an entry before it is discarded
+            max_bytes: Total compressed size kept before evicting old entries
+        """
+        if path is None:
+            os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+            path = os.path.join(PAGE_CACHE_DIR, "pages.sqlite3")
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        # Kept up to date on every write so puts never scan the table
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        # key -> accessed_at of hits not yet written back
+        self._pending_access: Dict[str, float] = {}
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """
+        Look up a page, discarding it if it is older than the TTL.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            CachedPage, or None on a miss
+        """
+        key = cache_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, fetch_tier, etag, last_modified, content_hash, fetched_at, data "
+                "FROM pages WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            cached_url, fetch_tier, etag, last_modified, body_hash, fetched_at, data = row
+            now = time.time()
+            if now - fetched_at > self.ttl_seconds:
+                self._delete(key)
+                return None
+
+            try:
+                record = json.loads(zlib.decompress(data))
+            except (zlib.error, ValueError) as e:
+                logger.warning(f"Dropping unreadable cache entry for {url}: {e}")
+                self._delete(key)
+                return None
+
+            self._pending_access[key] = now
+            if len(self._pending_access) >= PAGE_CACHE_ACCESS_FLUSH:
+                self._flush_access()
+        return CachedPage(
+            url=cached_url,
+            fetch_tier=fetch_tier,
+            page_data=record["page_data"],
+            crawlable_links=record["crawlable_links"],
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=body_hash,
+            fetched_at=fetched_at
+        )
+
+    def put(
+        self,
+        url: str,
+        page_data: Dict[str, Any],
+        crawlable_links: List[str],
+        headers: Optional[Dict[str, str]] = None,
+        body_hash: Optional[str] = None
+    ) -> None:
+        """
+        Store a freshly crawled page.
+
+        Args:
+            url: Page URL
+            page_data: Extracted page record
+            crawlable_links: Links the crawler queued from the page
+            headers: Response headers (lowercased) carrying ETag/Last-Modified
+            body_hash: content_hash of the raw response body, if known
+        """
+        headers = headers or {}
+        data = zlib.compress(
+            json.dumps({"page_data": page_data, "crawlable_links": crawlable_links}).encode("utf-8")
+        )
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(key, url, fetch_tier, etag, last_modified, content_hash, fetched_at, accessed_at, size, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, url, page_data.get("fetch_tier", ""),
+                    headers.get("etag"), headers.get("last-modified"), body_hash,
+                    now, now, len(data), data
+                )
+            )
+            self._conn.commit()
+            self._pending_access.pop(key, None)
+            self._total_bytes += len(data) - (previous[0] if previous else 0)
+            self._evict()
+
+    def touch(self, url: str) -> None:
+        """Mark a page as revalidated now, restarting its TTL."""
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop(key, None)
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key)
+            )
+            self._conn.commit()
+
+    def total_bytes(self) -> int:
+        """Return the total compressed size of all entries."""
+        return self._total_bytes
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+        self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+        self._conn.commit()
+        self._pending_access.pop(key, None)
+        if row:
+            self._total_bytes -= row[0]
+
+    def _flush_access(self) -> None:
+        """Write back the access times of recent hits in one transaction."""
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE pages SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+        )
+        self._conn.commit()
+        self._pending_access.clear()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        excess = self._total_bytes - self.max_bytes
+        if excess <= 0:
+            return
+        # Recent hits must count before choosing what to evict
+        self._flush_access()
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM pages ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", evicted)
+        self._conn.commit()
+        logger.debug(f"Evicted {len(evicted)} pages from the page cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access()
+            self._conn.close()
+
+
+# --- Process-wide cache ---
+
+_shared_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> PageCache:
+    """Return the process-wide page cache, opening it on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = PageCache()
+    return _shared_cache
+
+
+def shutdown_page_cache() -> None:
+    """Close the process-wide page cache."""
+    global _shared_cache
+    cache, _shared_cache = _shared_cache, None
+    if cache is not None:
+        cache.close()
@@ -0,0 +1,229 @@
+"""
+Single-pass in-page extraction for Playwright crawls.
+Collects the title, links with anchor text, visible text, product candidates,
+JSON-LD and HTML in one page.evaluate call instead of one CDP round trip per
+element.
+"""
+
+import logging
+from typing import Any, Dict, Iterable
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+PAGE_EXTRACTION_SCRIPT = r"""
+(options) => {
+    const opts = options || {};
+    const title = document.title || '';
+
+    // --- Links: raw href (for urljoin), resolved URL and anchor text ---
+    const links = [];
+    for (const a of document.querySelectorAll('a[href]')) {
+        links.push({
+            href: a.getAttribute('href'),
+            url: a.href,
+            text: (a.innerText || '').trim()
+        });
+    }
+
+    // --- JSON-LD blocks (Product, Organization, LocalBusiness, ...) ---
+    const jsonLd = [];
+    for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+        try {
+            jsonLd.push(JSON.parse(script.textContent));
+        } catch (e) {
+            // Malformed blocks are common on CMS sites; skip them
+        }
+    }
+
+    // --- Visible text ---
+    let text = '';
+    if (opts.includeText) {
+        const getVisibleText = (element) => {
+            if (!element) return '';
+
+            // Text nodes have no computed style
+            if (element.nodeType === Node.TEXT_NODE) {
+                return element.textContent.trim();
+            }
+            if (element.nodeType !== Node.ELEMENT_NODE) return '';
+
+            // Skip script and style elements
+            if (element.tagName === 'SCRIPT' || element.tagName === 'STYLE' ||
+                element.tagName === 'NOSCRIPT' || element.tagName === 'IFRAME') {
+                return '';
+            }
+
+            // Skip hidden elements
+            const style = window.getComputedStyle(element);
+            if (style && (style.display === 'none' || style.visibility === 'hidden')) {
+                return '';
+            }
+
+            // For headings, add markdown-style formatting
+            if (element.tagName.match(/^H[1-6]$/)) {
+                const level = element.tagName[1];
+                return '\n' + '#'.repeat(parseInt(level)) + ' ' + element.textContent.trim() + '\n';
+            }
+
+            // For paragraphs, add a newline after
+            if (element.tagName === 'P') {
+                return element.textContent.trim() + '\n';
+            }
+
+            // For list items, add a bullet
+            if (element.tagName === 'LI') {
+                return '- ' + element.textContent.trim() + '\n';
+            }
+
+            // For other elements, just return their text
+            let result = '';
+            if (element.childNodes && element.childNodes.length > 0) {
+                for (const child of element.childNodes) {
+                    result += getVisibleText(child) + ' ';
+                }
+            } else {
+                result = element.textContent.trim();
+            }
+            return result.trim();
+        };
+
+        // Get all elements that typically contain meaningful text
+        const textContainers = document.querySelectorAll('h1, h2, h3, h4, h5, h6, p, li, td, th, div, span, a, button, label');
+        for (const container of textContainers) {
+            // Skip if parent is already processed to avoid duplication
+            if (container.parentElement &&
+                (container.parentElement.tagName === 'LI' ||
+                 container.parentElement.tagName === 'P')) {
+                continue;
+            }
+            const part = getVisibleText(container);
+            if (part) {
+                text += part + ' ';
+            }
+        }
+        text = text
+            .replace(/\s+/g, ' ')  // Replace multiple spaces with a single space
+            .replace(/\n\s+/g, '\n')  // Clean up newlines
+            .trim();
+    }
+
+    // --- Product candidates ---
+    const products = [];
+    const wantProducts = opts.includeProducts ||
+        (opts.productTitleTerms || []).some(term => title.toLowerCase().includes(term));
+    if (wantProducts) {
+        // Helper to extract text and clean it
+        const getText = (el) => el ? el.textContent.trim() : null;
+
+        // Helper to extract price (looking for currency patterns)
+        const extractPrice = (value) => {
+            if (!value) return null;
+            // Match common price patterns (R123, R123.45, R123,45, R123 - R456)
+            const priceMatch = value.match(/R\s*[\d,.]+(?:\s*-\s*R\s*[\d,.]+)?/g);
+            return priceMatch ? priceMatch[0].trim() : null;
+        };
+
+        const nameSelector = 'h1, h2, h3, h4, h5, h6, .title, .name, [class*="title"], [class*="name"]';
+        const priceSelector = '.price, [class*="price"], [class*="cost"], [class*="amount"]';
+
+        // Strategy 1: Look for product grids/lists with common classes
+        const productContainers = [
+            ...document.querySelectorAll('.product, .products li, .woocommerce-product, [class*="product-"], [id*="product-"]'),
+            ...document.querySelectorAll('[class*="shop"] [class*="item"], [class*="catalog"] [class*="item"]'),
+            ...document.querySelectorAll('[class*="menu-item"], .item, .food-item, .dish')
+        ];
+        for (const container of productContainers) {
+            // Look for name (usually in headings or strong elements)
+            const nameEl = container.querySelector(nameSelector)
+                || container.querySelector('strong, b, [class*="product"]');
+            if (nameEl) {
+                const categoryEl = container.closest('[class*="category"], [class*="cat-"]');
+                products.push({
+                    name: getText(nameEl),
+                    price: extractPrice(getText(container.querySelector(priceSelector))),
+                    category: categoryEl ?
+                        getText(categoryEl.querySelector('h1, h2, h3, .title, [class*="title"]')) : null
+                });
+            }
+        }
+
+        // Strategy 2: Look for add-to-cart buttons and work backwards
+        for (const button of document.querySelectorAll('[class*="add-to-cart"], [class*="buy-now"], [id*="add-to-cart"]')) {
+            const container = button.closest('li, .item, .product, div[class*="product"], article');
+            if (!container) continue;
+            const nameEl = container.querySelector(nameSelector);
+            if (nameEl) {
+                const name = getText(nameEl);
+                if (!products.some(p => p.name === name)) {
+                    products.push({
+                        name: name,
+                        price: extractPrice(getText(container.querySelector(priceSelector))),
+                        category: null
+                    });
+                }
+            }
+        }
+
+        // Strategy 3: Look for price patterns and work backwards
+        for (const el of document.querySelectorAll('*')) {
+            const price = extractPrice(getText(el));
+            if (price && !products.some(p => p.price === price)) {
+                const container = el.closest('div, li, article, section');
+                if (!container) continue;
+                const nameEl = container.querySelector(nameSelector);
+                if (nameEl) {
+                    const name = getText(nameEl);
+                    if (!products.some(p => p.name === name)) {
+                        products.push({ name: name, price: price, category: null });
+                    }
+                }
+            }
+        }
+    }
+
+    return {
+        title: title,
+        links: links,
+        text: text,
+        // Filter out likely non-products (too short names, etc.)
+        products: products.filter(p => p.name && p.name.length > 2),
+        jsonLd: jsonLd,
+        html: opts.includeHtml ? document.documentElement.outerHTML : '',
+        bodyHtml: opts.includeBodyHtml && document.body ? document.body.innerHTML : ''
+    };
+}
+"""
+
+
+async def extract_page(
+    page: Page,
+    include_text: bool = True,
+    include_html: bool = True,
+    include_body_html: bool = False,
+    include_products: bool = False,
+    product_title_terms: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """
+    Run the bundled extraction script on a loaded page.
+
+    Args:
+        page: Playwright page that has finished loading
+        include_text: Walk the DOM for visible text
+        include_html: Return the serialized document
+        include_body_html: Return the body's inner HTML
+        include_products: Always run the product heuristics
+        product_title_terms: Run the product heuristics when the title contains one of these
+
+    Returns:
+        Dict with title, links ({href, url, text}), text, products, jsonLd, html and bodyHtml
+    """
+    return await page.evaluate(PAGE_EXTRACTION_SCRIPT, {
+        "includeText": include_text,
+        "includeHtml": include_html,
+        "includeBodyHtml": include_body_html,
+        "includeProducts": include_products,
+        "productTitleTerms": [term.lower() for term in product_title_terms],
+    })
+
@@ -0,0 +1,169 @@
+"""
+Server-side HTML parsing for crawled pages.
+Each page is parsed once (with lxml when installed) and that one tree feeds
+JSON-LD, contact and text extraction.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List
+
+from bs4 import BeautifulSoup
+
+from .contact_extraction import extract_contacts, is_contact_page
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:  # lxml is optional; the stdlib parser is slower but always available
+    HTML_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text never reaches the page content
+NON_CONTENT_TAGS = ['script', 'style', 'noscript', 'iframe']
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    """Parse a page with the fastest available parser."""
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def json_ld_from_soup(soup: BeautifulSoup) -> List[Any]:
+    """
+    Parse the JSON-LD blocks of a server-rendered page.
+
+    Args:
+        soup: Parsed HTML (before scripts are stripped)
+
+    Returns:
+        List of decoded JSON-LD documents
+    """
+    blocks = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            blocks.append(json.loads(script.string or ""))
+        except ValueError:
+            logger.debug("Skipping malformed JSON-LD block")
+    return blocks
+
+
+def extract_text(soup: BeautifulSoup) -> str:
+    """
+    Extract text content using BeautifulSoup.
+
+    Args:
+        soup: BeautifulSoup object (script and style elements are removed from it)
+
+    Returns:
+        Extracted text
+    """
+    # Remove unwanted elements
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+
+    # Extract text with structure
+    text_parts = []
+
+    # Extract headings with hierarchy
+    for i in range(1, 7):
+        for heading in soup.find_all(f'h{i}'):
+            text_parts.append(f"{'#' * i} {heading.get_text(strip=True)}")
+
+    # Extract paragraphs
+    for p in soup.find_all('p'):
+        text = p.get_text(strip=True)
+        if text:
+            text_parts.append(text)
+
+    # Extract list items
+    for li in soup.find_all('li'):
+        text = li.get_text(strip=True)
+        if text:
+            text_parts.append(f"- {text}")
+
+    # Extract other text
+    for div in soup.find_all(['div', 'span', 'td', 'th']):
+        # Skip if parent is already processed
+        if div.parent and div.parent.name in ['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            continue
+
+        # Skip if it contains other content elements
+        if div.find(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            continue
+
+        text = div.get_text(strip=True)
+        if text:
+            text_parts.append(text)
+
+    return "\n".join(text_parts)
+
+
+def extract_page_content(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    """
+    Run every server-side extraction over one parsed page.
+    Read links and HTML from the soup first: scripts and styles are stripped.
+
+    Args:
+        soup: Parsed page
+        url: Page URL
+
+    Returns:
+        Dict with structured_data (JSON-LD), contacts and text
+    """
+    structured_data = json_ld_from_soup(soup)
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+    return {
+        "structured_data": structured_data,
+        "contacts": extract_contacts(soup, is_contact_page=is_contact_page(url)),
+        "text": extract_text(soup),
+    }
+
+
+# --- Whole-page parses (top-level so they can run in a worker process) ---
+
+def parse_server_html(html: str, url: str) -> Dict[str, Any]:
+    """
+    Parse a page fetched over plain HTTP and extract everything the crawler needs.
+
+    Args:
+        html: Document as served
+        url: Final URL of the page
+
+    Returns:
+        Dict with browser_needed and reason; unless the page needs the browser,
+        also title, anchors ({href, text}), body_html, structured_data, contacts and text
+    """
+    # Imported here so worker processes only load what they use
+    from .http_fetcher import needs_browser
+
+    soup = parse_html(html)
+    browser_needed, reason = needs_browser(html, soup)
+    parsed: Dict[str, Any] = {"browser_needed": browser_needed, "reason": reason}
+    if browser_needed:
+        return parsed
+
+    parsed["title"] = soup.title.get_text(strip=True) if soup.title else ""
+    # Links and body HTML are read before text extraction strips the soup
+    parsed["anchors"] = [
+        {"href": a.get("href"), "text": a.get_text(" ", strip=True)}
+        for a in soup.find_all("a", href=True)
+    ]
+    parsed["body_html"] = soup.body.decode_contents() if soup.body else ""
+    parsed.update(extract_page_content(soup, url))
+    return parsed
+
+
+def parse_rendered_html(html: str, url: str) -> Dict[str, Any]:
+    """
+    Parse a page serialized from the browser.
+
+    Args:
+        html: document.documentElement.outerHTML
+        url: Page URL
+
+    Returns:
+        Dict with structured_data, contacts and text
+    """
+    return extract_page_content(parse_html(html), url)
@@ -0,0 +1,74 @@
+"""
+Page-type classification rules shared by the TradeWizard crawlers.
+The same URL rules label crawled pages and rank sitemap URLs before a
+crawl starts.
+"""
+
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+HOMEPAGE_PATHS = {"", "/", "/index.html", "/home"}
+
+# Page types worth running product extraction on
+PRODUCT_PAGE_TYPES = {"product_listing", "product_detail", "menu"}
+
+# URL path rules, checked in order
+URL_PAGE_TYPE_PATTERNS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r'/(shop|store|products?|buy)'), "product_listing"),
+    (re.compile(r'/(menu|food|dishes|meals)'), "menu"),
+    (re.compile(r'/about'), "about"),
+    (re.compile(r'/(contact|reach-us|find-us)'), "contact"),
+    (re.compile(r'/(category|cat|collection|tag)'), "category"),
+    (re.compile(r'/(product|item)/[^/]+'), "product_detail"),
+]
+
+# Title keywords used when the URL gives no clue
+PRODUCT_TITLE_TERMS = ["shop", "store", "products", "buy"]
+TITLE_PAGE_TYPE_TERMS: List[Tuple[List[str], str]] = [
+    (PRODUCT_TITLE_TERMS, "product_listing"),
+    (["about", "our story", "history"], "about"),
+    (["contact", "reach us", "find us"], "contact"),
+]
+
+
+def classify_url(url: str) -> Optional[str]:
+    """
+    Classify a page from its URL alone.
+
+    Args:
+        url: Page URL
+
+    Returns:
+        Page type, or None if the URL matches no rule
+    """
+    path = urlparse(url).path.lower()
+    if path in HOMEPAGE_PATHS:
+        return "homepage"
+    for pattern, page_type in URL_PAGE_TYPE_PATTERNS:
+        if pattern.search(path):
+            return page_type
+    return None
+
+
+def classify_page_type(url: str, title: str) -> str:
+    """
+    Classify the page type based on URL and title.
+
+    Args:
+        url: Page URL
+        title: Page title
+
+    Returns:
+        Page type classification
+    """
+    page_type = classify_url(url)
+    if page_type:
+        return page_type
+
+    title_lower = title.lower()
+    for terms, page_type in TITLE_PAGE_TYPE_TERMS:
+        if any(term in title_lower for term in terms):
+            return page_type
+
+    return "other"
@@ -0,0 +1,93 @@
+"""
+Process pool for CPU-heavy page parsing.
+HTML parsing, text and contact extraction run in worker processes so large
+pages do not stall the event loop while other page loads are in flight.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for page parsing (0 parses on the event loop thread)
+CRAWLER_PARSE_WORKERS = int(os.getenv("CRAWLER_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+T = TypeVar("T")
+
+
+class ParseExecutor:
+    """Runs parse functions in a lazily started pool of worker processes."""
+
+    def __init__(self, max_workers: int = CRAWLER_PARSE_WORKERS):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Worker processes (0 or less runs parse functions inline)
+        """
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned rather than forked: the parent runs Playwright and event loop threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started page parse pool with {self.max_workers} workers")
+        return self._pool
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a parse function off the event loop.
+
+        Args:
+            fn: Module-level function (it is pickled to the worker)
+            *args: Picklable arguments, e.g. the HTML and page URL
+
+        Returns:
+            The function's result
+        """
+        if self.max_workers <= 0:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            logger.warning(f"Page parse pool broke while running {fn.__name__}, restarting it")
+            self.shutdown()
+            return fn(*args)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Process-wide executor ---
+
+_shared_executor: Optional[ParseExecutor] = None
+
+
+def get_parse_executor() -> ParseExecutor:
+    """Return the process-wide parse executor."""
+    global _shared_executor
+    if _shared_executor is None:
+        _shared_executor = ParseExecutor()
+    return _shared_executor
+
+
+def shutdown_parse_executor() -> None:
+    """Stop the process-wide parse executor's workers."""
+    global _shared_executor
+    executor, _shared_executor = _shared_executor, None
+    if executor is not None:
+        executor.shutdown()
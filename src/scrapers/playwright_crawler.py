@@ -10,12 +10,22 @@ import logging
 import re
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+from playwright.async_api import BrowserContext
 from bs4 import BeautifulSoup
 
+from .blob_store import BlobStore
+from .browser_pool import BrowserPool, get_browser_pool
+from .crawl_planner import CrawlPlan, CrawlPlanner
+from .domain_limiter import DomainLimiter
+from .frontier import CrawlFrontier
+from .page_extraction import extract_page
+from .http_fetcher import get_http_fetcher
+from .page_types import PRODUCT_PAGE_TYPES, PRODUCT_TITLE_TERMS, classify_page_type, classify_url
+from .resource_blocking import ResourceBlockingProfile, ResourceBlockingStats
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,7 +43,11 @@ class PlaywrightCrawler:
         max_depth: int = 3,
         timeout: int = 30000,  # 30 seconds in ms
         wait_for_idle: int = 1000,  # 1 second in ms
-        headless: bool = True
+        headless: bool = True,
+        browser_pool: Optional[BrowserPool] = None,
+        resource_blocking: Optional[ResourceBlockingProfile] = None,
+        use_sitemap: bool = False,
+        html_store: Optional[BlobStore] = None
     ):
         """
         Initialize the crawler with configuration parameters.
@@ -44,16 +58,29 @@ class PlaywrightCrawler:
             timeout: Page load timeout in milliseconds
             wait_for_idle: Wait time after page load for JS to settle (ms)
             headless: Whether to run browser in headless mode
+            browser_pool: Pool to lease browser contexts from (defaults to the shared pool)
+            resource_blocking: Request interception profile (None loads every resource)
+            use_sitemap: Seed the crawl from robots.txt/sitemaps and honour robots rules
+            html_store: Store for page HTML; pages then carry html_blob (hash and
+                sizes) instead of html
         """
         self.max_pages = max_pages
         self.max_depth = max_depth
         self.timeout = timeout
         self.wait_for_idle = wait_for_idle
         self.headless = headless
+        self.browser_pool = browser_pool
+        self.resource_blocking = resource_blocking
+        self.blocking_stats = ResourceBlockingStats()
+        self.use_sitemap = use_sitemap
+        self.html_store = html_store
+        self.crawl_plan: Optional[CrawlPlan] = None
+        # Pages are loaded one at a time; the limiter only spaces them for crawl-delay
+        self.domain_limiter = DomainLimiter(1)
         
         # State tracking
         self.visited_urls: Set[str] = set()
-        self.url_queue: List[Tuple[str, int]] = []  # (url, depth)
+        self.frontier = CrawlFrontier(depth_penalty=True)
         self.skipped_urls: List[str] = []
         self.crawl_stats: Dict[str, Any] = {
             "pages_crawled": 0,
@@ -79,9 +106,30 @@ class PlaywrightCrawler:
         Returns:
             Dict containing the crawl results with metadata and page content
         """
+        async for page_data in self.iter_pages(start_url):
+            self.results["pages"].append(page_data)
+        return self.results
+    
+    async def iter_pages(self, start_url: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Crawl a website and yield each page as soon as it has been processed.
+        
+        Pages are not kept on the crawler; crawl metadata is available in
+        self.results["metadata"] once iteration finishes. Wrap the iterator in
+        contextlib.aclosing when stopping early so the browser is released promptly.
+        
+        Args:
+            start_url: The URL to start crawling from
+            
+        Yields:
+            Page data dicts, in crawl order
+        """
         # Reset state for new crawl
         self.visited_urls = set()
-        self.url_queue = [(start_url, 0)]  # Start URL at depth 0
+        self.blocking_stats = ResourceBlockingStats()
+        self.frontier = CrawlFrontier(depth_penalty=True)
+        self.frontier.push(start_url, depth=0, priority=0)
+        self.crawl_plan = None
         self.skipped_urls = []
         self.crawl_stats = {
             "pages_crawled": 0,
@@ -101,49 +149,59 @@ class PlaywrightCrawler:
         
         logger.info(f"Starting crawl of {start_url} with max {self.max_pages} pages")
         
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=self.headless)
-            context = await browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36 TradeWizard/1.0"
-            )
-            
-            # Process the queue until empty or max pages reached
-            while self.url_queue and len(self.visited_urls) < self.max_pages:
-                url, depth = self.url_queue.pop(0)
-                
-                # Skip if already visited or beyond max depth
-                if url in self.visited_urls or depth > self.max_depth:
-                    self.skipped_urls.append(url)
-                    self.crawl_stats["pages_skipped"] += 1
-                    continue
-                
-                # Process the page
-                try:
-                    page_data = await self._process_page(context, url, depth)
-                    self.results["pages"].append(page_data)
-                    self.visited_urls.add(url)
-                    self.crawl_stats["pages_crawled"] += 1
+        if self.use_sitemap:
+            await self._apply_crawl_plan(start_url)
+        
+        pool = self.browser_pool or await get_browser_pool()
+        owns_pool = False
+        if self.browser_pool is None and not self.headless:
+            # A visible browser is a debugging aid; keep it out of the shared pool
+            pool = BrowserPool(headless=False)
+            owns_pool = True
+        
+        try:
+            async with pool.lease() as context:
+                # Process the queue until empty or max pages reached
+                while self.frontier and len(self.visited_urls) < self.max_pages:
+                    url, depth = self.frontier.pop()
                     
-                    # Add discovered links to the queue
-                    for link in page_data.get("links_found", []):
-                        if link not in self.visited_urls and link not in [u for u, _ in self.url_queue]:
-                            self.url_queue.append((link, depth + 1))
+                    # Process the page
+                    try:
+                        async with self.domain_limiter.slot(url):
+                            page_data = await self._process_page(context, url, depth)
+                        self.visited_urls.add(url)
+                        self.crawl_stats["pages_crawled"] += 1
                     
-                    # Sort queue to prioritize important pages
-                    self._prioritize_queue()
+                        # Add discovered links to the frontier
+                        for link in page_data.get("links_found", []):
+                            if link in self.frontier:
+                                continue
+                            if self.crawl_plan and not self.crawl_plan.can_fetch(link):
+                                self.frontier.mark_seen(link)
+                                continue
+                            if depth + 1 > self.max_depth:
+                                # Record each too-deep link once instead of queueing it
+                                self.frontier.mark_seen(link)
+                                self.skipped_urls.append(link)
+                                self.crawl_stats["pages_skipped"] += 1
+                                continue
+                            self.frontier.push(link, depth + 1)
                     
-                    logger.info(f"Crawled {url} ({len(self.visited_urls)}/{self.max_pages})")
+                        logger.info(f"Crawled {url} ({len(self.visited_urls)}/{self.max_pages})")
                     
-                except Exception as e:
-                    logger.error(f"Error crawling {url}: {str(e)}")
-                    self.crawl_stats["errors"].append({
-                        "url": url,
-                        "error": str(e),
-                        "timestamp": datetime.now().isoformat()
-                    })
-            
-            await browser.close()
+                    except Exception as e:
+                        logger.error(f"Error crawling {url}: {str(e)}")
+                        self.crawl_stats["errors"].append({
+                            "url": url,
+                            "error": str(e),
+                            "timestamp": datetime.now().isoformat()
+                        })
+                        continue
+                    
+                    yield page_data
+        finally:
+            if owns_pool:
+                await pool.close()
         
         # Finalize results
         self.crawl_stats["end_time"] = datetime.now().isoformat()
@@ -152,12 +210,32 @@ class PlaywrightCrawler:
             "pages_skipped": self.crawl_stats["pages_skipped"],
             "errors": len(self.crawl_stats["errors"])
         })
+        if self.resource_blocking:
+            self.results["metadata"]["resource_blocking"] = self.blocking_stats.as_dict()
+        if self.crawl_plan:
+            self.results["metadata"]["crawl_plan"] = self.crawl_plan.as_dict()
         
         logger.info(f"Crawl completed: {self.crawl_stats['pages_crawled']} pages crawled, "
                    f"{self.crawl_stats['pages_skipped']} skipped, "
                    f"{len(self.crawl_stats['errors'])} errors")
+    
+    async def _apply_crawl_plan(self, start_url: str) -> None:
+        """
+        Seed the frontier from the site's sitemaps and apply its crawl-delay.
         
-        return self.results
+        Args:
+            start_url: The URL the crawl starts from
+        """
+        planner = CrawlPlanner(await get_http_fetcher())
+        self.crawl_plan = await planner.plan(start_url, max_seeds=max(0, self.max_pages - 1))
+        
+        # Sitemap pages count as one link away from the start page
+        for url, priority in self.crawl_plan.seeds:
+            self.frontier.push(urljoin(start_url, urlparse(url).path), depth=1, priority=priority)
+        
+        if self.crawl_plan.crawl_delay:
+            domain = self.domain_limiter.domain_of(start_url)
+            self.domain_limiter.set_min_interval(domain, self.crawl_plan.crawl_delay)
     
     async def _process_page(self, context: BrowserContext, url: str, depth: int) -> Dict[str, Any]:
         """
@@ -174,161 +252,64 @@ class PlaywrightCrawler:
         page = await context.new_page()
         
         try:
+            if self.resource_blocking:
+                await self.resource_blocking.install(page, self.blocking_stats, url)
+            
             # Navigate to the page with timeout
             response = await page.goto(url, timeout=self.timeout, wait_until="networkidle")
             
             # Wait additional time for JS to settle
             await page.wait_for_timeout(self.wait_for_idle)
             
-            # Get page type
-            page_type = self._classify_page_type(url, await page.title())
-            
-            # Extract HTML content
-            html_content = await page.content()
-            
-            # Extract text content
-            text_content = await self._extract_text_content(page)
-            
-            # Extract links
-            links = await self._extract_links(page, url)
-            
-            # Extract products if this looks like a product page
-            products_found = []
-            if "product" in page_type or "shop" in page_type or "menu" in page_type:
-                products_found = await self._extract_products(page)
+            # Extract title, HTML, text, links, JSON-LD and (on product pages)
+            # products in a single round trip. Whether this is a product page is
+            # decided from the URL, or from the title when the URL gives no clue.
+            url_type = classify_url(url)
+            extracted = await extract_page(
+                page,
+                include_products=url_type in PRODUCT_PAGE_TYPES,
+                product_title_terms=PRODUCT_TITLE_TERMS if url_type is None else ()
+            )
+            page_type = self._classify_page_type(url, extracted["title"])
             
             # Create page data object
             page_data = {
                 "url": url,
                 "type": page_type,
-                "title": await page.title(),
+                "title": extracted["title"],
                 "depth": depth,
-                "html": html_content,
-                "text": text_content,
-                "links_found": links
+                "html": extracted["html"],
+                "text": extracted["text"],
+                "links_found": self._filter_links([link["url"] for link in extracted["links"]], url)
             }
             
-            # Add products if found
-            if products_found:
-                page_data["products_found"] = products_found
+            if self.html_store:
+                page_data["html_blob"] = await asyncio.to_thread(self.html_store.put, page_data.pop("html"))
+            
+            # Add products and structured data if found
+            if extracted["products"]:
+                page_data["products_found"] = extracted["products"]
+            if extracted["jsonLd"]:
+                page_data["structured_data"] = extracted["jsonLd"]
             
             return page_data
             
         finally:
             await page.close()
     
-    async def _extract_text_content(self, page: Page) -> str:
+    def _filter_links(self, links: List[str], base_url: str) -> List[str]:
         """
-        Extract clean text content from the page.
+        Filter and normalize the internal links found on a page.
         
         Args:
-            page: Playwright page object
-            
-        Returns:
-            Extracted text content
-        """
-        # Use a simpler approach to extract text
-        text_content = await page.evaluate("""
-        () => {
-            // Helper function to get visible text
-            function getVisibleText(element) {
-                if (!element) return '';
-                
-                // Skip hidden elements
-                const style = window.getComputedStyle(element);
-                if (style && (style.display === 'none' || style.visibility === 'hidden')) {
-                    return '';
-                }
-                
-                // Skip script and style elements
-                if (element.tagName === 'SCRIPT' || element.tagName === 'STYLE' || 
-                    element.tagName === 'NOSCRIPT' || element.tagName === 'IFRAME') {
-                    return '';
-                }
-                
-                // If it's a text node, return its text
-                if (element.nodeType === Node.TEXT_NODE) {
-                    return element.textContent.trim();
-                }
-                
-                // For headings, add markdown-style formatting
-                if (element.tagName && element.tagName.match(/^H[1-6]$/)) {
-                    const level = element.tagName[1];
-                    return '\n' + '#'.repeat(parseInt(level)) + ' ' + element.textContent.trim() + '\n';
-                }
-                
-                // For paragraphs, add a newline after
-                if (element.tagName === 'P') {
-                    return element.textContent.trim() + '\n';
-                }
-                
-                // For list items, add a bullet
-                if (element.tagName === 'LI') {
-                    return '- ' + element.textContent.trim() + '\n';
-                }
-                
-                // For other elements, just return their text
-                let result = '';
-                if (element.childNodes && element.childNodes.length > 0) {
-                    for (const child of element.childNodes) {
-                        result += getVisibleText(child) + ' ';
-                    }
-                } else {
-                    result = element.textContent.trim();
-                }
-                
-                return result.trim();
-            }
-            
-            // Get all elements that typically contain meaningful text
-            const textContainers = document.querySelectorAll('h1, h2, h3, h4, h5, h6, p, li, td, th, div, span, a, button, label');
-            
-            // Extract and format the text
-            let extractedText = '';
-            for (const container of textContainers) {
-                // Skip if parent is already processed to avoid duplication
-                if (container.parentElement && 
-                    (container.parentElement.tagName === 'LI' || 
-                     container.parentElement.tagName === 'P')) {
-                    continue;
-                }
-                
-                const text = getVisibleText(container);
-                if (text) {
-                    extractedText += text + ' ';
-                }
-            }
-            
-            // Clean up the text
-            return extractedText
-                .replace(/\s+/g, ' ')  // Replace multiple spaces with a single space
-                .replace(/\n\s+/g, '\n')  // Clean up newlines
-                .trim();
-        }
-        """)
-        
-        return text_content
-    
-    async def _extract_links(self, page: Page, base_url: str) -> List[str]:
-        """
-        Extract and normalize all internal links from the page.
-        
-        Args:
-            page: Playwright page object
+            links: Resolved link URLs from the page
             base_url: Base URL for resolving relative links
             
         Returns:
             List of normalized internal links
         """
         base_domain = urlparse(base_url).netloc
-        
-        # Extract links using Playwright's evaluate
-        links = await page.evaluate("""() => {
-            const links = Array.from(document.querySelectorAll('a[href]'))
-                .map(a => a.href)
-                .filter(href => href && !href.startsWith('javascript:') && !href.startsWith('#'));
-            return [...new Set(links)]; // Remove duplicates
-        }""")
+        links = {link for link in links if link and not link.startswith(('javascript:', '#'))}
         
         # Filter and normalize links
         normalized_links = []
@@ -358,125 +339,6 @@ class PlaywrightCrawler:
         
         return list(set(normalized_links))  # Remove any duplicates
     
-    async def _extract_products(self, page: Page) -> List[Dict[str, str]]:
-        """
-        Extract product information from the page.
-        
-        Args:
-            page: Playwright page object
-            
-        Returns:
-            List of product dictionaries with name, price, and category
-        """
-        # This is a complex heuristic-based extraction that looks for common patterns
-        products = await page.evaluate("""() => {
-            const products = [];
-            
-            // Helper to extract text and clean it
-            const getText = (el) => el ? el.textContent.trim() : null;
-            
-            // Helper to extract price (looking for currency patterns)
-            const extractPrice = (text) => {
-                if (!text) return null;
-                // Match common price patterns (R123, R123.45, R123,45, R123 - R456)
-                const priceMatch = text.match(/R\\s*[\\d,.]+(?:\\s*-\\s*R\\s*[\\d,.]+)?/g);
-                return priceMatch ? priceMatch[0].trim() : null;
-            };
-            
-            // Strategy 1: Look for product grids/lists with common classes
-            const productContainers = [
-                ...document.querySelectorAll('.product, .products li, .woocommerce-product, [class*="product-"], [id*="product-"]'),
-                ...document.querySelectorAll('[class*="shop"] [class*="item"], [class*="catalog"] [class*="item"]'),
-                ...document.querySelectorAll('[class*="menu-item"], .item, .food-item, .dish')
-            ];
-            
-            for (const container of productContainers) {
-                // Look for name (usually in headings or strong elements)
-                const nameEl = container.querySelector('h1, h2, h3, h4, h5, h6, .title, .name, [class*="title"], [class*="name"]') 
-                    || container.querySelector('strong, b, [class*="product"]');
-                
-                // Look for price (usually contains currency symbol)
-                const priceEl = container.querySelector('.price, [class*="price"], [class*="cost"], [class*="amount"]');
-                
-                // If we found at least a name, consider it a product
-                if (nameEl) {
-                    const name = getText(nameEl);
-                    const priceText = getText(priceEl);
-                    const price = extractPrice(priceText);
-                    
-                    // Try to find category
-                    const categoryEl = container.closest('[class*="category"], [class*="cat-"]');
-                    const category = categoryEl ? 
-                        getText(categoryEl.querySelector('h1, h2, h3, .title, [class*="title"]')) : null;
-                    
-                    products.push({
-                        name: name,
-                        price: price,
-                        category: category
-                    });
-                }
-            }
-            
-            // Strategy 2: Look for add-to-cart buttons and work backwards
-            const cartButtons = document.querySelectorAll('[class*="add-to-cart"], [class*="buy-now"], [id*="add-to-cart"]');
-            for (const button of cartButtons) {
-                const container = button.closest('li, .item, .product, div[class*="product"], article');
-                if (!container) continue;
-                
-                const nameEl = container.querySelector('h1, h2, h3, h4, h5, h6, .title, .name, [class*="title"], [class*="name"]');
-                const priceEl = container.querySelector('.price, [class*="price"], [class*="cost"], [class*="amount"]');
-                
-                if (nameEl) {
-                    const name = getText(nameEl);
-                    const priceText = getText(priceEl);
-                    const price = extractPrice(priceText);
-                    
-                    // Check if this product is already in our list
-                    if (!products.some(p => p.name === name)) {
-                        products.push({
-                            name: name,
-                            price: price,
-                            category: null
-                        });
-                    }
-                }
-            }
-            
-            // Strategy 3: Look for price patterns and work backwards
-            const allElements = document.querySelectorAll('*');
-            for (const el of allElements) {
-                const text = getText(el);
-                if (!text) continue;
-                
-                // If element contains price pattern but isn't already part of a product
-                const price = extractPrice(text);
-                if (price && !products.some(p => p.price === price)) {
-                    // Look for a nearby name
-                    const container = el.closest('div, li, article, section');
-                    if (!container) continue;
-                    
-                    const nameEl = container.querySelector('h1, h2, h3, h4, h5, h6, .title, .name, [class*="title"], [class*="name"]');
-                    if (nameEl) {
-                        const name = getText(nameEl);
-                        
-                        // Check if this product is already in our list
-                        if (!products.some(p => p.name === name)) {
-                            products.push({
-                                name: name,
-                                price: price,
-                                category: null
-                            });
-                        }
-                    }
-                }
-            }
-            
-            // Filter out likely non-products (too short names, etc.)
-            return products.filter(p => p.name && p.name.length > 2);
-        }""")
-        
-        return products
-    
     def _classify_page_type(self, url: str, title: str) -> str:
         """
         Classify the page type based on URL and title.
@@ -488,75 +350,7 @@ class PlaywrightCrawler:
         Returns:
             Page type classification
         """
-        path = urlparse(url).path.lower()
-        
-        # Check for homepage
-        if path == "/" or path == "" or path == "/index.html" or path == "/home":
-            return "homepage"
-            
-        # Check for common page types
-        if re.search(r'/(shop|store|products?|buy)', path):
-            return "product_listing"
-            
-        if re.search(r'/(menu|food|dishes|meals)', path):
-            return "menu"
-            
-        if re.search(r'/about', path):
-            return "about"
-            
-        if re.search(r'/(contact|reach-us|find-us)', path):
-            return "contact"
-            
-        if re.search(r'/(category|cat|collection|tag)', path):
-            return "category"
-            
-        if re.search(r'/(product|item)/[^/]+', path):
-            return "product_detail"
-            
-        # Check title for clues
-        title_lower = title.lower()
-        if any(term in title_lower for term in ["shop", "store", "products", "buy"]):
-            return "product_listing"
-            
-        if any(term in title_lower for term in ["about", "our story", "history"]):
-            return "about"
-            
-        if any(term in title_lower for term in ["contact", "reach us", "find us"]):
-            return "contact"
-            
-        # Default
-        return "other"
-    
-    def _prioritize_queue(self):
-        """
-        Prioritize the URL queue to crawl important pages first.
-        """
-        # Define priority scores for different URL patterns
-        def get_priority(url_depth_tuple):
-            url, depth = url_depth_tuple
-            path = urlparse(url).path.lower()
-            
-            # Highest priority: product/shop pages
-            if re.search(r'/(shop|store|products?|menu)', path):
-                return 0
-                
-            # High priority: about/contact pages
-            if re.search(r'/(about|contact)', path):
-                return 1
-                
-            # Medium priority: category pages
-            if re.search(r'/(category|cat|collection|tag)', path):
-                return 2
-                
-            # Lower priority: individual product pages (we want categories first)
-            if re.search(r'/product/[^/]+', path):
-                return 3
-                
-            # Default priority based on depth (deeper = lower priority)
-            return 4 + depth
-        
-        # Sort the queue by priority
-        self.url_queue.sort(key=get_priority)
+        return classify_page_type(url, title)
 
 
 async def crawl_website(url: str, max_pages: int = 20) -> Dict[str, Any]:
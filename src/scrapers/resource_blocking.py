@@ -0,0 +1,183 @@
+"""
+Request interception profiles for text-extraction crawls.
+Aborts images, media, fonts and tracker requests (and optionally stubs
+third-party scripts) so pages finish loading without downloading assets
+the crawlers never read.
+"""
+
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Page, Route
+
+logger = logging.getLogger(__name__)
+
+# Resource types that never contribute to DOM text, links or product markup
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# Analytics, advertising and session-recording hosts commonly found on SME sites
+DEFAULT_TRACKER_DOMAINS = frozenset({
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "facebook.net",
+    "analytics.tiktok.com",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "hs-analytics.net",
+    "hs-scripts.com",
+    "static.ads-twitter.com",
+    "snap.licdn.com",
+    "bat.bing.com",
+    "newrelic.com",
+    "nr-data.net",
+})
+
+# Typical transfer sizes per resource type. Aborted requests are never
+# downloaded, so the bytes saved can only be estimated.
+ESTIMATED_RESOURCE_BYTES: Dict[str, int] = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 35_000,
+    "script": 40_000,
+    "stylesheet": 25_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "other": 10_000,
+}
+
+STUB_SCRIPT_BODY = "/* stubbed by TradeWizard crawler */"
+
+
+def _site_domain(host: str) -> str:
+    """Strip a leading www. so www.example.com and example.com compare equal."""
+    host = host.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def _matches_domain(host: str, domains: Iterable[str]) -> bool:
+    """Check whether host is one of the domains or a subdomain of one."""
+    host = host.lower().split(":")[0]
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourceBlockingStats:
+    """Per-crawl counters for intercepted requests."""
+
+    def __init__(self):
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.requests_stubbed = 0
+        self.estimated_bytes_saved = 0
+        self.blocked_by_type: Dict[str, int] = {}
+
+    def record_blocked(self, resource_type: str) -> None:
+        self.requests_blocked += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.estimated_bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, ESTIMATED_RESOURCE_BYTES["other"])
+
+    def record_stubbed(self, resource_type: str) -> None:
+        self.requests_stubbed += 1
+        self.estimated_bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, ESTIMATED_RESOURCE_BYTES["other"])
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters in a JSON-serializable form for crawl metadata."""
+        return {
+            "requests_allowed": self.requests_allowed,
+            "requests_blocked": self.requests_blocked,
+            "requests_stubbed": self.requests_stubbed,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+
+
+class ResourceBlockingProfile:
+    """
+    Describes which requests a crawl page should abort or stub.
+    The main document is always allowed through.
+    """
+
+    def __init__(
+        self,
+        blocked_resource_types: Iterable[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        tracker_domains: Iterable[str] = DEFAULT_TRACKER_DOMAINS,
+        stub_third_party_scripts: bool = False,
+        allowed_script_domains: Iterable[str] = ()
+    ):
+        """
+        Initialize the profile.
+
+        Args:
+            blocked_resource_types: Playwright resource types to abort
+            tracker_domains: Hosts (and their subdomains) whose requests are aborted
+            stub_third_party_scripts: Answer scripts from other domains with an empty body
+            allowed_script_domains: Third-party script hosts that must still load (e.g. a CDN)
+        """
+        self.blocked_resource_types: FrozenSet[str] = frozenset(blocked_resource_types)
+        self.tracker_domains: FrozenSet[str] = frozenset(d.lower() for d in tracker_domains)
+        self.stub_third_party_scripts = stub_third_party_scripts
+        self.allowed_script_domains: FrozenSet[str] = frozenset(d.lower() for d in allowed_script_domains)
+
+    def decide(self, request_url: str, resource_type: str, page_url: str) -> Optional[str]:
+        """
+        Decide what to do with a request.
+
+        Args:
+            request_url: URL being requested
+            resource_type: Playwright resource type (document, image, script, ...)
+            page_url: URL of the page being crawled
+
+        Returns:
+            "abort", "stub", or None to let the request through
+        """
+        if resource_type == "document":
+            return None
+
+        host = urlparse(request_url).netloc
+        if _matches_domain(host, self.tracker_domains):
+            return "abort"
+
+        if resource_type in self.blocked_resource_types:
+            return "abort"
+
+        if self.stub_third_party_scripts and resource_type == "script":
+            is_third_party = not _matches_domain(host, {_site_domain(urlparse(page_url).netloc)})
+            if is_third_party and not _matches_domain(host, self.allowed_script_domains):
+                return "stub"
+
+        return None
+
+    async def install(self, page: Page, stats: ResourceBlockingStats, page_url: str) -> None:
+        """
+        Register the interception handler on a page before it navigates.
+
+        Args:
+            page: Playwright page about to load page_url
+            stats: Counters to update for this crawl
+            page_url: URL the page will be navigated to
+        """
+        async def handle(route: Route) -> None:
+            request = route.request
+            try:
+                action = self.decide(request.url, request.resource_type, page_url)
+                if action == "abort":
+                    stats.record_blocked(request.resource_type)
+                    await route.abort()
+                elif action == "stub":
+                    stats.record_stubbed(request.resource_type)
+                    await route.fulfill(status=200, content_type="application/javascript", body=STUB_SCRIPT_BODY)
+                else:
+                    stats.requests_allowed += 1
+                    await route.continue_()
+            except Exception as e:
+                # The page may have been closed while the request was in flight
+                logger.debug(f"Route handling failed for {request.url}: {e}")
+
+        await page.route("**/*", handle)
@@ -8,11 +8,25 @@ import json
 import logging
 import re
 from datetime import datetime
-from typing import Dict, List, Any, Set, Optional, Tuple
+from typing import AsyncIterator, Callable, Dict, List, Any, Set, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-from bs4 import BeautifulSoup
+from playwright.async_api import BrowserContext
+
+from .blob_store import BlobStore
+from .browser_pool import BrowserPool, get_browser_pool
+from .crawl_planner import CrawlPlan, CrawlPlanner
+from .domain_limiter import DomainLimiter
+from .frontier import CrawlFrontier
+from .page_types import classify_page_type
+from .http_fetcher import (
+    ESCALATE_STATUS_CODES, FETCH_TIER_CACHE, FetchTierCache, HttpFetcher, HttpFetchResult, get_http_fetcher
+)
+from .page_cache import CACHE_TIER, PageCache, content_hash
+from .page_extraction import extract_page
+from .page_parser import parse_rendered_html, parse_server_html
+from .parse_executor import ParseExecutor
+from .resource_blocking import ResourceBlockingProfile, ResourceBlockingStats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +42,19 @@ class SimpleCrawler:
         self,
         max_pages: int = 20,
         headless: bool = True,
-        timeout: int = 30000  # 30 seconds in ms
+        timeout: int = 30000,  # 30 seconds in ms
+        concurrency: int = 1,
+        per_domain_concurrency: int = 4,
+        domain_limiter: Optional[DomainLimiter] = None,
+        browser_pool: Optional[BrowserPool] = None,
+        resource_blocking: Optional[ResourceBlockingProfile] = None,
+        http_first: bool = False,
+        http_fetcher: Optional[HttpFetcher] = None,
+        tier_cache: FetchTierCache = FETCH_TIER_CACHE,
+        use_sitemap: bool = False,
+        page_cache: Optional[PageCache] = None,
+        html_store: Optional[BlobStore] = None,
+        parse_executor: Optional[ParseExecutor] = None
     ):
         """
         Initialize the crawler with configuration parameters.
@@ -37,18 +63,54 @@ class SimpleCrawler:
             max_pages: Maximum number of pages to crawl per domain
             headless: Whether to run browser in headless mode
             timeout: Page load timeout in milliseconds
+            concurrency: Number of pages loaded in parallel from the shared queue
+            per_domain_concurrency: Maximum concurrent page loads against one domain
+            domain_limiter: Optional shared limiter (overrides per_domain_concurrency)
+            browser_pool: Pool to lease browser contexts from (defaults to the shared pool)
+            resource_blocking: Request interception profile (None loads every resource)
+            http_first: Try a plain HTTP fetch before falling back to the browser
+            http_fetcher: HTTP client for the first tier (defaults to the shared fetcher)
+            tier_cache: Per-domain record of which tier can serve pages
+            use_sitemap: Seed the crawl from robots.txt/sitemaps and honour robots rules
+            page_cache: Cache to reuse unchanged pages from (None always fetches)
+            html_store: Store for body HTML; pages then carry body_html_blob
+                (hash and sizes) instead of body_html_debug
+            parse_executor: Worker pool for HTML parsing (None parses on the event loop)
         """
         self.max_pages = max_pages
         self.headless = headless
         self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.domain_limiter = domain_limiter or DomainLimiter(per_domain_concurrency)
+        self.browser_pool = browser_pool
+        self.resource_blocking = resource_blocking
+        self.blocking_stats = ResourceBlockingStats()
+        self.http_first = http_first
+        self.http_fetcher = http_fetcher
+        self.tier_cache = tier_cache
+        self.use_sitemap = use_sitemap
+        self.page_cache = page_cache
+        self.html_store = html_store
+        self.parse_executor = parse_executor
+        self.crawl_plan: Optional[CrawlPlan] = None
         
         # State tracking
         self.visited_urls: Set[str] = set()
-        self.url_queue: List[str] = []
+        self.frontier = CrawlFrontier()
+        self.fetch_tier_counts: Dict[str, int] = {FetchTierCache.HTTP: 0, FetchTierCache.BROWSER: 0, CACHE_TIER: 0}
         self.results = {
             "metadata": {},
             "pages": []
         }
+        
+        # Worker coordination (only meaningful while a crawl is running)
+        self._in_flight: Set[str] = set()
+        self._queue_changed: Optional[asyncio.Condition] = None
+        self._pool: Optional[BrowserPool] = None
+        self._http_fetcher: Optional[HttpFetcher] = None
+        self._context: Optional[BrowserContext] = None
+        self._context_lock: Optional[asyncio.Lock] = None
+        self._page_queue: Optional[asyncio.Queue] = None
     
     async def crawl(self, start_url: str) -> Dict[str, Any]:
         """
@@ -60,162 +122,387 @@ class SimpleCrawler:
         Returns:
             Dict containing the crawl results
         """
+        async for page_data in self.iter_pages(start_url):
+            self.results["pages"].append(page_data)
+        return self.results
+    
+    async def iter_pages(self, start_url: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Crawl a website and yield each page as soon as it has been extracted.
+        
+        Pages are not kept on the crawler, so memory scales with the pages in
+        flight rather than the pages crawled. Crawl metadata is available in
+        self.results["metadata"] once iteration finishes. Wrap the iterator in
+        contextlib.aclosing when stopping early so the browser is released promptly.
+        
+        Args:
+            start_url: The URL to start crawling from
+            
+        Yields:
+            Page data dicts, in completion order
+        """
         # Reset state for new crawl
         self.visited_urls = set()
-        self.url_queue = [start_url]
+        self.blocking_stats = ResourceBlockingStats()
+        self.frontier = CrawlFrontier()
+        # The start page comes first: it carries the navigation and contact details
+        self.frontier.push(start_url, priority=0)
+        self.crawl_plan = None
+        self._in_flight = set()
+        self._queue_changed = asyncio.Condition()
+        # Bounded so workers pause when the consumer falls behind
+        self._page_queue = asyncio.Queue(maxsize=self.concurrency)
+        self._context = None
+        self._context_lock = asyncio.Lock()
+        self.fetch_tier_counts = {FetchTierCache.HTTP: 0, FetchTierCache.BROWSER: 0, CACHE_TIER: 0}
         self.results = {
             "metadata": {
                 "domain": urlparse(start_url).netloc,
                 "crawl_date": datetime.now().isoformat(),
-                "start_url": start_url
+                "start_url": start_url,
+                "concurrency": self.concurrency
             },
             "pages": []
         }
         
-        logger.info(f"Starting crawl of {start_url} with max {self.max_pages} pages")
+        logger.info(f"Starting crawl of {start_url} with max {self.max_pages} pages "
+                    f"({self.concurrency} concurrent)")
         
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=self.headless)
-            context = await browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36 TradeWizard/1.0"
-            )
+        self._pool = self.browser_pool or await get_browser_pool()
+        owns_pool = False
+        if self.browser_pool is None and not self.headless:
+            # A visible browser is a debugging aid; keep it out of the shared pool
+            self._pool = BrowserPool(headless=False)
+            owns_pool = True
+        
+        crawl_failed = False
+        runner = None
+        try:
+            if self.http_first or self.use_sitemap or self.page_cache:
+                self._http_fetcher = self.http_fetcher or await get_http_fetcher()
+            if self.use_sitemap:
+                await self._apply_crawl_plan(start_url)
             
-            # Process the queue until empty or max pages reached
-            while self.url_queue and len(self.visited_urls) < self.max_pages:
-                url = self.url_queue.pop(0)
-                
-                # Skip if already visited
-                if url in self.visited_urls:
-                    continue
+            # Workers drain the shared frontier until it is empty or max pages reached
+            runner = asyncio.create_task(self._run_workers())
+            while not (runner.done() and self._page_queue.empty()):
+                getter = asyncio.ensure_future(self._page_queue.get())
+                await asyncio.wait({getter, runner}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            runner.result()  # Re-raise anything that broke the workers
+        except (Exception, asyncio.CancelledError):
+            crawl_failed = True
+            raise
+        finally:
+            # Also reached when the consumer stops iterating early
+            if runner is not None and not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+            # The browser context is only leased if some page needed it
+            if self._context is not None:
+                await self._pool.release(self._context, discard=crawl_failed)
+                self._context = None
+            if owns_pool:
+                await self._pool.close()
+        
+        # Update metadata
+        self.results["metadata"]["pages_crawled"] = len(self.visited_urls)
+        self.results["metadata"]["fetch_tiers"] = dict(self.fetch_tier_counts)
+        if self.crawl_plan:
+            self.results["metadata"]["crawl_plan"] = self.crawl_plan.as_dict()
+        if self.resource_blocking:
+            self.results["metadata"]["resource_blocking"] = self.blocking_stats.as_dict()
+        
+        logger.info(f"Crawl completed: {len(self.visited_urls)} pages crawled")
+    
+    async def _run_workers(self) -> None:
+        """Run the crawl workers until the frontier is exhausted."""
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def _apply_crawl_plan(self, start_url: str) -> None:
+        """
+        Seed the frontier from the site's sitemaps and apply its crawl-delay.
+        
+        Args:
+            start_url: The URL the crawl starts from
+        """
+        planner = CrawlPlanner(self._http_fetcher)
+        self.crawl_plan = await planner.plan(start_url, max_seeds=max(0, self.max_pages - 1))
+        
+        for url, priority in self.crawl_plan.seeds:
+            # Normalize like discovered links so the frontier dedupes them
+            self.frontier.push(urljoin(start_url, urlparse(url).path), priority=priority)
+        
+        if self.crawl_plan.crawl_delay:
+            domain = self.domain_limiter.domain_of(start_url)
+            self.domain_limiter.set_min_interval(domain, self.crawl_plan.crawl_delay)
+    
+    async def _worker(self) -> None:
+        """
+        Take URLs from the shared queue and crawl them until there is no work left.
+        """
+        while True:
+            url = await self._next_url()
+            if url is None:
+                return
+            try:
+                await self._crawl_page(url)
+            finally:
+                async with self._queue_changed:
+                    self._in_flight.discard(url)
+                    self._queue_changed.notify_all()
+    
+    async def _browser_context(self) -> BrowserContext:
+        """Lease the crawl's browser context on first use and share it between workers."""
+        async with self._context_lock:
+            if self._context is None:
+                self._context = await self._pool.acquire()
+            return self._context
+    
+    async def _next_url(self) -> Optional[str]:
+        """
+        Reserve the next URL to crawl.
+        
+        Waits while other workers are still loading pages that may add links
+        or free up page budget; returns None once the crawl is finished.
+        """
+        async with self._queue_changed:
+            while True:
+                # The frontier hands out each URL once, so no visited check is needed
+                if self.frontier and len(self.visited_urls) + len(self._in_flight) < self.max_pages:
+                    url, _ = self.frontier.pop()
+                    self._in_flight.add(url)
+                    return url
                 
-                page_data = {
-                    "url": url,
-                    "title": "N/A",
-                    "text": "",
-                    "page_type": "",
-                    "html": "",
-                    "found_links": [],
-                    "products_found": []
-                }
-
-                # Process the page
-                try:
-                    page = await context.new_page()
-                    await page.goto(url, wait_until="load", timeout=60000) # Try 'load' event, keep timeout
-                    
-                    # Get page content
-                    html = await page.content()
-                    title = await page.title()
-                    page_data["title"] = title
-                    
-                    # Extract text using BeautifulSoup instead of JavaScript
-                    soup = BeautifulSoup(html, 'html.parser')
-                    text = self._extract_text_with_soup(soup)
-                    page_data["text"] = text
-                    
-                    # Extract links
-                    crawlable_links, all_found_links = await self._extract_links(page, url)
-                    page_data["found_links"] = all_found_links
-                    
-                    # Classify page type
-                    page_type = self._classify_page_type(url, title)
-                    page_data["page_type"] = page_type
-                    
-                    # Extract products (this now gets body HTML)
-                    try:
-                        # Note: We are temporarily storing body HTML here
-                        page_data["body_html_debug"] = await self._extract_products(page)
-                        page_data["products_found"] = [] # Keep original structure, but empty for now
-                    except Exception as prod_err:
-                        logger.warning(f"Could not extract products from {url}: {prod_err}")
-                        page_data["products_found"] = []
-                    
-                    # Add to results
-                    self.results["pages"].append(page_data)
-                    self.visited_urls.add(url)
-                    
-                    # Add new links to queue
-                    for link in crawlable_links:
-                        if link not in self.visited_urls and link not in self.url_queue:
-                            self.url_queue.append(link)
-                    
-                    # Prioritize important pages
-                    self._prioritize_queue()
-                    
-                    logger.info(f"Crawled {url} ({len(self.visited_urls)}/{self.max_pages})")
-                    
-                except Exception as e:
-                    logger.error(f"Error crawling {url}: {str(e)}")
+                if not self._in_flight:
+                    return None
                 
-                finally:
-                    await page.close()
+                await self._queue_changed.wait()
+    
+    async def _crawl_page(self, url: str) -> None:
+        """
+        Fetch a single page, extract its content and queue newly found links.
+        
+        Reuses a cached copy when the server confirms it is unchanged, then
+        tries the plain HTTP tier when enabled, and falls back to the browser
+        when the page looks client-rendered.
+        
+        Args:
+            url: URL to crawl
+        """
+        try:
+            async with self.domain_limiter.slot(url):
+                fetched, response = None, None
+                if self.page_cache:
+                    fetched, response = await self._fetch_page_cached(url)
+                if fetched is None and self.http_first:
+                    fetched = await self._fetch_page_http(url, response)
+                if fetched is None:
+                    fetched = await self._fetch_page_browser(url)
+            page_data, crawlable_links = fetched
+            
+            self.visited_urls.add(url)
+            self.fetch_tier_counts[page_data["fetch_tier"]] += 1
+            
+            # Add new links to the frontier (already-seen links are ignored)
+            for link in crawlable_links:
+                if self.crawl_plan is None or self.crawl_plan.can_fetch(link):
+                    self.frontier.push(link)
             
-            await browser.close()
+            logger.info(f"Crawled {url} via {page_data['fetch_tier']} ({len(self.visited_urls)}/{self.max_pages})")
+            
+            # Hand the page to the consumer (waits while it is behind)
+            await self._page_queue.put(page_data)
+            
+        except Exception as e:
+            logger.error(f"Error crawling {url}: {str(e)}")
+    
+    def _new_page_data(self, url: str, fetch_tier: str) -> Dict[str, Any]:
+        """Return an empty page record."""
+        return {
+            "url": url,
+            "title": "N/A",
+            "text": "",
+            "page_type": "",
+            "html": "",
+            "found_links": [],
+            "products_found": [],
+            "structured_data": [],
+            "contacts": {},
+            "fetch_tier": fetch_tier
+        }
+    
+    async def _fetch_page_cached(
+        self, url: str
+    ) -> Tuple[Optional[Tuple[Dict[str, Any], List[str]]], Optional[HttpFetchResult]]:
+        """
+        Revalidate a cached copy of a page with a conditional request.
         
-        # Update metadata
-        self.results["metadata"]["pages_crawled"] = len(self.visited_urls)
+        Args:
+            url: URL to look up
+            
+        Returns:
+            Tuple of (cached (page_data, crawlable_links) or None, the revalidation
+            response when the page changed so the HTTP tier can reuse it)
+        """
+        # SQLite work runs off the event loop so concurrent crawls are not stalled
+        entry = await asyncio.to_thread(self.page_cache.get, url)
+        if entry is None:
+            return None, None
         
-        logger.info(f"Crawl completed: {len(self.results['pages'])} pages crawled")
+        conditional_headers = entry.conditional_headers()
+        response = None
+        if conditional_headers or entry.content_hash:
+            try:
+                response = await self._http_fetcher.fetch(url, headers=conditional_headers)
+            except Exception as e:
+                logger.info(f"Revalidation of {url} failed, fetching it again: {e}")
+                return None, None
+            
+            unchanged = response.status_code == 304 or (
+                response.status_code == 200
+                and entry.content_hash is not None
+                and content_hash(response.text) == entry.content_hash
+            )
+            if not unchanged:
+                return None, response
+            await asyncio.to_thread(self.page_cache.touch, url)
+        # Without validators the copy is reused as-is until its TTL runs out
         
-        return self.results
+        page_data = dict(entry.page_data)
+        page_data["fetch_tier"] = CACHE_TIER
+        return (page_data, list(entry.crawlable_links)), None
     
-    def _extract_text_with_soup(self, soup: BeautifulSoup) -> str:
+    async def _fetch_page_http(
+        self, url: str, response: Optional[HttpFetchResult] = None
+    ) -> Optional[Tuple[Dict[str, Any], List[str]]]:
         """
-        Extract text content using BeautifulSoup.
+        Fetch and extract a page without a browser.
         
         Args:
-            soup: BeautifulSoup object
+            url: URL to fetch
+            response: Response already fetched for this URL (e.g. by revalidation)
             
         Returns:
-            Extracted text
+            Tuple of (page_data, crawlable_links), or None if the page needs the browser
         """
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'noscript', 'iframe']):
-            element.decompose()
-        
-        # Extract text with structure
-        text_parts = []
-        
-        # Extract headings with hierarchy
-        for i in range(1, 7):
-            for heading in soup.find_all(f'h{i}'):
-                text_parts.append(f"{'#' * i} {heading.get_text(strip=True)}")
-        
-        # Extract paragraphs
-        for p in soup.find_all('p'):
-            text = p.get_text(strip=True)
-            if text:
-                text_parts.append(text)
-        
-        # Extract list items
-        for li in soup.find_all('li'):
-            text = li.get_text(strip=True)
-            if text:
-                text_parts.append(f"- {text}")
-        
-        # Extract other text
-        for div in soup.find_all(['div', 'span', 'td', 'th']):
-            # Skip if parent is already processed
-            if div.parent and div.parent.name in ['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                continue
-                
-            # Skip if it contains other content elements
-            if div.find(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                continue
-                
-            text = div.get_text(strip=True)
-            if text:
-                text_parts.append(text)
+        domain = urlparse(url).netloc.lower()
+        if self.tier_cache.get(domain) == FetchTierCache.BROWSER:
+            return None
+        
+        if response is None:
+            try:
+                response = await self._http_fetcher.fetch(url)
+            except Exception as e:
+                logger.info(f"HTTP fetch failed for {url}, escalating to browser: {e}")
+                return None
+        
+        if response.status_code in ESCALATE_STATUS_CODES:
+            logger.info(f"HTTP fetch of {url} returned {response.status_code}, escalating to browser")
+            return None
+        if response.status_code >= 400:
+            raise ValueError(f"HTTP {response.status_code}")
+        if not response.is_html:
+            raise ValueError(f"Unsupported content type {response.content_type}")
+        
+        parsed = await self._parse(parse_server_html, response.text, url)
+        browser_needed, reason = parsed["browser_needed"], parsed["reason"]
+        if self.tier_cache.get(domain) is None:
+            self.tier_cache.set(domain, FetchTierCache.BROWSER if browser_needed else FetchTierCache.HTTP)
+        if browser_needed:
+            logger.info(f"{url} looks client-rendered ({reason}), escalating to browser")
+            return None
+        
+        page_data = self._new_page_data(url, FetchTierCache.HTTP)
+        title = parsed["title"]
+        page_data["title"] = title
+        
+        crawlable_links, all_found_links = self._filter_links(parsed["anchors"], response.url)
+        page_data["found_links"] = all_found_links
+        await self._set_body_html(page_data, parsed["body_html"])
+        
+        # JSON-LD, contacts and text all come from the same parse
+        for key in ("structured_data", "contacts", "text"):
+            page_data[key] = parsed[key]
+        page_data["page_type"] = self._classify_page_type(url, title)
+        
+        if self.page_cache:
+            await asyncio.to_thread(
+                self.page_cache.put, url, page_data, crawlable_links, response.headers, content_hash(response.text)
+            )
+        return page_data, crawlable_links
+    
+    async def _fetch_page_browser(self, url: str) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Load and extract a page with Playwright.
         
-        return "\n".join(text_parts)
+        Args:
+            url: URL to load
+            
+        Returns:
+            Tuple of (page_data, crawlable_links)
+        """
+        page_data = self._new_page_data(url, FetchTierCache.BROWSER)
+        context = await self._browser_context()
+        page = await context.new_page()
+        try:
+            if self.resource_blocking:
+                await self.resource_blocking.install(page, self.blocking_stats, url)
+            response = await page.goto(url, wait_until="load", timeout=60000) # Try 'load' event, keep timeout
+            
+            # Title, HTML, links and body HTML in a single round trip;
+            # JSON-LD, contacts and text come from one server-side parse
+            extracted = await extract_page(page, include_text=False, include_body_html=True)
+            title = extracted["title"]
+            page_data["title"] = title
+            
+            page_data.update(await self._parse(parse_rendered_html, extracted["html"], url))
+            
+            crawlable_links, all_found_links = self._filter_links(extracted["links"], url)
+            page_data["found_links"] = all_found_links
+            
+            page_data["page_type"] = self._classify_page_type(url, title)
+            
+            await self._set_body_html(page_data, extracted["bodyHtml"])
+            page_data["products_found"] = [] # Keep original structure, but empty for now
+            
+            if self.page_cache:
+                headers = response.headers if response else {}
+                await asyncio.to_thread(self.page_cache.put, url, page_data, crawlable_links, headers)
+            return page_data, crawlable_links
+        finally:
+            await page.close()
     
-    async def _extract_links(self, page: Page, base_url: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    async def _parse(self, parse_fn: Callable[..., Dict[str, Any]], html: str, url: str) -> Dict[str, Any]:
+        """Run a page parse in the worker pool, or inline when there is none."""
+        if self.parse_executor is None:
+            return parse_fn(html, url)
+        return await self.parse_executor.run(parse_fn, html, url)
+    
+    async def _set_body_html(self, page_data: Dict[str, Any], body_html: str) -> None:
+        """Attach body HTML to a page record, out-of-band when an HTML store is set."""
+        if self.html_store:
+            # Hashing, compression and the file write stay off the event loop
+            page_data["body_html_blob"] = await asyncio.to_thread(self.html_store.put, body_html)
+        else:
+            # Note: We are temporarily storing body HTML here
+            page_data["body_html_debug"] = body_html
+    
+    def _filter_links(self, anchors: List[Dict[str, Optional[str]]], base_url: str) -> Tuple[List[str], List[Dict[str, str]]]:
         """
-        Extract links from the page.
+        Resolve anchors and pick out the ones worth crawling.
         
         Args:
-            page: Playwright page
+            anchors: Raw anchors as dictionaries {'href': raw_href, 'text': anchor_text}
             base_url: Base URL for resolving relative links
             
         Returns:
@@ -225,10 +512,6 @@ class SimpleCrawler:
         """
         base_domain = urlparse(base_url).netloc
         
-        # Extract href and text content using Playwright
-        # Returns a list of objects: [{href: '...', text: '...'}, ...]
-        links = await page.query_selector_all("a[href]")
-        
         crawlable_links = []
         all_found_links = []
         unique_crawlable_urls = set()
@@ -243,10 +526,9 @@ class SimpleCrawler:
             '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.mp3', '.mp4', '.avi'
         )
         
-        for link_element in links:
-            href = await link_element.get_attribute("href")
-            
-            text = await link_element.inner_text()
+        for anchor in anchors:
+            href = anchor.get("href") or ""
+            text = anchor.get("text")
             text = text.strip() if text else ""
             
             # Create absolute URL first for the 'all_found_links' list
@@ -282,21 +564,6 @@ class SimpleCrawler:
 
         return crawlable_links, all_found_links
 
-    async def _extract_products(self, page: Page) -> str:
-        """
-        Extract product information from the page. (Temporarily modified to get body HTML)
-        
-        Args:
-            page: Playwright page
-            
-        Returns:
-            Body HTML as a string
-        """
-        # --- TEMPORARY MODIFICATION: Get body innerHTML for debugging --- 
-        body_html = await page.evaluate("() => document.body.innerHTML")
-        return body_html
-        # --- END TEMPORARY MODIFICATION ---
-    
     def _classify_page_type(self, url: str, title: str) -> str:
         """
         Classify the page type based on URL and title.
@@ -308,74 +575,7 @@ class SimpleCrawler:
         Returns:
             Page type classification
         """
-        path = urlparse(url).path.lower()
-        
-        # Check for homepage
-        if path == "/" or path == "" or path == "/index.html" or path == "/home":
-            return "homepage"
-            
-        # Check for common page types
-        if re.search(r'/(shop|store|products?|buy)', path):
-            return "product_listing"
-            
-        if re.search(r'/(menu|food|dishes|meals)', path):
-            return "menu"
-            
-        if re.search(r'/about', path):
-            return "about"
-            
-        if re.search(r'/(contact|reach-us|find-us)', path):
-            return "contact"
-            
-        if re.search(r'/(category|cat|collection|tag)', path):
-            return "category"
-            
-        if re.search(r'/(product|item)/[^/]+', path):
-            return "product_detail"
-            
-        # Check title for clues
-        title_lower = title.lower()
-        if any(term in title_lower for term in ["shop", "store", "products", "buy"]):
-            return "product_listing"
-            
-        if any(term in title_lower for term in ["about", "our story", "history"]):
-            return "about"
-            
-        if any(term in title_lower for term in ["contact", "reach us", "find us"]):
-            return "contact"
-            
-        # Default
-        return "other"
-    
-    def _prioritize_queue(self):
-        """
-        Prioritize the URL queue to crawl important pages first.
-        """
-        # Define priority scores for different URL patterns
-        def get_priority(url):
-            path = urlparse(url).path.lower()
-            
-            # Highest priority: product/shop pages
-            if re.search(r'/(shop|store|products?|menu)', path):
-                return 0
-                
-            # High priority: about/contact pages
-            if re.search(r'/(about|contact)', path):
-                return 1
-                
-            # Medium priority: category pages
-            if re.search(r'/(category|cat|collection|tag)', path):
-                return 2
-                
-            # Lower priority: individual product pages (we want categories first)
-            if re.search(r'/product/[^/]+', path):
-                return 3
-                
-            # Default priority
-            return 4
-        
-        # Sort the queue by priority
-        self.url_queue.sort(key=get_priority)
+        return classify_page_type(url, title)
 
 
 async def crawl_website(url: str, max_pages: int = 20) -> Dict[str, Any]:
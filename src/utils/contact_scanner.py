@@ -0,0 +1,138 @@
+"""
+Single-pass contact scanner shared by the crawlers and the output formatter.
+Finds emails, phone numbers, street addresses and social links with one
+combined regex, normalizes phones to E.164 (keeping numbers it cannot
+normalize as written) and deduplicates every kind.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+# Country calling code assumed for numbers written in national format (0xx ...)
+CONTACT_DEFAULT_COUNTRY_CODE = os.getenv("CONTACT_DEFAULT_COUNTRY_CODE", "27")
+
+EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+PHONE_PATTERN = r'(?:(?:\+|00)[1-9]\d{0,2}[\s.-]?(?:\(0\)[\s.-]?)?)?(?:\(?\d{2,5}\)?[\s.-]?)?\d{3,4}[\s.-]?\d{3,4}'
+SOCIAL_MEDIA_PATTERN = r'(?:https?://)?(?:www\.)?(?:(?:facebook|instagram|twitter|linkedin|youtube|whatsapp|tiktok)\.(?:com|me|org|net)|wa\.me|t\.me)/[\w\.-]+'
+# Number, up to four words and a street type in any case, either a separate
+# English word or an Afrikaans compound (Kerkstraat, Voortrekkerweg); bounded
+# so it never runs on into a phone number or email that follows the address
+STREET_PATTERN = (
+    r'\b\d{1,5}[A-Za-z]?\s+(?:[A-Za-z][A-Za-z\'-]*\.?\s+){0,4}'
+    r'(?i:(?:Street|St|Road|Rd|Avenue|Ave|Drive|Dr|Lane|Ln|Way|Boulevard|Blvd|Crescent|Cres|Close|Place|Pl|Highway|Hwy|Square|Sq)\b\.?'
+    r'|\w*(?:straat|weg|rylaan|laan)\b)'
+)
+
+EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+PHONE_REGEX = re.compile(PHONE_PATTERN)
+SOCIAL_MEDIA_REGEX = re.compile(SOCIAL_MEDIA_PATTERN, re.IGNORECASE)
+STREET_REGEX = re.compile(STREET_PATTERN)
+
+# All four as one alternation, tried in this order at each position. The
+# lookbehinds only let a match start at the beginning of a run, which keeps
+# the scan linear in the length of the text.
+CONTACT_REGEX = re.compile(
+    rf'(?P<email>(?<![a-zA-Z0-9_%+-]){EMAIL_PATTERN})'
+    rf'|(?P<social>(?i:{SOCIAL_MEDIA_PATTERN}))'
+    rf'|(?P<phone>(?<![\d+]){PHONE_PATTERN})'
+    rf'|(?P<address>{STREET_PATTERN})'
+)
+
+# National significant number length when the country code is implied
+NATIONAL_NUMBER_DIGITS = 9
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+# Numbers that cannot be normalized are kept as written when they have at least
+# this many digits; shorter runs are usually years or prices
+RAW_PHONE_MIN_DIGITS = 9
+
+
+def normalize_phone(raw: str, default_country_code: str = CONTACT_DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    Normalize a phone number to E.164.
+
+    Args:
+        raw: Number as written, e.g. "021 555 1234", "+27 (0)21 555 1234" or "0027 21 555 1234"
+        default_country_code: Calling code for numbers in national format
+
+    Returns:
+        "+<digits>", or None if the text is not a plausible phone number
+    """
+    digits = re.sub(r'\D', '', raw)
+    if raw.lstrip().startswith('+'):
+        number = digits
+    elif digits.startswith('00'):
+        number = digits[2:]
+    elif digits.startswith('0') and len(digits) == NATIONAL_NUMBER_DIGITS + 1:
+        number = default_country_code + digits[1:]
+    elif digits.startswith(default_country_code) and len(digits) == len(default_country_code) + NATIONAL_NUMBER_DIGITS:
+        number = digits
+    else:
+        return None
+
+    # Drop a trunk prefix written after the country code: +27 (0)21 ...
+    if number.startswith(default_country_code + '0'):
+        number = default_country_code + number[len(default_country_code) + 1:]
+    if not E164_MIN_DIGITS <= len(number) <= E164_MAX_DIGITS:
+        return None
+    return '+' + number
+
+
+# Platform names for short-link hosts
+SOCIAL_SHORT_HOSTS = {"wa.me": "whatsapp", "t.me": "telegram"}
+
+
+def social_platform(link: str) -> str:
+    """Return the platform name of a normalized social link, e.g. "facebook"."""
+    host = link.split("://", 1)[-1].split("/", 1)[0]
+    return SOCIAL_SHORT_HOSTS.get(host, host.split(".")[0])
+
+
+def normalize_social_link(raw: str) -> str:
+    """Return a social profile link as an https URL without trailing punctuation."""
+    link = raw.rstrip('.')
+    link = re.sub(r'^(?:https?://)?(?:www\.)?', '', link, flags=re.IGNORECASE)
+    host, _, path = link.partition('/')
+    return f"https://{host.lower()}/{path}"
+
+
+def scan_contacts(text: str, default_country_code: str = CONTACT_DEFAULT_COUNTRY_CODE) -> Dict[str, List[str]]:
+    """
+    Scan text once for contact details.
+
+    Args:
+        text: Page or section text
+        default_country_code: Calling code for phone numbers in national format
+
+    Returns:
+        Dict of emails, phones (E.164 where possible, else as written),
+        addresses and social_links, each deduplicated in the order found
+    """
+    found: Dict[str, Dict[str, str]] = {"emails": {}, "phones": {}, "addresses": {}, "social_links": {}}
+    if not text:
+        return {key: [] for key in found}
+
+    for match in CONTACT_REGEX.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "email":
+            email = value.rstrip('.').lower()
+            found["emails"].setdefault(email, email)
+        elif kind == "social":
+            link = normalize_social_link(value)
+            found["social_links"].setdefault(link.lower(), link)
+        elif kind == "phone":
+            phone = normalize_phone(value, default_country_code)
+            if phone:
+                found["phones"].setdefault(phone, phone)
+            else:
+                # e.g. a national number from another country: keep it rather than lose it
+                digits = re.sub(r'\D', '', value)
+                if RAW_PHONE_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+                    found["phones"].setdefault(digits, ' '.join(value.split()))
+        else:
+            address = ' '.join(value.split())
+            found["addresses"].setdefault(address.lower(), address)
+
+    return {key: list(values.values()) for key, values in found.items()}
@@ -0,0 +1,339 @@
+import asyncio
+import time
+
+import pytest
+
+import llm_interpreter.interpreter as interpreter
+from mcps import MCP_REGISTRY
+from scrapers.batch_crawler import BatchCrawler
+
+
+def test_run_batch_processes_assessments_concurrently_under_the_limit(monkeypatch):
+    assessments = [{"id": f"a{i}", "trigger_crawler": False} for i in range(6)]
+    in_flight = {"now": 0, "peak": 0}
+    statuses = {}
+
+    async def fake_process(assessment, limits, leases=None, errors=None):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        if assessment["id"] == "a5":
+            raise RuntimeError("boom")
+        return "partial" if assessment["id"] == "a4" else "success"
+
+    def fake_update(assessment_id, status, processed_at=None, error_message=None, lease_owner=None):
+        assert lease_owner == interpreter.INTERPRETER_WORKER_ID
+        statuses[assessment_id] = status
+
+    monkeypatch.setattr(interpreter, "INTERPRETER_CONCURRENCY", 3)
+    monkeypatch.setattr(interpreter, "claim_assessments_for_llm", lambda after_id: [] if after_id else assessments)
+    monkeypatch.setattr(interpreter, "process_single_assessment", fake_process)
+    monkeypatch.setattr(interpreter, "update_assessment_status", fake_update)
+
+    asyncio.run(interpreter._run_batch())
+
+    assert in_flight["peak"] == 3
+    assert statuses == {
+        "a0": "success", "a1": "success", "a2": "success", "a3": "success",
+        "a4": "partial", "a5": "failed",
+    }
+
+
+def test_run_batch_releases_claims_it_did_not_finish(monkeypatch):
+    assessments = [{"id": "a0"}, {"id": "a1"}]
+    released = []
+
+    async def fake_crawl(assessments, limits, crawl_errors, on_crawled):
+        raise RuntimeError("crawler pool crashed")  # Run aborted before any assessment finished
+
+    monkeypatch.setattr(interpreter, "claim_assessments_for_llm", lambda after_id: assessments)
+    monkeypatch.setattr(interpreter, "_crawl_pending_sites", fake_crawl)
+    monkeypatch.setattr(interpreter, "release_assessment_claims", released.extend)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(interpreter._run_batch())
+
+    assert released == ["a0", "a1"]
+
+
+def test_assessments_move_on_as_soon_as_their_own_crawl_finishes(monkeypatch):
+    events = []
+
+    async def fake_crawl(url, max_pages, domain_limiter):
+        await asyncio.sleep(0.3 if "slow" in url else 0.01)
+        events.append(("crawled", url))
+        return {"metadata": {}, "pages": [], "aggregated_products": []}
+
+    class FakeBatchCrawler(BatchCrawler):
+        def __init__(self, max_concurrent_sites):
+            super().__init__(max_concurrent_sites, crawl_fn=fake_crawl)
+
+    async def fake_process(assessment, limits, leases=None, errors=None):
+        events.append(("processed", assessment["id"]))
+        return "success"
+
+    claimed = [
+        {"id": "a0", "source_url": "https://fast.example", "trigger_crawler": True},
+        {"id": "a1", "source_url": "https://slow.example", "trigger_crawler": True},
+        {"id": "a2", "trigger_crawler": False},
+    ]
+    monkeypatch.setattr(interpreter, "BatchCrawler", FakeBatchCrawler)
+    monkeypatch.setattr(interpreter, "claim_assessments_for_llm", lambda after_id: [] if after_id else claimed)
+    monkeypatch.setattr(interpreter, "store_crawl_result", lambda *args: None)
+    monkeypatch.setattr(interpreter, "process_single_assessment", fake_process)
+    monkeypatch.setattr(interpreter, "update_assessment_status", lambda *args, **kwargs: None)
+
+    asyncio.run(interpreter._run_batch())
+
+    assert events.index(("processed", "a2")) < events.index(("crawled", "https://fast.example"))
+    assert events.index(("processed", "a0")) < events.index(("crawled", "https://slow.example"))
+    assert events[-1] == ("processed", "a1")
+
+
+def test_run_batch_claims_pages_by_keyset_and_loads_raw_content_lazily(monkeypatch):
+    backlog = [{"id": f"a{i}", "llm_ready": True, "trigger_crawler": False} for i in range(5)]
+    cursors, loaded, statuses = [], [], {}
+
+    def fake_claim(after_id):
+        cursors.append(after_id)
+        remaining = [row for row in backlog if after_id is None or row["id"] > after_id]
+        return [dict(row) for row in remaining[:2]]
+
+    def fake_raw_content(assessment_id):
+        loaded.append(assessment_id)
+        return {"metadata": {}, "pages": [], "aggregated_products": []}
+
+    def fake_update(assessment_id, status, processed_at=None, error_message=None, lease_owner=None):
+        statuses[assessment_id] = status
+
+    monkeypatch.setattr(interpreter, "INTERPRETER_CLAIM_BATCH_SIZE", 2)
+    monkeypatch.setattr(interpreter, "claim_assessments_for_llm", fake_claim)
+    monkeypatch.setattr(interpreter, "fetch_raw_content", fake_raw_content)
+    monkeypatch.setattr(interpreter, "get_active_mcps", lambda assessment: {})
+    monkeypatch.setattr(interpreter, "update_assessment_status", fake_update)
+
+    asyncio.run(interpreter._run_batch())
+
+    assert cursors == [None, "a1", "a3"]
+    assert sorted(loaded) == ["a0", "a1", "a2", "a3", "a4"]
+    assert statuses == {f"a{i}": "success" for i in range(5)}
+
+
+def test_crawled_assessment_is_processed_from_memory_while_the_result_is_saved(monkeypatch):
+    crawled = {"metadata": {}, "pages": [], "aggregated_products": []}
+    saved, seen = [], []
+
+    async def fake_crawl(url):
+        return crawled
+
+    def fake_store(assessment_id, content, lease_owner=None):
+        saved.append((assessment_id, content))
+
+    def fake_active_mcps(assessment):
+        seen.append(assessment)
+        return {}
+
+    monkeypatch.setattr(interpreter, "crawl_and_prepare_content", fake_crawl)
+    monkeypatch.setattr(interpreter, "store_crawl_result", fake_store)
+    monkeypatch.setattr(interpreter, "get_active_mcps", fake_active_mcps)
+
+    assessment = {"id": "a0", "source_url": "https://example.com", "trigger_crawler": True}
+    status = asyncio.run(interpreter.process_single_assessment(assessment))
+
+    assert status == "success"
+    assert saved == [("a0", crawled)]
+    assert seen[0]["raw_content"] is crawled and seen[0]["trigger_crawler"] is False
+
+
+def test_failed_crawl_save_fails_the_assessment(monkeypatch):
+    async def fake_crawl(url):
+        return {"metadata": {}, "pages": [], "aggregated_products": []}
+
+    def failing_store(assessment_id, content, lease_owner=None):
+        raise RuntimeError("payload too large")
+
+    monkeypatch.setattr(interpreter, "crawl_and_prepare_content", fake_crawl)
+    monkeypatch.setattr(interpreter, "store_crawl_result", failing_store)
+    monkeypatch.setattr(interpreter, "get_active_mcps", lambda assessment: {})
+
+    assessment = {"id": "a0", "source_url": "https://example.com", "trigger_crawler": True}
+    assert asyncio.run(interpreter.process_single_assessment(assessment)) == "failed"
+
+
+def test_crawl_result_is_not_saved_once_the_lease_is_lost(monkeypatch):
+    filters = []
+
+    class FakeQuery:
+        def update(self, data):
+            return self
+
+        def eq(self, column, value):
+            filters.append((column, value))
+            return self
+
+        def execute(self):
+            return type("Response", (), {"data": []})()  # No row still leased to this worker
+
+    monkeypatch.setattr(interpreter, "supabase", type("Client", (), {"table": lambda self, name: FakeQuery()})())
+
+    with pytest.raises(RuntimeError, match="no longer leased"):
+        interpreter.store_crawl_result("a0", {"aggregated_products": []}, "worker-1")
+    assert filters == [("id", "a0"), ("llm_lease_owner", "worker-1")]
+
+
+def test_failed_crawl_status_is_recorded_once_under_the_lease(monkeypatch):
+    updates = []
+
+    def fake_update(assessment_id, status, processed_at=None, error_message=None, lease_owner=None):
+        updates.append((assessment_id, status, error_message, lease_owner))
+
+    monkeypatch.setattr(interpreter, "claim_assessments_for_llm",
+                        lambda after_id: [] if after_id else [{"id": "a0", "trigger_crawler": True}])
+    monkeypatch.setattr(interpreter, "update_assessment_status", fake_update)
+
+    asyncio.run(interpreter._run_batch())
+
+    assert updates == [("a0", "failed", "URL missing for crawler trigger", interpreter.INTERPRETER_WORKER_ID)]
+
+
+def test_stage_limits_db_call_runs_blocking_calls_under_the_db_limit():
+    limits = interpreter.StageLimits(crawl=1, llm=1, db=2)
+
+    async def run():
+        return await asyncio.gather(*(limits.db_call(lambda x: x * 2, i) for i in range(5)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+
+
+class _FakeMCP:
+    version = "test"
+
+    def __init__(self, name, delay, sync=False, fail=False):
+        self.name, self.delay, self.sync, self.fail = name, delay, sync, fail
+        self.seen = None
+        if sync:
+            self.build_payload = self._build_payload_sync
+            self.run = self._run_sync
+
+    async def build_payload(self, assessment, products):
+        self.seen = assessment
+        return {"name": self.name}
+
+    async def run(self, payload):
+        await asyncio.sleep(self.delay)
+        return self._output()
+
+    def _build_payload_sync(self, assessment, products):
+        self.seen = assessment
+        return {"name": self.name}
+
+    def _run_sync(self, payload):
+        time.sleep(self.delay)
+        return self._output()
+
+    def _output(self):
+        if self.fail:
+            return {"result": {}, "error": "bad output"}
+        return {"result": {"from": self.name}, "error": None}
+
+
+def test_mcps_run_as_a_dag_with_timeouts(monkeypatch):
+    mcps = {
+        "website": _FakeMCP("website", 0.1),
+        "hscode": _FakeMCP("hscode", 0.1, sync=True),
+        "summary": _FakeMCP("summary", 0.05),  # Needs website
+        "slow": _FakeMCP("slow", 5),
+        "after_slow": _FakeMCP("after_slow", 0),  # Skipped: its dependency times out
+    }
+    depends_on = {"summary": ["website"], "after_slow": ["slow"]}
+    logged = []
+
+    monkeypatch.setattr(interpreter, "get_active_mcps", lambda assessment: dict(mcps))
+    monkeypatch.setattr(interpreter, "get_mcp_dependencies", lambda name: depends_on.get(name, []))
+    monkeypatch.setattr(interpreter, "get_mcp_timeout", lambda name: 0.3)
+    monkeypatch.setattr(interpreter, "log_mcp_run", lambda **kwargs: logged.append(kwargs["mcp_name"]))
+    monkeypatch.setattr(interpreter, "handle_mcp_result", lambda output: True)
+
+    limits = interpreter.StageLimits(llm=8)
+    started = time.perf_counter()
+    status = asyncio.run(interpreter._run_active_mcps({"id": "a0"}, limits))
+    elapsed = time.perf_counter() - started
+
+    assert status == "partial"
+    assert elapsed < 0.6  # Critical path (timeout of slow), not the sum of every MCP
+    assert mcps["summary"].seen["mcp_outputs"]["website"]["result"] == {"from": "website"}
+    assert mcps["after_slow"].seen is None
+    assert sorted(logged) == ["hscode", "slow", "summary", "website"]
+
+
+def test_mcp_dependency_cycles_are_not_run():
+    cycles = interpreter._mcp_dependency_cycles({"a": [], "b": ["c"], "c": ["b"], "d": ["c"], "e": ["a"]})
+    assert cycles == {"b", "c", "d"}
+
+
+def test_leases_are_renewed_while_a_page_is_in_flight(monkeypatch):
+    renewals = []
+
+    def fake_renew(ids, worker_id, lease_seconds):
+        renewals.append(list(ids))
+        return set(ids) - {"a1"}  # a1 was taken over by another worker
+
+    async def slow_process(assessment, limits, leases=None, errors=None):
+        await asyncio.sleep(0.15)
+        return "success"
+
+    statuses = {}
+    monkeypatch.setattr(interpreter, "AssessmentLeases", _leases_renewing_every(0.05))
+    monkeypatch.setattr(interpreter, "claim_assessments_for_llm",
+                        lambda after_id: [] if after_id else [{"id": "a0"}, {"id": "a1"}])
+    monkeypatch.setattr(interpreter, "renew_assessment_leases", fake_renew)
+    monkeypatch.setattr(interpreter, "process_single_assessment", slow_process)
+    monkeypatch.setattr(interpreter, "update_assessment_status",
+                        lambda assessment_id, status, **kwargs: statuses.__setitem__(assessment_id, status))
+
+    asyncio.run(interpreter._run_batch())
+
+    assert renewals and renewals[0] == ["a0", "a1"]
+    assert all(ids == ["a0"] for ids in renewals[1:])  # The lost lease is not renewed again
+    assert set(statuses) == {"a0", "a1"}
+
+
+def _leases_renewing_every(seconds):
+    class FastLeases(interpreter.AssessmentLeases):
+        def __init__(self, assessment_ids):
+            super().__init__(assessment_ids, renew_seconds=seconds)
+    return FastLeases
+
+
+def test_patch_is_not_applied_once_the_lease_is_lost(monkeypatch):
+    class PatchingMCP(_FakeMCP):
+        def _output(self):
+            return {"result": {}, "error": None, "_db_patch": {"Assessments": {"a0": {"llm_summary": "x"}}}}
+
+    applied = []
+    monkeypatch.setattr(interpreter, "get_active_mcps", lambda assessment: {"website": PatchingMCP("website", 0)})
+    monkeypatch.setattr(interpreter, "log_mcp_run", lambda **kwargs: None)
+    monkeypatch.setattr(interpreter, "handle_mcp_result", applied.append)
+    monkeypatch.setattr(interpreter, "assessment_lease_is_held", lambda assessment_id, worker_id: False)
+
+    leases = interpreter.AssessmentLeases(["a0"])
+    status = asyncio.run(interpreter._run_active_mcps({"id": "a0"}, interpreter.StageLimits(), leases))
+
+    assert status == "failed"
+    assert applied == []
+    assert leases.lost == {"a0"}
+
+
+def test_plan_columns_cover_every_column_the_registry_reads():
+    planned = interpreter.ASSESSMENT_PLAN_COLUMNS.split(",")
+    assert "status" in planned and "raw_content" not in planned
+    for entry in MCP_REGISTRY.values():
+        assert set(entry["reads"]) - {"raw_content"} <= set(planned)
+
+
+def test_crawled_raw_content_is_recognised_as_structured():
+    crawled = {"metadata": {}, "pages": [], "aggregated_products": []}
+    assert interpreter._raw_content_is_structured({"raw_content": crawled})
+    assert not interpreter._raw_content_is_structured({"raw_content": {"html": "<p>hi</p>"}})
+    assert not interpreter._needs_crawl({"trigger_crawler": True, "raw_content": crawled})
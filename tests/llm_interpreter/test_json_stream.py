@@ -0,0 +1,28 @@
+import json
+
+from llm_interpreter.json_stream import IncrementalJSONParser
+
+
+def feed_in_pieces(text, size=3):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(text), size):
+        events += parser.feed(text[start:start + size])
+    return parser, events
+
+
+def test_fenced_object_is_reported_field_by_field():
+    document = {"summary": 'Acme, "quoted" {x}', "products": [{"name": "A", "tags": [1, 2]}, {"name": "B, c"}], "n": 3}
+    parser, events = feed_in_pieces("```json\n" + json.dumps(document) + "\n```")
+
+    assert [(kind, key) for kind, key, _ in events] == [
+        ("field", "summary"), ("item", "products"), ("item", "products"), ("field", "products"), ("field", "n"),
+    ]
+    assert parser.done and parser.result() == document
+
+
+def test_top_level_arrays_and_prose_are_left_to_the_full_parse():
+    for text in ('[{"name": "a"}, {"name": "b"}]', 'Sure! {"summary": "x"}', '``[]``'):
+        parser, events = feed_in_pieces(text)
+        assert events == []
+        assert parser.unsupported and not parser.done
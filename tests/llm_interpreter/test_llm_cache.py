@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from llm_interpreter.llm_cache import LLMResponseCache, llm_cache_key
+
+
+def messages(text):
+    return [{"role": "system", "content": "Reply in JSON."}, {"role": "user", "content": text}]
+
+
+def test_key_covers_messages_model_and_parameters():
+    key = llm_cache_key(messages("hi"), "gpt-4", 0.2, 2048, "json")
+    assert key == llm_cache_key(messages(" hi \n"), "gpt-4", 0.2, 2048, "JSON")
+    assert key != llm_cache_key(messages("hello"), "gpt-4", 0.2, 2048, "json")
+    assert key != llm_cache_key(messages("hi"), "gpt-4o", 0.2, 2048, "json")
+    assert key != llm_cache_key(messages("hi"), "gpt-4", 0.2, 1024, "json")
+    assert key != llm_cache_key(messages("hi"), "gpt-4", 0.2, 2048, "text")
+
+
+def test_expired_responses_are_dropped(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"), ttl_seconds=0.01)
+    cache.put("k", "gpt-4", '{"summary": "x"}')
+    assert cache.get("k") == '{"summary": "x"}'
+    time.sleep(0.02)
+    assert cache.get("k") is None
+    assert cache.total_bytes() == 0
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"))
+    for key in ("a", "b", "c"):
+        cache.put(key, "gpt-4", key * 500)
+        time.sleep(0.01)
+    cache.get("a")  # a becomes the most recently used
+    cache.max_bytes = cache.total_bytes() - 1
+    cache.put("d", "gpt-4", "d")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" * 500
+    assert cache.get("d") == "d"
+
+
+def test_hits_from_worker_threads_keep_the_size_total_exact(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"))
+    cache.put("k", "gpt-4", "short")
+    cache.put("k", "gpt-4", '{"summary": "a much longer response"}' * 20)
+
+    async def lookups():
+        return await asyncio.gather(*(asyncio.to_thread(cache.get, "k") for _ in range(20)))
+
+    assert len(set(asyncio.run(lookups()))) == 1
+    assert cache.hits == 20
+    stored = cache._conn.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+    assert cache.total_bytes() == stored
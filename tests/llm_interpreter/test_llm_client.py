@@ -0,0 +1,174 @@
+import asyncio
+import json
+
+import httpx
+
+import llm_interpreter.llm_client as llm_client
+from llm_interpreter.llm_cache import LLMResponseCache
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-test",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def test_calls_share_one_pooled_client_and_record_latency(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=_completion(json.dumps({"summary": "ok"})))
+
+    created = []
+
+    class MockTransportClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(handler), **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(llm_client, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_client, "get_llm_cache", lambda: None)
+    monkeypatch.setattr(llm_client.httpx, "AsyncClient", MockTransportClient)
+    llm_client.llm_metrics.reset()
+
+    async def run():
+        results = [await llm_client.call_llm("hi", model="gpt-test", expected_format="json")]
+        results += await asyncio.gather(*(llm_client.call_llm("hi", model="gpt-test") for _ in range(3)))
+        await llm_client.shutdown_llm_clients()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results[0] == {"summary": "ok"}
+    assert len(requests) == 4
+    assert len(created) == 1 and created[0].is_closed
+    summary = llm_client.llm_metrics.summary()
+    assert summary["all"]["calls"] == 4
+    assert summary["cold"]["calls"] == 1 and summary["warm"]["calls"] == 3
+    assert summary["errors"] == 0
+    assert llm_client._clients == {}
+
+
+def test_repeated_prompts_are_served_from_the_cache_unless_forced(monkeypatch, tmp_path):
+    calls = []
+
+    class MockTransportClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(handler), **kwargs)
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json=_completion(f'{{"summary": "call {len(calls)}"}}'))
+
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llm_client, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_client, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(llm_client.httpx, "AsyncClient", MockTransportClient)
+
+    async def run():
+        first = await llm_client.call_llm("Describe the site", model="gpt-test", expected_format="json")
+        again = await llm_client.call_llm("  Describe the site\n", model="gpt-test", expected_format="json")
+        forced = await llm_client.call_llm("Describe the site", model="gpt-test", expected_format="json",
+                                           force_refresh=True)
+        other_params = await llm_client.call_llm("Describe the site", model="gpt-test", expected_format="json",
+                                                 temperature=0.7)
+        after_refresh = await llm_client.call_llm("Describe the site", model="gpt-test", expected_format="json")
+        await llm_client.shutdown_llm_clients()
+        return first, again, forced, other_params, after_refresh
+
+    first, again, forced, other_params, after_refresh = asyncio.run(run())
+
+    assert first == again == {"summary": "call 1"}
+    assert forced == {"summary": "call 2"}
+    assert other_params == {"summary": "call 3"}
+    assert after_refresh == {"summary": "call 2"}  # The forced call replaced the cached response
+    assert len(calls) == 3
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+
+
+def _sse(pieces):
+    chunks = [
+        {"id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0, "model": "gpt-test",
+         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+        for piece in pieces
+    ]
+    body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode())
+
+
+def test_streamed_json_reports_summary_and_products_as_they_complete(monkeypatch):
+    pieces = ['```json\n{"summary": "Acme ', 'sells sauces.", "prod', 'ucts": [{"name": "Peri-peri"}',
+              ', {"name": "Chut', 'ney"}]}\n```']
+
+    class MockTransportClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(lambda request: _sse(pieces)), **kwargs)
+
+    monkeypatch.setattr(llm_client, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_client, "get_llm_cache", lambda: None)
+    monkeypatch.setattr(llm_client.httpx, "AsyncClient", MockTransportClient)
+    llm_client.llm_metrics.reset()
+
+    async def run():
+        events = [event async for event in llm_client.stream_llm("hi", model="gpt-test", expected_format="json")]
+        await llm_client.shutdown_llm_clients()
+        return events
+
+    events = asyncio.run(run())
+
+    assert "".join(event.text for event in events if event.type == "delta") == "".join(pieces)
+    parsed = [(event.type, event.key) for event in events if event.type in ("field", "item")]
+    assert parsed == [("field", "summary"), ("item", "products"), ("item", "products"), ("field", "products")]
+    # Each product is reported right after the delta that completes it
+    kinds = [event.type for event in events]
+    assert kinds.index("item") < kinds.index("delta", kinds.index("item"))
+    assert events[-1] == llm_client.LLMStreamEvent(
+        "done", value={"summary": "Acme sells sauces.", "products": [{"name": "Peri-peri"}, {"name": "Chutney"}]}
+    )
+    summary = llm_client.llm_metrics.summary()
+    assert summary["all"]["calls"] == 1 and summary["first_token"]["calls"] == 1
+    assert summary["first_token"]["mean_seconds"] <= summary["all"]["mean_seconds"]
+
+
+def test_streamed_responses_are_validated_like_call_llm_before_caching(monkeypatch, tmp_path):
+    responses = iter([
+        ['[{"name": "a"}', ', {"name": "b"}]'],
+        ['Sure! ', '{"summary": "x"}'],
+    ])
+
+    class MockTransportClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(lambda request: _sse(next(responses))), **kwargs)
+
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llm_client, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_client, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(llm_client.httpx, "AsyncClient", MockTransportClient)
+
+    async def collect(prompt):
+        return [event async for event in llm_client.stream_llm(prompt, model="gpt-test", expected_format="json")]
+
+    async def run():
+        array_events = await collect("list")
+        try:
+            await collect("summarize")
+            prose_error = None
+        except ValueError as e:
+            prose_error = e
+        await llm_client.shutdown_llm_clients()
+        return array_events, prose_error
+
+    array_events, prose_error = asyncio.run(run())
+
+    assert array_events[-1].value == [{"name": "a"}, {"name": "b"}]
+    assert prose_error is not None
+    assert cache.total_bytes() > 0 and cache.get(
+        llm_client.llm_cache_key([{"role": "user", "content": "summarize"}], "gpt-test", 0.2, 2048, "json")
+    ) is None
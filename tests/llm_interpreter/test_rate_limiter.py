@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+import pytest
+
+from llm_interpreter.tokens import count_tokens
+from llm_interpreter.rate_limiter import ModelRateLimiter, estimate_prompt_tokens, parse_reset_duration
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("1s") == 1.0
+    assert parse_reset_duration("6m0s") == 360.0
+    assert parse_reset_duration("120ms") == pytest.approx(0.12)
+    assert parse_reset_duration("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset_duration(None) is None
+
+
+def test_estimate_prompt_tokens_counts_every_message():
+    messages = [{"role": "system", "content": "x" * 40}, {"role": "user", "content": "y" * 10}]
+    assert estimate_prompt_tokens(messages) == (
+        4 + count_tokens("x" * 40) + 4 + count_tokens("y" * 10)
+    )
+
+
+def test_callers_are_served_in_order_within_the_token_budget():
+    # 600 tokens per minute refills 10 tokens per second
+    limiter = ModelRateLimiter("gpt-test", rpm=6000, tpm=600, headroom=1.0)
+    finished = []
+
+    async def call(name, tokens):
+        await limiter.acquire(tokens)
+        finished.append(name)
+
+    async def run():
+        await call("fill", 595)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        # The large request queued first is not overtaken by the small ones behind it
+        await asyncio.gather(call("large", 8), call("small-1", 1), call("small-2", 1))
+        return loop.time() - started
+
+    elapsed = asyncio.run(run())
+
+    assert finished == ["fill", "large", "small-1", "small-2"]
+    assert 0.2 <= elapsed < 1.0
+    assert limiter.stats()["waits"] >= 1
+
+
+def test_headers_resync_the_buckets():
+    limiter = ModelRateLimiter("gpt-test", rpm=100, tpm=100000, headroom=0.9)
+    limiter.update_from_headers(httpx.Headers({
+        "x-ratelimit-limit-requests": "5000",
+        "x-ratelimit-remaining-requests": "4999",
+        "x-ratelimit-limit-tokens": "60000",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "500ms",
+    }))
+
+    assert limiter.requests.capacity == pytest.approx(4500)
+    assert limiter.tokens.capacity == pytest.approx(54000)
+    # Token quota is exhausted on the server, so even a small request waits for the reset
+    assert limiter.tokens.wait_time(10) >= 0.5
+    assert limiter.requests.wait_time(1) == 0
@@ -0,0 +1,68 @@
+import pytest
+
+import mcps.website_analysis as website_analysis
+from mcps.website_analysis import WebsiteAnalysisMCP
+from llm_interpreter.tokens import count_tokens
+
+NAV = "Home\nShop\nAbout us\nContact"
+FOOTER = "(c) 2026 Acme Foods. All rights reserved."
+
+
+def _page(url, page_type, text, products=0):
+    return {
+        "url": url,
+        "title": url.rsplit("/", 1)[-1] or "Home",
+        "page_type": page_type,
+        "status": "success",
+        "products_found_on_page": products,
+        "text_content": f"{NAV}\n{text}\n{FOOTER}",
+    }
+
+
+def _content(pages, products=()):
+    return {
+        "metadata": {"start_url": "https://acme.example", "crawl_status": "completed", "confidence_score": 0.9,
+                     "contact_info": {"emails": ["sales@acme.example"]}},
+        "aggregated_products": list(products),
+        "pages": pages,
+    }
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(website_analysis, "WEBSITE_ANALYSIS_PROMPT_BUDGETS", {"gpt-test": 1200})
+    return 1200
+
+
+def test_boilerplate_is_sent_once_and_pages_are_ranked(budget):
+    pages = [
+        _page("https://acme.example/contact", "contact", "Call us on 021 555 0100"),
+        _page("https://acme.example/shop/sauces", "product_listing", "Peri-peri sauce\nChutney", products=2),
+        _page("https://acme.example/shop/spices", "product_listing", "Braai spice\nCurry powder\nMasala", products=3),
+        _page("https://acme.example/", "homepage", "Acme makes sauces and spices in Cape Town."),
+        {"url": "https://acme.example/broken", "status": "processed_no_text"},
+    ]
+
+    prompt = WebsiteAnalysisMCP()._generate_llm_prompt_from_structured(_content(pages), [], "gpt-test")
+
+    assert prompt.count(FOOTER) == 1
+    assert prompt.count("About us") == 1
+    order = [prompt.index(f"--- Page: https://acme.example/{path}") for path in ("", "shop/spices", "shop/sauces", "contact")]
+    assert order == sorted(order)
+    assert "/broken" not in prompt
+    assert prompt.rstrip().endswith("]}")  # The task section always goes in
+
+
+def test_prompt_stays_within_the_model_budget(budget):
+    filler = "\n".join(f"Sentence {i} about the range of sauces we make." for i in range(400))
+    pages = [_page(f"https://acme.example/shop/page-{i}", "product_listing", filler + f"\nUnique line {i}") for i in range(6)]
+    products = [{"name": f"Product {i}", "category": "Sauces"} for i in range(200)]
+
+    prompt = WebsiteAnalysisMCP()._generate_llm_prompt_from_structured(_content(pages, products), [], "gpt-test")
+
+    assert count_tokens(prompt, "gpt-test") <= budget
+    assert "Total Unique Products Found: 200" in prompt
+    assert "Name: Product 0," in prompt and "Name: Product 199," not in prompt
+    assert "--- Page: https://acme.example/shop/page-0" in prompt
+    # Repeated filler is only sent with the first page
+    assert prompt.count("Sentence 0 about") == 1
@@ -0,0 +1,37 @@
+import asyncio
+
+from scrapers.batch_crawler import BatchCrawler, CrawlJob
+
+
+def test_batch_crawler_shares_page_budget_and_reports_each_result():
+    in_flight = {"pages": 0, "peak": 0}
+    reported = []
+
+    async def fake_crawl(url, max_pages=20, domain_limiter=None):
+        if "broken" in url:
+            raise RuntimeError("navigation failed")
+        for page in range(3):
+            async with domain_limiter.slot(f"{url}/page-{page}"):
+                in_flight["pages"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["pages"])
+                await asyncio.sleep(0.01)
+                in_flight["pages"] -= 1
+        return {"url": url, "pages": 3}
+
+    async def on_result(job):
+        reported.append(job.assessment_id)
+
+    jobs = [CrawlJob(f"a{i}", f"https://site{i}.example") for i in range(6)]
+    jobs.append(CrawlJob("bad", "https://broken.example"))
+    crawler = BatchCrawler(max_concurrent_sites=4, max_concurrent_pages=2, domain_min_interval=0,
+                           crawl_fn=fake_crawl)
+
+    finished = asyncio.run(crawler.run(jobs, on_result))
+
+    assert sorted(reported) == sorted(job.assessment_id for job in jobs)
+    assert len(finished) == 7
+    assert in_flight["peak"] == 2
+    failed = [job for job in finished if not job.succeeded]
+    assert [job.assessment_id for job in failed] == ["bad"]
+    assert "navigation failed" in failed[0].error
+    assert all(job.result == {"url": job.url, "pages": 3} for job in finished if job.succeeded)
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from scrapers.blob_store import BlobStore
+
+HTML = "<div class='product'><h3>Rooibos</h3><span class='price'>R45.00</span></div>" * 200
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = BlobStore(str(tmp_path), codec="gzip")
+    first = store.put(HTML)
+    second = store.put(HTML)
+
+    assert first["sha256"] == second["sha256"]
+    assert first["bytes"] == len(HTML.encode("utf-8"))
+    assert first["stored_bytes"] < first["bytes"] / 10
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == [first["sha256"] + ".gz"]
+    assert store.get_text(first["sha256"]) == HTML
+
+
+def test_missing_blob_raises_key_error(tmp_path):
+    with pytest.raises(KeyError):
+        BlobStore(str(tmp_path), codec="gzip").get("0" * 64)
@@ -0,0 +1,140 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from scrapers import browser_pool
+from scrapers.browser_pool import BrowserPool
+
+
+# --- Fake Playwright objects ---
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+        self.cookies_cleared = 0
+
+    async def clear_cookies(self):
+        self.cookies_cleared += 1
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, headless=True):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+class FakePlaywrightManager:
+    def __init__(self):
+        self.playwright = FakePlaywright()
+
+    async def start(self):
+        return self.playwright
+
+
+@pytest.fixture
+def fake_playwright():
+    manager = FakePlaywrightManager()
+    with patch.object(browser_pool, "async_playwright", return_value=manager):
+        yield manager.playwright
+
+
+# --- Test Cases ---
+
+def test_contexts_are_recycled_until_worn_out(fake_playwright):
+    async def scenario():
+        pool = BrowserPool(max_uses_per_context=2)
+        async with pool.lease() as first:
+            pass
+        async with pool.lease() as second:
+            pass
+        async with pool.lease() as third:
+            pass
+        await pool.close()
+        return first, second, third, pool
+
+    first, second, third, pool = asyncio.run(scenario())
+    assert first is second  # Reused after the first lease
+    assert first.closed  # Closed after its second use
+    assert third is not first
+    assert first.cookies_cleared == 1
+    assert len(fake_playwright.chromium.launched) == 1  # Browser stayed warm
+    assert fake_playwright.stopped
+
+
+def test_lease_waits_when_pool_is_full(fake_playwright):
+    async def scenario():
+        pool = BrowserPool(max_browsers=1, max_contexts_per_browser=1)
+        order = []
+
+        async def worker(name):
+            async with pool.lease():
+                order.append(f"{name}-start")
+                await asyncio.sleep(0.01)
+                order.append(f"{name}-end")
+
+        await asyncio.gather(worker("a"), worker("b"))
+        await pool.close()
+        return order
+
+    assert asyncio.run(scenario()) == ["a-start", "a-end", "b-start", "b-end"]
+
+
+def test_failed_lease_discards_context(fake_playwright):
+    async def scenario():
+        pool = BrowserPool()
+        with pytest.raises(RuntimeError):
+            async with pool.lease() as context:
+                raise RuntimeError("page crashed")
+        async with pool.lease() as replacement:
+            pass
+        await pool.close()
+        return context, replacement
+
+    context, replacement = asyncio.run(scenario())
+    assert context.closed
+    assert replacement is not context
+
+
+def test_shared_pool_is_replaced_on_new_event_loop(fake_playwright):
+    async def get_pool():
+        return await browser_pool.get_browser_pool()
+
+    first = asyncio.run(get_pool())
+    second = asyncio.run(get_pool())
+    assert first is not second
+    asyncio.run(browser_pool.shutdown_browser_pool())
@@ -0,0 +1,38 @@
+from src.utils.contact_scanner import normalize_phone, scan_contacts
+
+
+def test_normalize_phone_to_e164():
+    assert normalize_phone("021 555 1234") == "+27215551234"
+    assert normalize_phone("+27 (0)82 123 4567") == "+27821234567"
+    assert normalize_phone("0027 11 222 3333") == "+27112223333"
+    assert normalize_phone("27 21 555 1234") == "+27215551234"
+    assert normalize_phone("+44 20 7946 0958") == "+442079460958"
+    assert normalize_phone("2023 2024") is None
+
+
+def test_scan_contacts_finds_every_kind_in_one_pass_and_deduplicates():
+    text = (
+        "Visit 12 Long Street, Cape Town. Tel 021 555 1234 or +27 21 555 1234. "
+        "Email Sales@Example.co.za or sales@example.co.za. "
+        "https://www.Facebook.com/examplefoods. wa.me/27215551234 Copyright 2020 2024"
+    )
+
+    contacts = scan_contacts(text)
+
+    assert contacts == {
+        "emails": ["sales@example.co.za"],
+        "phones": ["+27215551234"],
+        "addresses": ["12 Long Street"],
+        "social_links": ["https://facebook.com/examplefoods", "https://wa.me/27215551234"],
+    }
+
+
+def test_numbers_that_cannot_be_normalized_are_kept_as_written():
+    contacts = scan_contacts("Call (212) 555-0100 or (212) 555 0100, open 2020 2024")
+    assert contacts["phones"] == ["(212) 555-0100"]
+
+
+def test_addresses_with_afrikaans_or_lowercase_street_types_are_found():
+    contacts = scan_contacts("Find us at 45 Kerkstraat, Pretoria, 5 the avenue, or 3 Jan Smutsrylaan. Tel 012 345 6789")
+    assert contacts["addresses"] == ["45 Kerkstraat", "5 the avenue", "3 Jan Smutsrylaan"]
+    assert contacts["phones"] == ["+27123456789"]
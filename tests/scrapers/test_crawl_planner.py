@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import time
+
+import pytest
+
+from scrapers.crawl_planner import CrawlPlanner, parse_sitemap, select_seeds
+from scrapers.domain_limiter import DomainLimiter
+from scrapers.http_fetcher import HttpFetchResult
+
+SITE = "https://www.example.co.za"
+
+ROBOTS = f"""User-agent: *
+Disallow: /shop/wholesale/
+Crawl-delay: 2
+Sitemap: {SITE}/sitemap_index.xml
+"""
+
+
+def urlset(paths):
+    urls = "".join(f"<url><loc>{SITE}{path}</loc></url>" for path in paths)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+
+def sitemap_index(locs):
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+
+
+class FakeFetcher:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    async def fetch(self, url, headers=None):
+        self.requested.append(url)
+        body = self.responses.get(url)
+        if body is None:
+            return HttpFetchResult(url=url, status_code=404, headers={}, text="")
+        if isinstance(body, bytes):
+            return HttpFetchResult(url=url, status_code=200, headers={}, text="", content=body)
+        return HttpFetchResult(url=url, status_code=200, headers={}, text=body, content=body.encode())
+
+
+def test_parse_sitemap_handles_indexes_and_gzip():
+    urls, children = parse_sitemap(sitemap_index([f"{SITE}/post-sitemap.xml"]).encode())
+    assert urls == [] and children == [f"{SITE}/post-sitemap.xml"]
+    urls, children = parse_sitemap(gzip.compress(urlset(["/shop/"]).encode()))
+    assert urls == [f"{SITE}/shop/"] and children == []
+
+
+def test_select_seeds_prefers_listings_and_caps_each_type():
+    urls = [f"{SITE}/blog/news", f"{SITE}/contact", f"{SITE}/about"] + [f"{SITE}/shop/item-{i}" for i in range(10)]
+    seeds = select_seeds(urls, max_seeds=4)
+    assert [url for url, _ in seeds] == [f"{SITE}/shop/item-0", f"{SITE}/shop/item-1", f"{SITE}/about", f"{SITE}/contact"]
+    assert [priority for _, priority in seeds] == [0, 0, 1, 1]
+
+
+def test_parse_sitemap_rejects_oversized_gzip():
+    bomb = gzip.compress(urlset(["/shop/"]).encode() + b" " * 100_000)
+    with pytest.raises(ValueError):
+        parse_sitemap(bomb, max_bytes=10_000)
+
+
+def test_plan_reads_robots_and_nested_gzip_sitemaps():
+    fetcher = FakeFetcher({
+        f"{SITE}/robots.txt": ROBOTS,
+        f"{SITE}/sitemap_index.xml": sitemap_index([f"{SITE}/post-sitemap.xml", f"{SITE}/product-sitemap.xml.gz"]),
+        f"{SITE}/post-sitemap.xml": urlset(["/blog/harvest", "/about-us"]),
+        f"{SITE}/product-sitemap.xml.gz": gzip.compress(urlset(["/shop/rusks", "/shop/wholesale/bulk", "/products/"]).encode()),
+    })
+    plan = asyncio.run(CrawlPlanner(fetcher).plan(SITE + "/", max_seeds=10))
+
+    assert plan.crawl_delay == 2.0
+    # The product sitemap is read before the post sitemap
+    assert plan.sitemaps_read == [f"{SITE}/sitemap_index.xml", f"{SITE}/product-sitemap.xml.gz", f"{SITE}/post-sitemap.xml"]
+    assert [url for url, _ in plan.seeds] == [f"{SITE}/products/", f"{SITE}/shop/rusks", f"{SITE}/about-us"]
+    assert not plan.can_fetch(f"{SITE}/shop/wholesale/bulk")
+
+
+def test_plan_falls_back_to_common_sitemap_locations():
+    fetcher = FakeFetcher({f"{SITE}/sitemap.xml": urlset(["/menu/"])})
+    plan = asyncio.run(CrawlPlanner(fetcher).plan(SITE, max_seeds=5))
+    assert plan.robots is None and plan.crawl_delay is None
+    assert plan.seeds == [(f"{SITE}/menu/", 0)]
+    assert f"{SITE}/wp-sitemap.xml" not in fetcher.requested
+
+
+def test_domain_limiter_spaces_page_loads():
+    limiter = DomainLimiter(4)
+    limiter.set_min_interval("example.co.za", 0.05)
+    starts = []
+
+    async def load():
+        async with limiter.slot("https://example.co.za/page"):
+            starts.append(time.monotonic())
+
+    async def main():
+        await asyncio.gather(*(load() for _ in range(3)))
+
+    asyncio.run(main())
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
@@ -0,0 +1,37 @@
+from scrapers.frontier import CrawlFrontier, url_priority
+
+BASE = "https://www.example.co.za"
+
+
+def test_urls_come_out_by_priority_then_discovery_order():
+    frontier = CrawlFrontier()
+    for path in ["/blog/a", "/about-us", "/shop/", "/blog/b", "/contact", "/tag/sale"]:
+        frontier.push(BASE + path)
+    order = [frontier.pop()[0][len(BASE):] for _ in range(len(frontier))]
+    assert order == ["/shop/", "/about-us", "/contact", "/tag/sale", "/blog/a", "/blog/b"]
+    assert not frontier
+
+
+def test_each_url_is_queued_once_even_after_pop():
+    frontier = CrawlFrontier()
+    assert frontier.push(BASE + "/shop/")
+    assert not frontier.push(BASE + "/shop/")
+    frontier.pop()
+    assert not frontier.push(BASE + "/shop/")
+    frontier.mark_seen(BASE + "/skipped")
+    assert BASE + "/skipped" in frontier
+    assert not frontier.push(BASE + "/skipped")
+    assert len(frontier) == 0
+
+
+def test_depth_is_tracked_and_optionally_penalized():
+    assert url_priority(BASE + "/blog/a", depth=3) == url_priority(BASE + "/blog/b", depth=0)
+    assert url_priority(BASE + "/blog/a", depth=3, depth_penalty=True) > url_priority(BASE + "/blog/b", depth_penalty=True)
+
+    frontier = CrawlFrontier(depth_penalty=True)
+    frontier.push(BASE + "/deep/page", depth=2)
+    frontier.push(BASE + "/shallow", depth=1)
+    frontier.push(BASE + "/menu", depth=2)
+    assert frontier.pop() == (BASE + "/menu", 2)
+    assert frontier.pop() == (BASE + "/shallow", 1)
+    assert frontier.depth_of(BASE + "/deep/page") == 2
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from scrapers.page_cache import PageCache, cache_key
+
+
+def page(url, text):
+    return {"url": url, "title": "Shop", "text": text, "fetch_tier": "http"}
+
+
+def test_entries_round_trip_with_validators(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+    url = "https://Example.co.za/shop#top"
+    cache.put(url, page(url, "rusks"), ["https://example.co.za/about"],
+              headers={"etag": '"abc"', "last-modified": "Wed, 01 Oct 2025 10:00:00 GMT"})
+
+    entry = cache.get("https://example.co.za/shop")
+    assert entry.page_data["text"] == "rusks"
+    assert entry.crawlable_links == ["https://example.co.za/about"]
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 01 Oct 2025 10:00:00 GMT",
+    }
+    assert cache_key(url) == cache_key("https://example.co.za/shop")
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"), ttl_seconds=0.01)
+    cache.put("https://example.co.za/", page("https://example.co.za/", "home"), [])
+    time.sleep(0.02)
+    assert cache.get("https://example.co.za/") is None
+    assert cache.total_bytes() == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+    urls = [f"https://example.co.za/p{i}" for i in range(3)]
+    for url in urls:
+        cache.put(url, page(url, url * 50), [])
+        time.sleep(0.01)
+    cache.get(urls[0])  # p0 becomes the most recently used
+
+    cache.max_bytes = cache.total_bytes() - 1
+    cache.put(urls[2], page(urls[2], urls[2] * 50), [])
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[0]) is not None and cache.get(urls[2]) is not None
+
+
+def test_running_size_total_tracks_replacements_and_threads(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+    url = "https://example.co.za/shop"
+    cache.put(url, page(url, "short"), [])
+    cache.put(url, page(url, "a much longer body " * 20), [])
+
+    async def lookups():
+        return await asyncio.gather(*(asyncio.to_thread(cache.get, url) for _ in range(20)))
+
+    assert all(entry is not None for entry in asyncio.run(lookups()))
+    stored = cache._conn.execute("SELECT SUM(size) FROM pages").fetchone()[0]
+    assert cache.total_bytes() == stored
+    cache.close()
+    assert PageCache(str(tmp_path / "pages.sqlite3")).total_bytes() == stored
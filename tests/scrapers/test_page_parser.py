@@ -0,0 +1,74 @@
+import asyncio
+
+from scrapers.contact_extraction import extract_contact_info
+from scrapers.page_parser import extract_page_content, parse_html
+
+PAGE = """
+<html><head><title>Contact us</title>
+<script type="application/ld+json">{"@type": "Organization", "name": "Example Foods"}</script>
+<script>var tracking = "noise@tracker.example";</script>
+</head><body>
+<h1>Get in touch</h1>
+<p>We deliver across Cape Town.</p>
+<div class="hidden"><span class="contact">old@example.co.za</span></div>
+<footer>Email sales@example.co.za or call +27 21 555 1234.
+<a href="https://www.facebook.com/examplefoods">Facebook</a></footer>
+</body></html>
+"""
+
+
+def test_extract_page_content_uses_one_parse_for_json_ld_contacts_and_text():
+    content = extract_page_content(parse_html(PAGE), "https://example.co.za/contact")
+
+    assert content["structured_data"] == [{"@type": "Organization", "name": "Example Foods"}]
+    assert "# Get in touch" in content["text"]
+    assert "tracking" not in content["text"]
+    contacts = content["contacts"]
+    assert "sales@example.co.za" in contacts["emails"]
+    assert "noise@tracker.example" not in contacts["emails"]
+    assert any("555" in phone for phone in contacts["phones"])
+
+
+def test_extract_contact_info_still_accepts_raw_html():
+    contacts = extract_contact_info(PAGE, "https://example.co.za/")
+
+    assert "sales@example.co.za" in contacts["emails"]
+    assert "old@example.co.za" not in contacts["emails"]
+
+
+def test_parse_executor_runs_parses_in_worker_processes():
+    from scrapers.page_parser import parse_rendered_html
+    from scrapers.parse_executor import ParseExecutor
+
+    async def run():
+        executor = ParseExecutor(max_workers=1)
+        try:
+            return await executor.run(parse_rendered_html, PAGE, "https://example.co.za/contact")
+        finally:
+            executor.shutdown()
+
+    parsed = asyncio.run(run())
+    inline = parse_rendered_html(PAGE, "https://example.co.za/contact")
+    assert parsed["text"] == inline["text"]
+    assert parsed["structured_data"] == inline["structured_data"]
+    assert sorted(parsed["contacts"]["emails"]) == sorted(inline["contacts"]["emails"])
+
+
+def test_visible_contact_regions_skips_hidden_subtrees_and_nested_matches():
+    from scrapers.contact_extraction import visible_contact_regions
+
+    nested = "<div class='info'>" * 200 + "deep@example.co.za" + "</div>" * 200
+    soup = parse_html(
+        "<html><body>"
+        "<div class='contact-box'><address>1 Long St</address><span class='info'>x</span></div>"
+        "<nav style='display:none'><div class='info'>hidden@example.co.za</div></nav>"
+        "<div class='sr-only'><footer>also hidden</footer></div>"
+        f"<footer>{nested}</footer>"
+        "</body></html>"
+    )
+
+    regions = visible_contact_regions(soup)
+
+    assert [region.name for region in regions] == ["div", "footer"]
+    assert "1 Long St" in regions[0].get_text()
+    assert "deep@example.co.za" in regions[1].get_text()
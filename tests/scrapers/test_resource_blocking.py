@@ -0,0 +1,39 @@
+from scrapers.resource_blocking import ResourceBlockingProfile, ResourceBlockingStats, ESTIMATED_RESOURCE_BYTES
+
+PAGE_URL = "https://www.example.co.za/shop/"
+
+
+def test_document_and_first_party_scripts_are_allowed():
+    profile = ResourceBlockingProfile(stub_third_party_scripts=True)
+    assert profile.decide(PAGE_URL, "document", PAGE_URL) is None
+    assert profile.decide("https://example.co.za/wp-includes/js/jquery.js", "script", PAGE_URL) is None
+    assert profile.decide("https://cdn.example.co.za/app.js", "script", PAGE_URL) is None
+
+
+def test_assets_and_trackers_are_aborted():
+    profile = ResourceBlockingProfile()
+    assert profile.decide("https://www.example.co.za/logo.png", "image", PAGE_URL) == "abort"
+    assert profile.decide("https://fonts.gstatic.com/roboto.woff2", "font", PAGE_URL) == "abort"
+    assert profile.decide("https://www.google-analytics.com/analytics.js", "script", PAGE_URL) == "abort"
+    # Stylesheets stay, the text extractors rely on computed visibility
+    assert profile.decide("https://www.example.co.za/style.css", "stylesheet", PAGE_URL) is None
+
+
+def test_third_party_scripts_are_stubbed_only_when_enabled():
+    script = "https://widgets.example-chat.com/loader.js"
+    assert ResourceBlockingProfile().decide(script, "script", PAGE_URL) is None
+    stubbing = ResourceBlockingProfile(stub_third_party_scripts=True, allowed_script_domains=["cdnjs.cloudflare.com"])
+    assert stubbing.decide(script, "script", PAGE_URL) == "stub"
+    assert stubbing.decide("https://cdnjs.cloudflare.com/jquery.min.js", "script", PAGE_URL) is None
+
+
+def test_stats_estimate_saved_bytes():
+    stats = ResourceBlockingStats()
+    stats.record_blocked("image")
+    stats.record_blocked("image")
+    stats.record_stubbed("script")
+    summary = stats.as_dict()
+    assert summary["requests_blocked"] == 2
+    assert summary["requests_stubbed"] == 1
+    assert summary["blocked_by_type"] == {"image": 2}
+    assert summary["estimated_bytes_saved"] == 2 * ESTIMATED_RESOURCE_BYTES["image"] + ESTIMATED_RESOURCE_BYTES["script"]
@@ -0,0 +1,200 @@
+import asyncio
+from contextlib import aclosing
+
+from scrapers.blob_store import BlobStore
+from scrapers.http_fetcher import FetchTierCache, HttpFetchResult, needs_browser
+from scrapers.page_cache import PageCache
+from scrapers.simple_crawler import SimpleCrawler
+from bs4 import BeautifulSoup
+
+FILLER = "<p>" + "Locally made rusks, biltong and dried fruit for export. " * 6 + "</p>"
+
+
+def server_page(links):
+    anchors = "".join(f'<a href="{href}">{href}</a>' for href in links)
+    return f"<html><head><title>Shop</title></head><body><nav>{anchors}</nav>{FILLER}</body></html>"
+
+
+SPA_SHELL = '<html><head><title>App</title></head><body><div id="root"></div><script src="/app.js"></script></body></html>'
+
+
+# --- Fakes ---
+
+class FakeFetcher:
+    def __init__(self, pages, etags=None):
+        self.pages = pages
+        self.etags = etags or {}
+        self.requested = []
+
+    async def fetch(self, url, headers=None):
+        self.requested.append(url)
+        etag = self.etags.get(url)
+        response_headers = {"content-type": "text/html"}
+        if etag:
+            response_headers["etag"] = etag
+            if (headers or {}).get("If-None-Match") == etag:
+                return HttpFetchResult(url=url, status_code=304, headers=response_headers, text="")
+        return HttpFetchResult(url=url, status_code=200, headers=response_headers, text=self.pages[url])
+
+
+class FakePage:
+    def __init__(self, site):
+        self.site = site
+        self.url = None
+        self.evaluations = 0
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+        await asyncio.sleep(0.01)
+
+    async def evaluate(self, script, arg=None):
+        links = self.site.get(self.url, [])
+        self.evaluations += 1
+        return {
+            "title": "Rendered",
+            "links": [{"href": href, "url": href, "text": href} for href in links],
+            "text": "",
+            "products": [],
+            "jsonLd": [],
+            "html": server_page(links),
+            "bodyHtml": FILLER,
+        }
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, site):
+        self.site = site
+        self.pages_opened = 0
+
+    async def new_page(self):
+        self.pages_opened += 1
+        return FakePage(self.site)
+
+
+class FakePool:
+    def __init__(self, site):
+        self.context = FakeContext(site)
+        self.acquired = 0
+        self.released = 0
+
+    async def acquire(self):
+        self.acquired += 1
+        return self.context
+
+    async def release(self, context, discard=False):
+        self.released += 1
+
+
+# --- Test Cases ---
+
+def test_needs_browser_heuristic():
+    html = server_page(["/shop"])
+    assert needs_browser(html, BeautifulSoup(html, "html.parser")) == (False, "server_rendered")
+    assert needs_browser(SPA_SHELL, BeautifulSoup(SPA_SHELL, "html.parser"))[0] is True
+
+
+def test_server_rendered_site_never_leases_a_browser():
+    pages = {
+        "http://shop.example/": server_page(["/shop", "/about"]),
+        "http://shop.example/shop": server_page(["/"]),
+        "http://shop.example/about": server_page(["/"]),
+    }
+    pool = FakePool({})
+    crawler = SimpleCrawler(max_pages=5, concurrency=2, http_first=True, http_fetcher=FakeFetcher(pages),
+                            browser_pool=pool, tier_cache=FetchTierCache())
+    results = asyncio.run(crawler.crawl("http://shop.example/"))
+
+    assert results["metadata"]["pages_crawled"] == 3
+    assert results["metadata"]["fetch_tiers"] == {"http": 3, "browser": 0, "cache": 0}
+    assert pool.acquired == 0
+    assert {p["page_type"] for p in results["pages"]} == {"homepage", "product_listing", "about"}
+
+
+def test_client_rendered_site_escalates_and_caches_domain():
+    fetcher = FakeFetcher({"http://spa.example/": SPA_SHELL})
+    pool = FakePool({"http://spa.example/": ["/products"], "http://spa.example/products": []})
+    tier_cache = FetchTierCache()
+    crawler = SimpleCrawler(max_pages=5, http_first=True, http_fetcher=fetcher, browser_pool=pool, tier_cache=tier_cache)
+    results = asyncio.run(crawler.crawl("http://spa.example/"))
+
+    assert results["metadata"]["fetch_tiers"] == {"http": 0, "browser": 2, "cache": 0}
+    assert tier_cache.get("spa.example") == FetchTierCache.BROWSER
+    # Only the first page was tried over HTTP; the domain decision skipped it for the rest
+    assert fetcher.requested == ["http://spa.example/"]
+    assert pool.acquired == 1 and pool.released == 1
+
+
+def test_concurrent_crawl_respects_page_budget():
+    site = {"http://big.example/": [f"/p{i}" for i in range(30)]}
+    crawler = SimpleCrawler(max_pages=7, concurrency=4, browser_pool=FakePool(site))
+    results = asyncio.run(crawler.crawl("http://big.example/"))
+    assert len(results["pages"]) == 7
+    assert len({p["url"] for p in results["pages"]}) == 7
+
+
+def test_recrawl_reuses_unchanged_pages_from_cache(tmp_path):
+    pages = {
+        "http://shop.example/": server_page(["/shop", "/about"]),
+        "http://shop.example/shop": server_page(["/"]),
+        "http://shop.example/about": server_page(["/"]),
+    }
+    etags = {"http://shop.example/": '"v1"', "http://shop.example/shop": '"v1"'}
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+
+    def crawl():
+        crawler = SimpleCrawler(max_pages=5, http_first=True, http_fetcher=FakeFetcher(pages, etags),
+                                browser_pool=FakePool({}), tier_cache=FetchTierCache(), page_cache=cache)
+        return asyncio.run(crawler.crawl("http://shop.example/"))
+
+    assert crawl()["metadata"]["fetch_tiers"] == {"http": 3, "browser": 0, "cache": 0}
+
+    # ETag pages answer 304; the page without validators is recognised by its unchanged body
+    assert crawl()["metadata"]["fetch_tiers"] == {"http": 0, "browser": 0, "cache": 3}
+
+    pages["http://shop.example/about"] = server_page(["/", "/contact"])
+    pages["http://shop.example/contact"] = server_page(["/"])
+    results = crawl()
+    assert results["metadata"]["fetch_tiers"] == {"http": 2, "browser": 0, "cache": 2}
+    assert {p["page_type"] for p in results["pages"]} == {"homepage", "product_listing", "about", "contact"}
+
+
+def test_iter_pages_streams_and_cleans_up_on_early_exit():
+    site = {"http://big.example/": [f"/p{i}" for i in range(30)]}
+    pool = FakePool(site)
+    crawler = SimpleCrawler(max_pages=20, concurrency=3, browser_pool=pool)
+
+    async def take(n):
+        urls = []
+        async with aclosing(crawler.iter_pages("http://big.example/")) as pages:
+            async for page in pages:
+                urls.append(page["url"])
+                if len(urls) == n:
+                    break
+        return urls
+
+    urls = asyncio.run(take(4))
+    assert urls[0] == "http://big.example/"
+    assert len(urls) == 4
+    # Pages are handed over instead of being kept on the crawler
+    assert crawler.results["pages"] == []
+    # Stopping early still returns the browser context
+    assert pool.acquired == 1 and pool.released == 1
+
+
+def test_html_store_keeps_only_hash_and_sizes(tmp_path):
+    pages = {"http://shop.example/": server_page(["/"])}
+    store = BlobStore(str(tmp_path), codec="gzip")
+    crawler = SimpleCrawler(max_pages=1, http_first=True, http_fetcher=FakeFetcher(pages),
+                            browser_pool=FakePool({}), tier_cache=FetchTierCache(), html_store=store)
+    page = asyncio.run(crawler.crawl("http://shop.example/"))["pages"][0]
+
+    assert "body_html_debug" not in page
+    blob = page["body_html_blob"]
+    assert store.get_text(blob["sha256"]).startswith("<nav>")
+    assert blob["bytes"] == len(store.get(blob["sha256"]))